@@ -4,6 +4,7 @@ from database import db
 from routes.projects import projects_bp
 from routes.admin import admin_bp
 from routes.emissions import emissions_bp
+from services.emission_cache import emission_cache
 import os
 
 def create_app():
@@ -21,6 +22,9 @@ def create_app():
     with app.app_context():
         db.create_all()
 
+    # Emission factors are served from memory and refreshed in the background
+    emission_cache.init_app(app)
+
     return app
 
 if __name__ == "__main__":
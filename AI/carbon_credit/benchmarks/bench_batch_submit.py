@@ -0,0 +1,99 @@
+"""
+A portfolio of projects submitted one /projects/submit request at a time
+against a single /projects/submit/batch CSV upload, on a throwaway SQLite
+database. Credits stored by both paths are compared.
+
+    python AI/carbon_credit/benchmarks/bench_batch_submit.py --projects 500
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from flask import Flask
+
+from database import db
+from models import CountryEmission, Project
+from routes.projects import projects_bp
+from services.emission_cache import emission_cache
+from services.emission_fetcher import StubFetcher
+
+FACTORS = {"India": 0.708, "Germany": 0.38, "USA": 0.386, "Australia": 0.656, "Brazil": 0.09, "Japan": 0.457}
+
+
+def make_app(directory):
+    # create_app() with a throwaway database and upload folder
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(directory, 'carbon.db')}",
+        UPLOAD_FOLDER=directory,
+        ALLOWED_EXTENSIONS={"pdf", "docx", "png", "jpg"},
+    )
+    db.init_app(app)
+    app.register_blueprint(projects_bp, url_prefix="/projects")
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(CountryEmission(country=c, grid_emission_factor=f) for c, f in FACTORS.items())
+        db.session.commit()
+    emission_cache.fetcher = StubFetcher(FACTORS)
+    emission_cache.init_app(app, start=False)
+    return app
+
+
+def portfolio(n, rng):
+    return [
+        {
+            "country": rng.choice(list(FACTORS)),
+            "energy_generated": round(rng.uniform(1e3, 5e7), 1),
+            "technology": rng.choice(["solar", "wind"]),
+        }
+        for _ in range(n)
+    ]
+
+
+def stored_credits(app):
+    with app.app_context():
+        return [p.carbon_credits for p in Project.query.order_by(Project.id)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--projects", type=int, default=500)
+    args = parser.parse_args()
+    projects = portfolio(args.projects, random.Random(0))
+
+    with tempfile.TemporaryDirectory() as single_dir, tempfile.TemporaryDirectory() as batch_dir:
+        app = make_app(single_dir)
+        client = app.test_client()
+        start = time.perf_counter()
+        for i, project in enumerate(projects):
+            data = {**project, "document": (io.BytesIO(b"%PDF-1.4"), f"project-{i}.pdf")}
+            assert client.post("/projects/submit", data=data, content_type="multipart/form-data").status_code == 200
+        single = time.perf_counter() - start
+        single_credits = stored_credits(app)
+
+        app = make_app(batch_dir)
+        client = app.test_client()
+        body = "country,energy_generated,technology\n" + "".join(
+            f"{p['country']},{p['energy_generated']},{p['technology']}\n" for p in projects
+        )
+        start = time.perf_counter()
+        response = client.post("/projects/submit/batch", data=body, content_type="text/csv")
+        batch = time.perf_counter() - start
+        assert response.status_code == 200 and response.get_json()["submitted"] == len(projects)
+        batch_credits = stored_credits(app)
+
+    assert single_credits == batch_credits, "batch credits differ from single submissions"
+    print(f"{len(projects)} projects")
+    print(f"  one request each   {single * 1000:>9.1f} ms  ({single / len(projects) * 1000:.2f} ms/project)")
+    print(f"  one batch          {batch * 1000:>9.1f} ms  ({single / batch:.0f}x faster)")
+    print("  stored credits identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Emission-factor lookups from the in-memory cache against the per-request
+CountryEmission query, and a background refresh of many countries through
+a fetcher with simulated API latency, fetched concurrently against one at
+a time.
+
+    python AI/carbon_credit/benchmarks/bench_emission_cache.py --countries 50 --latency 0.2
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from flask import Flask
+
+from database import db
+from models import CountryEmission
+from services.emission_cache import EmissionCache
+from services.emission_fetcher import StubFetcher
+
+
+class SlowFetcher(StubFetcher):
+    def __init__(self, latency):
+        super().__init__()
+        self.latency = latency
+
+    def __call__(self, country):
+        time.sleep(self.latency)
+        return super().__call__(country)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--countries", type=int, default=50)
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per simulated API call")
+    args = parser.parse_args()
+    countries = [f"Country{i}" for i in range(args.countries)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = Flask(__name__)
+        app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(directory, 'carbon.db')}"
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            db.session.add_all(CountryEmission(country=c, grid_emission_factor=0.5) for c in countries)
+            db.session.commit()
+
+            start = time.perf_counter()
+            for i in range(args.lookups):
+                CountryEmission.query.filter_by(country=countries[i % len(countries)]).first()
+            query = (time.perf_counter() - start) / args.lookups
+
+            cache = EmissionCache(fetcher=SlowFetcher(args.latency))
+            cache.init_app(app, start=False)
+            start = time.perf_counter()
+            for i in range(args.lookups):
+                cache.get(countries[i % len(countries)])
+            cached = (time.perf_counter() - start) / args.lookups
+
+        start = time.perf_counter()
+        cache.refresh(countries)
+        pooled = time.perf_counter() - start
+        serial = EmissionCache(fetcher=SlowFetcher(args.latency), workers=1)
+        serial.app = app
+        start = time.perf_counter()
+        serial.refresh(countries)
+        one_at_a_time = time.perf_counter() - start
+
+    print(f"lookups ({args.lookups})")
+    print(f"  database query   {query * 1e6:>9.1f} us")
+    print(f"  emission cache   {cached * 1e6:>9.1f} us  ({query / cached:.0f}x faster)")
+    print(f"refresh of {args.countries} countries at {args.latency * 1000:.0f} ms per API call")
+    print(f"  one at a time    {one_at_a_time:>9.2f} s")
+    print(f"  {cache.workers} concurrent     {pooled:>9.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,15 @@ BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 UPLOAD_FOLDER = os.path.join(BASE_DIR, "uploads")
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Settings for app.create_app()
+class Config:
+    SECRET_KEY = secrets.token_hex(32)
+    SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(BASE_DIR, 'carbon.db')}"
+    UPLOAD_FOLDER = UPLOAD_FOLDER
+    ALLOWED_EXTENSIONS = {"pdf", "docx", "png", "jpg"}
+    # "http" fetches emission factors from the API, "stub" returns fixed ones
+    EMISSION_FETCHER = os.getenv("EMISSION_FETCHER", "http")
+
 app = Flask(__name__)
 app.config["SECRET_KEY"] = secrets.token_hex(32)
 app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{os.path.join(BASE_DIR, 'carbon.db')}"
@@ -1,18 +1,29 @@
-from flask import Blueprint, jsonify
-from database import db
-from models import CountryEmission
-from services.emission_fetcher import fetch_emission_factor
+from flask import Blueprint, request, jsonify
+from services.emission_cache import emission_cache
 
 emissions_bp = Blueprint("emissions", __name__)
 
+# Longest an update request may wait for its refresh (?wait=<seconds>)
+MAX_UPDATE_WAIT = 30.0
+
 @emissions_bp.route("/update/<country>", methods=["POST"])
 def update_emission(country):
-    factor = fetch_emission_factor(country)
-    emission = CountryEmission.query.filter_by(country=country).first()
-    if emission:
-        emission.grid_emission_factor = factor
-    else:
-        emission = CountryEmission(country=country, grid_emission_factor=factor)
-        db.session.add(emission)
-    db.session.commit()
-    return jsonify({"country": country, "factor": factor})
+    """
+    Refetch a country's factor in the background. Answers at once with
+    the current (possibly stale) factor and 202, or with ?wait=<seconds>
+    waits for the refresh and answers 200 with the new factor.
+    """
+    done = emission_cache.schedule([country])
+    wait = request.args.get("wait", type=float)
+    if wait:
+        done.wait(min(wait, MAX_UPDATE_WAIT))
+    refreshed = done.is_set()
+    body = {"country": country, "factor": emission_cache.peek(country), "refreshed": refreshed}
+    error = emission_cache.error(country) if refreshed else None
+    if error:
+        body["error"] = error
+    return jsonify(body), 200 if refreshed else 202
+
+@emissions_bp.route("/cache", methods=["GET"])
+def emission_cache_stats():
+    return jsonify(emission_cache.stats())
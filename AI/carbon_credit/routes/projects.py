@@ -1,11 +1,18 @@
 from flask import Blueprint, request, jsonify, current_app
 import os
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
 from database import db
-from models import Project, CountryEmission
-from services.carbon_clac import calculate_carbon_credits
+from models import Project
+from services.emission_cache import emission_cache
+from services.carbon_clac import calculate_carbon_credits, calculate_carbon_credits_bulk
+from services.batch_submit import detect_format, parse_rows, validate_row
 
 projects_bp = Blueprint("projects", __name__)
 
+# Rows accepted by one batch submission
+MAX_BATCH_ROWS = int(os.getenv("MAX_BATCH_ROWS", "10000"))
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in current_app.config["ALLOWED_EXTENSIONS"]
 
@@ -25,11 +32,11 @@ def submit_project():
     energy = float(data.get("energy_generated"))
     technology = data.get("technology")
 
-    emission = CountryEmission.query.filter_by(country=country).first()
-    if not emission:
+    factor = emission_cache.get(country)
+    if factor is None:
         return jsonify({"error": "Emission factor not available"}), 400
 
-    credits = calculate_carbon_credits(energy, emission.grid_emission_factor)
+    credits = calculate_carbon_credits(energy, factor)
 
     project = Project(
         user_id=1,  # TODO: link with auth
@@ -43,3 +50,95 @@ def submit_project():
     db.session.commit()
 
     return jsonify({"message": "Project submitted", "credits": credits})
+
+@projects_bp.route("/submit/batch", methods=["POST"])
+def submit_projects_batch():
+    """
+    Submit many projects at once from CSV or NDJSON rows of country,
+    energy_generated, technology and an optional document. Rows go in the
+    body, or in a multipart "file" with the documents they name as
+    "documents" parts. Emission factors come from the emission cache and every
+    valid row is inserted in one transaction; invalid rows are reported by
+    row number and skipped. Documents are written only once the rows
+    naming them are committed.
+    """
+    upload = request.files.get("file")
+    if upload:
+        try:
+            text = upload.read().decode("utf-8-sig")
+        except UnicodeDecodeError as e:
+            return jsonify({"error": f"File is not UTF-8 text: {e}"}), 400
+        fmt = detect_format(upload.filename, upload.content_type, text)
+    else:
+        text = request.get_data(as_text=True)
+        fmt = detect_format(None, request.content_type, text)
+    documents = {f.filename: f for f in request.files.getlist("documents")}
+
+    rows, errors = [], []
+    try:
+        for number, row, error in parse_rows(text, fmt, limit=MAX_BATCH_ROWS):
+            if error is None:
+                row, error = validate_row(row)
+            if error is None and row[3] is not None:
+                if row[3] not in documents:
+                    error = f"Document not uploaded: {row[3]}"
+                elif not allowed_file(row[3]):
+                    error = f"Invalid document: {row[3]}"
+            if error is not None:
+                errors.append({"row": number, "error": error})
+            else:
+                rows.append((number, row))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not rows and not errors:
+        return jsonify({"error": "No rows to submit"}), 400
+
+    factors = emission_cache.get_many({row[0] for _, row in rows})
+    known = []
+    for number, row in rows:
+        if row[0] in factors:
+            known.append((number, row))
+        else:
+            errors.append({"row": number, "error": f"Emission factor not available for {row[0]}"})
+
+    credits = calculate_carbon_credits_bulk([row[1] for _, row in known], [factors[row[0]] for _, row in known])
+    to_save = {}
+    values = []
+    for (number, (country, energy, technology, document)), credit in zip(known, credits):
+        filepath = None
+        if document is not None:
+            filepath = os.path.join(current_app.config["UPLOAD_FOLDER"], document)
+            to_save[document] = filepath
+        values.append({
+            "user_id": 1,  # TODO: link with auth
+            "country": country,
+            "energy_generated": energy,
+            "technology": technology,
+            "carbon_credits": credit,
+            "document_path": filepath,
+        })
+
+    ids = []
+    if values:
+        try:
+            ids = db.session.scalars(insert(Project).returning(Project.id, sort_by_parameter_order=True), values).all()
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            return jsonify({"error": f"Batch insert failed: {e}"}), 500
+        for document, filepath in to_save.items():
+            documents[document].save(filepath)
+
+    results = [
+        {"row": number, "project_id": project_id, "country": row[0], "credits": credit}
+        for (number, row), project_id, credit in zip(known, ids, credits)
+    ]
+    errors.sort(key=lambda e: e["row"])
+    return jsonify({
+        "message": f"{len(results)} projects submitted",
+        "submitted": len(results),
+        "failed": len(errors),
+        "total_credits": round(sum(credits), 2),
+        "results": results,
+        "errors": errors,
+    }), 200 if results else 400
@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+import math
+
+# Fields every row of a batch submission needs; "document" is optional
+REQUIRED_FIELDS = ("country", "energy_generated", "technology")
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def detect_format(filename, content_type, text):
+    """ "csv" or "ndjson", from the file name, then the content type, then the text"""
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if name.endswith(".csv"):
+        return "csv"
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in NDJSON_TYPES:
+        return "ndjson"
+    if content_type in ("text/csv", "application/csv"):
+        return "csv"
+    return "ndjson" if text.lstrip().startswith("{") else "csv"
+
+
+def parse_rows(text, fmt, limit=None):
+    """
+    (row number, fields or None, error or None) for each row. Rows count
+    from 1, excluding the CSV header; blank lines are skipped. Raises
+    ValueError on reaching row limit + 1, before parsing it.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        for number, row in enumerate(reader, start=1):
+            # DictReader puts fields past the header in a list under None;
+            # empty ones are just trailing commas
+            extra = [value for value in row.pop(None, None) or [] if value.strip()]
+            if not extra and not any((value or "").strip() for value in row.values()):
+                continue
+            _check_limit(number, limit)
+            if extra:
+                yield number, None, f"Row has {len(extra)} more field(s) than the header"
+                continue
+            yield number, {(k or "").strip(): (v or "").strip() for k, v in row.items()}, None
+        return
+    number = 0
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        number += 1
+        _check_limit(number, limit)
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield number, None, "Each line must be a JSON object"
+            continue
+        yield number, row, None
+
+
+def _check_limit(number, limit):
+    if limit is not None and number > limit:
+        raise ValueError(f"Batch too large (max {limit} rows)")
+
+
+def validate_row(row):
+    """(country, energy_generated, technology, document) or an error message"""
+    missing = [field for field in REQUIRED_FIELDS if row.get(field) in (None, "")]
+    if missing:
+        return None, f"Missing fields: {', '.join(missing)}"
+    # JSON rows may hold anything; only strings and numbers (not booleans) are fields
+    invalid = [field for field in REQUIRED_FIELDS if not _scalar(row[field])]
+    if row.get("document") not in (None, "") and not isinstance(row["document"], str):
+        invalid.append("document")
+    if invalid:
+        return None, f"Fields must be strings or numbers: {', '.join(invalid)}"
+    try:
+        energy = float(row["energy_generated"])
+    except (TypeError, ValueError):
+        return None, f"energy_generated is not a number: {row['energy_generated']!r}"
+    if not math.isfinite(energy) or energy < 0:
+        return None, "energy_generated must be a non-negative number"
+    document = row.get("document") or None
+    return (str(row["country"]).strip(), energy, str(row["technology"]).strip(), document), None
+
+
+def _scalar(value):
+    return isinstance(value, (str, int, float)) and not isinstance(value, bool)
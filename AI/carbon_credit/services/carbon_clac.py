@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def calculate_carbon_credits(energy_generated, grid_factor):
     """
     Formula:
@@ -6,3 +9,15 @@ def calculate_carbon_credits(energy_generated, grid_factor):
     avoided_emissions = energy_generated * grid_factor
     credits = avoided_emissions / 1000  # 1 credit = 1 ton CO2 avoided
     return round(credits, 2)
+
+
+def calculate_carbon_credits_bulk(energy_generated, grid_factors):
+    """
+    calculate_carbon_credits over arrays of energy and grid factors.
+    The arithmetic runs on numpy arrays; each credit is then rounded with
+    round() so it matches the single-project result to the cent.
+    """
+    energy = np.asarray(energy_generated, dtype=float)
+    factors = np.asarray(grid_factors, dtype=float)
+    credits = energy * factors / 1000
+    return [round(c, 2) for c in credits.tolist()]
@@ -0,0 +1,248 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from database import db
+from models import CountryEmission
+from services.emission_fetcher import DEFAULT_EMISSION_FACTOR, EMISSION_FETCHER, build_fetcher
+
+# Age after which a factor is refreshed in the background (it is still served)
+EMISSION_MAX_AGE = float(os.getenv("EMISSION_MAX_AGE", str(24 * 3600)))
+
+# How often the refresher looks for stale factors, and how many countries
+# it fetches at once
+EMISSION_REFRESH_INTERVAL = float(os.getenv("EMISSION_REFRESH_INTERVAL", "60"))
+EMISSION_REFRESH_WORKERS = int(os.getenv("EMISSION_REFRESH_WORKERS", "8"))
+
+
+class EmissionCache:
+    """
+    Process-local copy of the country_emissions table.
+
+    Loaded at startup and read without touching the database. Factors
+    older than max_age are still served while a background thread
+    refetches them. The thread fetches every due country concurrently
+    through the fetcher's pooled session and writes the results in one
+    transaction. A failed fetch keeps the old factor, or stores
+    DEFAULT_EMISSION_FACTOR for a country that has none.
+    """
+
+    def __init__(self, fetcher=None, max_age=EMISSION_MAX_AGE, interval=EMISSION_REFRESH_INTERVAL,
+                 workers=EMISSION_REFRESH_WORKERS):
+        self.fetcher = fetcher
+        self.max_age = max_age
+        self.interval = interval
+        self.workers = workers
+        self.app = None
+        # country -> (factor, updated_at as a unix time)
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending = set()
+        self._in_flight = set()
+        self._next_done = threading.Event()
+        self._current_done = threading.Event()
+        self._current_done.set()
+        self._thread = None
+        self._errors = {}
+        # country -> unix time before which a failed refresh is not retried
+        self._retry_at = {}
+        self.hits = self.misses = self.stale_hits = self.refreshes = 0
+
+    def init_app(self, app, start=True):
+        """Load every factor and start the refresher"""
+        self.app = app
+        if self.fetcher is None:
+            self.fetcher = build_fetcher(app.config.get("EMISSION_FETCHER", EMISSION_FETCHER))
+        with app.app_context():
+            self.load()
+        if start:
+            self.start()
+
+    def load(self):
+        rows = db.session.query(
+            CountryEmission.country, CountryEmission.grid_emission_factor, CountryEmission.updated_at
+        ).all()
+        with self._lock:
+            self._entries = {country: (factor, _timestamp(updated)) for country, factor, updated in rows}
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="emission-refresher", daemon=True)
+            self._thread.start()
+
+    def get(self, country):
+        """The factor for a country, or None if it has none"""
+        return self.get_many([country]).get(country)
+
+    def get_many(self, countries):
+        """Factors for the countries that have one; misses are read in one query"""
+        found, missing, stale = {}, [], []
+        now = time.time()
+        with self._lock:
+            for country in set(countries):
+                entry = self._entries.get(country)
+                if entry is None:
+                    missing.append(country)
+                    continue
+                found[country] = entry[0]
+                if self._due(country, entry[1], now):
+                    stale.append(country)
+            self.hits += len(found)
+            self.stale_hits += len(stale)
+            self.misses += len(missing)
+        if stale:
+            self.schedule(stale)
+        if missing:
+            # Rows added by another process since the cache was loaded
+            rows = db.session.query(
+                CountryEmission.country, CountryEmission.grid_emission_factor, CountryEmission.updated_at
+            ).filter(CountryEmission.country.in_(missing)).all()
+            with self._lock:
+                for country, factor, updated in rows:
+                    self._entries[country] = (factor, _timestamp(updated))
+                    found[country] = factor
+        return found
+
+    def peek(self, country):
+        with self._lock:
+            entry = self._entries.get(country)
+        return None if entry is None else entry[0]
+
+    def error(self, country):
+        """Why the country's last refresh failed, or None if it succeeded"""
+        with self._lock:
+            return self._errors.get(country)
+
+    def schedule(self, countries):
+        """
+        Queue countries for the refresher. Returns an event that is set
+        once a refresh covering them has finished.
+        """
+        with self._lock:
+            new = [c for c in countries if c not in self._in_flight and c not in self._pending]
+            queued = any(c in self._pending for c in countries)
+            self._pending.update(new)
+            done = self._next_done if new or queued else self._current_done
+        if new:
+            self._wake.set()
+        return done
+
+    def refresh(self, countries):
+        """
+        Fetch the countries now and store what was fetched, in one
+        transaction. Countries with no factor yet get the default when
+        their fetch fails. Returns country -> factor, or None where the
+        fetch failed.
+        """
+        countries = sorted(set(countries))
+        if not countries:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(countries)))) as pool:
+            fetched = dict(zip(countries, pool.map(self._fetch, countries)))
+        factors = {c: f for c, f in fetched.items() if f is not None}
+        with self._lock:
+            unknown = [c for c, f in fetched.items() if f is None and c not in self._entries]
+        defaulted, stored = set(), {}
+        if factors or unknown:
+            with self.app.app_context():
+                now = datetime.utcnow()
+                existing = {
+                    e.country: e
+                    for e in CountryEmission.query.filter(CountryEmission.country.in_(list(factors) + unknown)).all()
+                }
+                # Only a country with no factor anywhere falls back to the default;
+                # one stored by another process is cached as it is
+                stored = {
+                    c: (existing[c].grid_emission_factor, _timestamp(existing[c].updated_at))
+                    for c in unknown if c in existing
+                }
+                defaulted = {c for c in unknown if c not in existing}
+                factors.update(dict.fromkeys(defaulted, DEFAULT_EMISSION_FACTOR))
+                for country, factor in factors.items():
+                    emission = existing.get(country)
+                    if emission:
+                        emission.grid_emission_factor = factor
+                        emission.updated_at = now
+                    else:
+                        db.session.add(CountryEmission(country=country, grid_emission_factor=factor, updated_at=now))
+                db.session.commit()
+            with self._lock:
+                for country, factor in factors.items():
+                    self._entries[country] = (factor, _timestamp(now))
+                self._entries.update(stored)
+        with self._lock:
+            self.refreshes += 1
+            retry_at = time.time() + self.interval
+            for country in countries:
+                if fetched[country] is not None:
+                    self._errors.pop(country, None)
+                    self._retry_at.pop(country, None)
+                else:
+                    self._errors[country] = (
+                        "No factor fetched; using the default" if country in defaulted
+                        else "No factor fetched; keeping the previous value"
+                    )
+                    self._retry_at[country] = retry_at
+        return fetched
+
+    def stats(self):
+        with self._lock:
+            now = time.time()
+            return {
+                "countries": len(self._entries),
+                "stale": sum(1 for _, updated in self._entries.values() if now - updated > self.max_age),
+                "max_age_seconds": self.max_age,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "pending": sorted(self._pending),
+                "in_flight": sorted(self._in_flight),
+                "errors": dict(self._errors),
+            }
+
+    def _due(self, country, updated, now):
+        return now - updated > self.max_age and self._retry_at.get(country, 0) <= now
+
+    def _fetch(self, country):
+        try:
+            return self.fetcher(country)
+        except Exception as e:
+            print(f"❌ Emission refresh failed for {country}: {e}")
+            return None
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            now = time.time()
+            with self._lock:
+                due = {c for c, (_, updated) in self._entries.items() if self._due(c, updated, now)}
+                self._pending |= due - self._in_flight
+                if not self._pending:
+                    continue
+                batch, self._pending = self._pending, set()
+                self._in_flight = batch
+                self._current_done, self._next_done = self._next_done, threading.Event()
+                done = self._current_done
+            try:
+                self.refresh(batch)
+            except Exception as e:
+                print(f"❌ Emission refresh failed: {e}")
+            finally:
+                with self._lock:
+                    self._in_flight = set()
+                done.set()
+
+
+def _timestamp(updated_at):
+    # updated_at is naive UTC (datetime.utcnow)
+    if updated_at is None:
+        return 0.0
+    return (updated_at - datetime(1970, 1, 1)).total_seconds()
+
+
+emission_cache = EmissionCache()
@@ -1,16 +1,74 @@
+import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Which fetcher the emission cache uses: "http" (the API below) or "stub"
+EMISSION_FETCHER = os.getenv("EMISSION_FETCHER", "http")
+EMISSION_API_URL = os.getenv("EMISSION_API_URL", "https://api.carbonintensity.org/country/{country}")
+
+# Factor used when the API has none for a country that has no factor yet
+DEFAULT_EMISSION_FACTOR = 0.5
+
+
+class EmissionFetcher:
+    """
+    Grid emission factors from an open dataset (placeholder API) over one
+    pooled, retrying HTTP session. Returns None when no factor could be
+    fetched, so callers can keep the value they have.
+    """
+
+    def __init__(self, url=EMISSION_API_URL, timeout=10, pool_size=8):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504], allowed_methods=["GET"])
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __call__(self, country: str):
+        try:
+            response = self.session.get(self.url.format(country=country), timeout=self.timeout)
+            if response.status_code == 200:
+                factor = response.json().get("emission_factor")
+                return float(factor) if factor is not None else None
+        except (requests.RequestException, ValueError, TypeError) as e:
+            print(f"Error fetching emissions: {e}")
+        return None
+
+
+class StubFetcher:
+    """Fixed factors for tests and offline runs"""
+
+    def __init__(self, factors=None, default=DEFAULT_EMISSION_FACTOR):
+        self.factors = dict(factors or {})
+        self.default = default
+        self.calls = 0
+
+    def __call__(self, country: str):
+        self.calls += 1
+        return self.factors.get(country, self.default)
+
+
+def build_fetcher(name=EMISSION_FETCHER):
+    if name == "http":
+        return EmissionFetcher()
+    if name == "stub":
+        return StubFetcher()
+    raise ValueError(f"Unknown emission fetcher: {name!r} (expected 'http' or 'stub')")
+
+
+_fetcher = None
+
 
 def fetch_emission_factor(country: str):
     """
     Example: Fetch grid emission factors from an open dataset (placeholder API).
     You can replace this with IEA/World Bank APIs.
     """
-    url = f"https://api.carbonintensity.org/country/{country}"
-    try:
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("emission_factor", 0.5)  # fallback
-    except Exception as e:
-        print(f"Error fetching emissions: {e}")
-    return 0.5
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = EmissionFetcher()
+    factor = _fetcher(country)
+    return DEFAULT_EMISSION_FACTOR if factor is None else factor
@@ -1,13 +1,38 @@
 # app.py
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
 import pandas as pd
 import numpy as np
-import joblib
+import csv
+import io
+import json
+import os
+import time
 from typing import List, Dict, Optional
 from fastapi.middleware.cors import CORSMiddleware
+from feature_encoder import (
+    DEFAULTS, ENERGY_PATTERNS, REGION_PATTERNS, TECHNOLOGY_PATTERNS, WATER_PATTERNS,
+    FeatureEncoder, match_patterns
+)
+from inference import ModelStore
+from procstats import mapped_memory, process_memory
+from prediction_cache import PREDICTION_CACHE_QUANTA, PredictionCache, parse_quanta
+from site_ranking import SITES_CSV, SiteTable, default_site_table, rank_sites
+from sweep import MAX_SWEEP_POINTS, MAX_SWEEP_STEPS, SWEEP_FIELDS, axis_values, build_grid, find_boundaries
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the default site table and its BallTree before the first /rank-sites
+    if os.path.exists(SITES_CSV):
+        try:
+            await run_in_threadpool(default_site_table)
+        except Exception as e:
+            print(f"❌ Error loading site table: {e}")
+    yield
 
-app = FastAPI(title="Hydrogen Plant Feasibility Predictor")
+app = FastAPI(title="Hydrogen Plant Feasibility Predictor", lifespan=lifespan)
 
 
 app.add_middleware(
@@ -19,15 +44,46 @@ app.add_middleware(
 )
 
 
+MODEL_PATH = os.getenv(
+    "FEASIBILITY_MODEL_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "hydrogen_feasibility_model.pkl"),
+)
+
+# Exported artifacts (see export_model.py); the pickle is used when none is current
+ARTIFACT_DIR = os.getenv(
+    "FEASIBILITY_ARTIFACT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts"),
+)
+
+# Upper bound on sites scored by one /predict-feasibility/batch request
+MAX_BATCH_ROWS = int(os.getenv("MAX_BATCH_ROWS", "100000"))
+# ... and on its body, checked before it is read into memory
+MAX_BATCH_BYTES = int(os.getenv("MAX_BATCH_BYTES", str(64 * 1024 * 1024)))
+
+class BatchTooLarge(ValueError):
+    """A batch body over MAX_BATCH_ROWS rows or MAX_BATCH_BYTES bytes"""
+
+def build_serving(pipeline):
+    """The pipeline and the encoder for its features, swapped together"""
+    return pipeline, FeatureEncoder(pipeline.selected_features)
+
+# A bad spec only costs the quantization, not the model
+try:
+    prediction_quanta = parse_quanta(PREDICTION_CACHE_QUANTA)
+except ValueError as e:
+    print(f"⚠️ Ignoring PREDICTION_CACHE_QUANTA: {e}; caching exact inputs only")
+    prediction_quanta = {}
+prediction_cache = PredictionCache(quanta=prediction_quanta)
+
 try:
-    model_data = joblib.load("hydrogen_feasibility_model.pkl")
-    print("✅ Feasibility model loaded successfully!")
-    print(f"   Model accuracy: {model_data['accuracy']:.3f}")
-    print(f"   Target classes: {model_data['target_encoder'].classes_}")
-    print(f"   Selected features: {model_data['selected_features']}")
+    model_store = ModelStore(ARTIFACT_DIR, MODEL_PATH, build=build_serving)
+    print(f"✅ Feasibility model loaded successfully from {model_store.pipeline.source}!")
+    print(f"   Model accuracy: {model_store.pipeline.accuracy:.3f}")
+    print(f"   Target classes: {model_store.pipeline.classes}")
+    print(f"   Selected features: {model_store.pipeline.selected_features}")
 except Exception as e:
     print(f"❌ Error loading model: {e}")
-    model_data = None
+    model_store = None
 
 class FeasibilityRequest(BaseModel):
     
@@ -65,6 +121,57 @@ class FeasibilityResponse(BaseModel):
     key_factors: List[str]
     input_features: Dict[str, float]
 
+class BatchPrediction(BaseModel):
+    index: int
+    feasible: Optional[str] = None
+    confidence: Optional[float] = None
+    probability_yes: Optional[float] = None
+    probability_no: Optional[float] = None
+    error: Optional[str] = None
+
+class BatchFeasibilityResponse(BaseModel):
+    count: int
+    predicted: int
+    results: List[BatchPrediction]
+
+class SweepAxis(BaseModel):
+    field: str
+    start: float
+    stop: float
+    steps: int = 50
+
+class SweepRequest(BaseModel):
+    base: FeasibilityRequest
+    axes: List[SweepAxis]
+
+class SweepResponse(BaseModel):
+    axes: List[Dict]
+    probability_yes: List
+    feasible_share: float
+    boundaries: List[Dict]
+    boundary_count: int
+    points: int
+    elapsed_ms: float
+
+class SiteCenter(BaseModel):
+    lat: float
+    lon: float
+    radius_km: float
+
+class SiteBBox(BaseModel):
+    min_lat: float
+    min_lon: float
+    max_lat: float
+    max_lon: float
+
+class SiteRankingRequest(BaseModel):
+    plant: FeasibilityRequest
+    sites: Optional[List[Dict]] = None
+    k: int = 10
+    center: Optional[SiteCenter] = None
+    bbox: Optional[SiteBBox] = None
+    solar_weight: float = 0.5
+
 @app.get("/")
 async def root():
     return {
@@ -73,32 +180,42 @@ async def root():
             "GET /": "API information",
             "GET /model-info": "Get model details",
             "GET /available-features": "List of features model expects",
-            "POST /predict-feasibility": "Predict feasibility with JSON input"
+            "POST /predict-feasibility": "Predict feasibility with JSON input",
+            "POST /predict-feasibility/batch": "Predict feasibility for many sites (JSON array, NDJSON or CSV)",
+            "POST /predict-feasibility/sweep": "Probability surface and decision boundaries over 1-2 inputs",
+            "POST /rank-sites": "Rank candidate sites for a plant, optionally within a radius or box",
+            "GET /worker": "Serving process, model version and memory"
         }
     }
 
 @app.get("/model-info")
 async def get_model_info():
-    if model_data is None:
+    if model_store is None:
         raise HTTPException(status_code=500, detail="Model not loaded")
+    pipeline, _ = model_store.get()
     
     return {
-        "model_type": model_data.get('model_type', 'Unknown'),
-        "accuracy": round(model_data.get('accuracy', 0.0), 3),
-        "target_classes": model_data['target_encoder'].classes_.tolist(),
-        "selected_features": model_data.get('selected_features', []),
-        "number_of_features": len(model_data.get('selected_features', [])),
-        "prediction_type": "Feasibility (Yes/No)"
+        "model_type": pipeline.model_type,
+        "accuracy": round(pipeline.accuracy, 3),
+        "target_classes": pipeline.classes.tolist(),
+        "selected_features": pipeline.selected_features,
+        "number_of_features": len(pipeline.selected_features),
+        "prediction_type": "Feasibility (Yes/No)",
+        "model_source": pipeline.source,
+        "model_version": pipeline.version,
+        "serving": model_store.stats(),
+        "prediction_cache": prediction_cache.stats()
     }
 
 @app.get("/available-features")
 async def get_available_features():
-    if model_data is None:
+    if model_store is None:
         raise HTTPException(status_code=500, detail="Model not loaded")
+    pipeline, _ = model_store.get()
     
     return {
-        "selected_features": model_data.get('selected_features', []),
-        "total_features": len(model_data.get('selected_features', [])),
+        "selected_features": pipeline.selected_features,
+        "total_features": len(pipeline.selected_features),
         "required_user_inputs": [
             "capacity_mw", "country", "technology", "year"
         ],
@@ -124,41 +241,29 @@ async def predict_feasibility(request: FeasibilityRequest):
     - co2_emissions: Estimated CO2 emissions
     - water_availability: Water availability level
     """
-    if model_data is None:
+    if model_store is None:
         raise HTTPException(status_code=500, detail="Model not loaded. Please train the model first.")
+    pipeline, encoder = model_store.get()
     
     try:
         
         features = extract_features_from_request(request)
+        selected_features = pipeline.selected_features
         
-        
-        selected_features = model_data['selected_features']
-        input_vector = []
-        
-        for feature in selected_features:
-            if feature in features:
-                input_vector.append(features[feature])
-            else:
-                
-                default_value = get_default_value(feature)
-                input_vector.append(default_value)
+        start = time.perf_counter()
+        X_new = encoder.encode_many([request])
+        key = prediction_cache.key(X_new[0], pipeline.selected_features)
+        cached = prediction_cache.get(key, pipeline.version)
+        if cached is None:
+            labels, probabilities = pipeline.predict(X_new)
+            prediction_cache.put(key, (labels[0], probabilities[0]), pipeline.version)
+            predicted_class, prediction_proba = labels[0], probabilities[0]
+        else:
+            predicted_class, prediction_proba = cached
+        prediction_cache.record_latency(cached is not None, time.perf_counter() - start)
         
         
-        X_new = np.array([input_vector])
-        
-        
-        X_scaled = model_data['scaler'].transform(X_new)
-        X_selected = model_data['feature_selector'].transform(X_scaled)
-        
-        #
-        prediction = model_data['model'].predict(X_selected)[0]
-        prediction_proba = model_data['model'].predict_proba(X_selected)[0]
-        
-        
-        predicted_class = model_data['target_encoder'].inverse_transform([prediction])[0]
-        
-        
-        class_names = model_data['target_encoder'].classes_
+        class_names = pipeline.classes
         prob_dict = {class_name: float(prob) for class_name, prob in zip(class_names, prediction_proba)}
         
         
@@ -189,43 +294,248 @@ async def predict_feasibility(request: FeasibilityRequest):
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
 
-def extract_features_from_request(request: FeasibilityRequest) -> Dict[str, float]:
-    """Convert API request to feature dictionary"""
-    features = {}
+@app.post("/predict-feasibility/batch", response_model=BatchFeasibilityResponse)
+async def predict_feasibility_batch(request: Request):
+    """
+    Score many candidate sites in one call
     
+    The body is a JSON array of /predict-feasibility requests, NDJSON (one
+    request per line, Content-Type application/x-ndjson) or CSV with the
+    request fields as header (Content-Type text/csv). Results come back in
+    input order; rows that fail validation carry an error instead.
+    """
+    if model_store is None:
+        raise HTTPException(status_code=500, detail="Model not loaded. Please train the model first.")
+    try:
+        body = await read_limited_body(request, MAX_BATCH_BYTES)
+    except BatchTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    # Up to MAX_BATCH_ROWS rows of parsing and scoring: keep it off the event loop
+    return await run_in_threadpool(score_batch, body, request.headers.get("content-type", ""))
+
+async def read_limited_body(request: Request, limit: int) -> bytes:
+    """The request body, refused by Content-Length or mid-stream once over `limit` bytes"""
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise BatchTooLarge(f"Batch too large: {declared} bytes (max {limit})")
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise BatchTooLarge(f"Batch too large: over {limit} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def score_batch(body: bytes, content_type: str) -> BatchFeasibilityResponse:
+    """Parse, validate and score a batch body"""
+    pipeline, encoder = model_store.get()
     
-    features['Capacity_MW'] = request.capacity_mw
-    features['Year'] = request.year
+    try:
+        rows = parse_batch_body(body, content_type, limit=MAX_BATCH_ROWS)
+    except BatchTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch body: {str(e)}")
     
+    results: List[BatchPrediction] = [None] * len(rows)
+    valid_rows, requests = [], []
+    for i, row in enumerate(rows):
+        try:
+            requests.append(FeasibilityRequest(**row))
+        except (ValidationError, TypeError) as e:
+            results[i] = BatchPrediction(index=i, error=str(e))
+            continue
+        valid_rows.append(i)
     
-    tech_mapping = {
-        'PEM': 'Tech_PEM', 
-        'ALK': 'Tech_ALK', 
-        'SOEC': 'Tech_SOEC',
-        'SMR': 'Tech_SMR', 
-        'ATR': 'Tech_ATR', 
-        'ELECTROLYSIS': 'Tech_Electrolysis',
-        'BIOMASS': 'Tech_Biomass',
-        'SOLAR': 'Tech_Solar',
-        'WIND': 'Tech_Wind'
-    }
+    if requests:
+        try:
+            labels, probabilities = pipeline.predict(encoder.encode_many(requests))
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
+        
+        columns = {name: j for j, name in enumerate(pipeline.classes)}
+        confidences = probabilities.max(axis=1)
+        yes = probabilities[:, columns['Yes']] if 'Yes' in columns else np.zeros(len(labels))
+        no = probabilities[:, columns['No']] if 'No' in columns else np.zeros(len(labels))
+        for j, i in enumerate(valid_rows):
+            results[i] = BatchPrediction(
+                index=i,
+                feasible=labels[j],
+                confidence=float(confidences[j]),
+                probability_yes=float(yes[j]),
+                probability_no=float(no[j])
+            )
     
-    tech_upper = request.technology.upper()
-    for tech_key, feature_name in tech_mapping.items():
-        features[feature_name] = 1 if tech_key in tech_upper else 0
+    return BatchFeasibilityResponse(count=len(results), predicted=len(valid_rows), results=results)
+
+@app.post("/predict-feasibility/sweep", response_model=SweepResponse)
+async def predict_feasibility_sweep(request: SweepRequest):
+    """
+    Sweep one or two continuous inputs over a grid
     
+    Every other input is taken from base. The whole grid goes through the
+    model in one call; the response has the probability of "Yes" at each
+    point (nested by axis, first axis outermost) and the points where the
+    prediction flips.
+    """
+    if model_store is None:
+        raise HTTPException(status_code=500, detail="Model not loaded. Please train the model first.")
+    pipeline, encoder = model_store.get()
     
-    europe_countries = ['GERMANY', 'FRANCE', 'UK', 'UNITED KINGDOM', 'SPAIN', 'ITALY', 
-                       'NETHERLANDS', 'BELGIUM', 'SWEDEN', 'NORWAY', 'DENMARK', 'FINLAND']
-    asia_countries = ['CHINA', 'JAPAN', 'KOREA', 'SOUTH KOREA', 'INDIA', 'AUSTRALIA',
-                     'SINGAPORE', 'MALAYSIA', 'THAILAND', 'VIETNAM']
-    na_countries = ['USA', 'UNITED STATES', 'CANADA', 'MEXICO']
+    fields = [axis.field for axis in request.axes]
+    if not 1 <= len(fields) <= 2 or len(set(fields)) != len(fields):
+        raise HTTPException(status_code=400, detail="Sweep one or two distinct fields")
+    for axis in request.axes:
+        if axis.field not in SWEEP_FIELDS:
+            raise HTTPException(status_code=400, detail=f"Cannot sweep '{axis.field}'. Choose from: {', '.join(SWEEP_FIELDS)}")
+        if not 2 <= axis.steps <= MAX_SWEEP_STEPS:
+            raise HTTPException(status_code=400, detail=f"steps must be between 2 and {MAX_SWEEP_STEPS}")
+    points = int(np.prod([axis.steps for axis in request.axes]))
+    if points > MAX_SWEEP_POINTS:
+        raise HTTPException(status_code=400, detail=f"Sweep too large: {points} points (max {MAX_SWEEP_POINTS})")
     
-    country_upper = request.country.upper()
-    features['Region_Europe'] = 1 if any(c in country_upper for c in europe_countries) else 0
-    features['Region_Asia'] = 1 if any(c in country_upper for c in asia_countries) else 0
-    features['Region_NA'] = 1 if any(c in country_upper for c in na_countries) else 0
+    try:
+        start = time.perf_counter()
+        axes = [(axis.field, axis_values(axis.field, axis.start, axis.stop, axis.steps)) for axis in request.axes]
+        X = build_grid(encoder, encoder.encode(request.base), axes)
+        labels, probabilities = pipeline.predict(X)
+        
+        shape = [len(values) for _, values in axes]
+        yes = list(pipeline.classes).index('Yes')
+        probability_yes = probabilities[:, yes].reshape(shape)
+        feasible = (labels == 'Yes').reshape(shape)
+        boundaries, found = find_boundaries(axes, probability_yes, feasible)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Sweep error: {str(e)}")
     
+    return SweepResponse(
+        axes=[
+            {
+                "field": field,
+                "values": values.tolist(),
+                # The surface is flat along inputs the model does not use
+                "used_by_model": encoder.numeric_column(field) is not None
+            }
+            for field, values in axes
+        ],
+        probability_yes=probability_yes.tolist(),
+        feasible_share=float(feasible.mean()),
+        boundaries=boundaries,
+        boundary_count=found,
+        points=points,
+        elapsed_ms=round(elapsed_ms, 3)
+    )
+
+@app.post("/rank-sites")
+def rank_candidate_sites(request: SiteRankingRequest):
+    """
+    Rank candidate sites for a plant
+    
+    sites are monthly rows (City, District, lat, lon, Insolation, speed);
+    without them the SITES_CSV table is used. center and bbox narrow the
+    candidates before scoring. Each site's score is the model's probability
+    of "Yes" for the plant times its solar/wind resource score.
+    """
+    if model_store is None:
+        raise HTTPException(status_code=500, detail="Model not loaded. Please train the model first.")
+    pipeline, encoder = model_store.get()
+    if not 1 <= request.k <= 1000:
+        raise HTTPException(status_code=400, detail="k must be between 1 and 1000")
+    if not 0.0 <= request.solar_weight <= 1.0:
+        raise HTTPException(status_code=400, detail="solar_weight must be between 0 and 1")
+    if request.center is not None and request.center.radius_km <= 0:
+        raise HTTPException(status_code=400, detail="radius_km must be positive")
+    
+    try:
+        if request.sites is not None:
+            table = SiteTable.from_records(request.sites)
+        elif os.path.exists(SITES_CSV):
+            table = default_site_table()
+        else:
+            raise HTTPException(status_code=400, detail=f"No sites given and no site table at {SITES_CSV}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid sites: {str(e)}")
+    
+    try:
+        start = time.perf_counter()
+        center = request.center
+        bbox = request.bbox
+        ranking = rank_sites(
+            table, pipeline, encoder, request.plant,
+            k=request.k,
+            center=(center.lat, center.lon, center.radius_km) if center else None,
+            bbox=(bbox.min_lat, bbox.min_lon, bbox.max_lat, bbox.max_lon) if bbox else None,
+            solar_weight=request.solar_weight
+        )
+        ranking["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Ranking error: {str(e)}")
+    
+    return ranking
+
+def parse_batch_body(body: bytes, content_type: str, limit: Optional[int] = None) -> List[Dict]:
+    """
+    Rows of a JSON array, NDJSON or CSV batch body as dicts
+    
+    With a limit, raises BatchTooLarge on reaching row limit + 1, before
+    parsing it or anything after it.
+    """
+    text = body.decode("utf-8-sig")
+    if "csv" in content_type:
+        reader = csv.DictReader(io.StringIO(text))
+        # Empty cells mean "not given" for the optional fields
+        rows = ({k.strip(): v for k, v in row.items() if k and v not in (None, "")} for row in reader)
+        return take_rows(rows, limit)
+    if "ndjson" in content_type or "jsonl" in content_type:
+        lines = (line for line in io.StringIO(text) if line.strip())
+        return [json.loads(line) for line in take_rows(lines, limit)]
+    if text.lstrip().startswith("["):
+        return list(iter_json_array(text, limit))
+    data = json.loads(text)
+    if not (isinstance(data, dict) and isinstance(data.get("requests"), list)):
+        raise ValueError("expected a JSON array of requests")
+    return take_rows(data["requests"], limit)
+
+def take_rows(rows, limit: Optional[int]) -> List:
+    """The rows as a list; BatchTooLarge as soon as row limit + 1 turns up"""
+    taken = []
+    for row in rows:
+        if limit is not None and len(taken) == limit:
+            raise BatchTooLarge(f"Batch too large (max {limit} rows)")
+        taken.append(row)
+    return taken
+
+def iter_json_array(text: str, limit: Optional[int] = None):
+    """Elements of a top-level JSON array, decoded one at a time"""
+    decoder = json.JSONDecoder()
+    ws = json.decoder.WHITESPACE.match
+    pos = ws(text, ws(text, 0).end() + 1).end()
+    count = 0
+    if text[pos:pos + 1] != "]":
+        while True:
+            if limit is not None and count == limit:
+                raise BatchTooLarge(f"Batch too large (max {limit} rows)")
+            value, pos = decoder.raw_decode(text, pos)
+            count += 1
+            yield value
+            pos = ws(text, pos).end()
+            if text[pos:pos + 1] == "]":
+                break
+            if text[pos:pos + 1] != ",":
+                raise ValueError(f"expected ',' or ']' at offset {pos}")
+            pos = ws(text, pos + 1).end()
+    if ws(text, pos + 1).end() != len(text):
+        raise ValueError(f"extra data after the array at offset {pos + 1}")
+
+def extract_features_from_request(request: FeasibilityRequest) -> Dict[str, float]:
+    """Convert API request to feature dictionary"""
+    features = {}
+    
+    features['Capacity_MW'] = request.capacity_mw
+    features['Year'] = request.year
+    features.update(match_patterns(request.technology, TECHNOLOGY_PATTERNS))
+    features.update(match_patterns(request.country, REGION_PATTERNS))
     
     if request.investment_million:
         features['Investment'] = request.investment_million
@@ -233,35 +543,17 @@ def extract_features_from_request(request: FeasibilityRequest) -> Dict[str, floa
     if request.co2_emissions:
         features['CO2_Emissions'] = request.co2_emissions
     
-   
     if request.energy_source:
-        energy_upper = request.energy_source.upper()
-        features['Energy_Renewable'] = 1 if 'RENEW' in energy_upper else 0
-        features['Energy_Fossil'] = 1 if any(x in energy_upper for x in ['FOSSIL', 'GAS', 'COAL', 'OIL']) else 0
-        features['Energy_Nuclear'] = 1 if 'NUCLEAR' in energy_upper else 0
-    
+        features.update(match_patterns(request.energy_source, ENERGY_PATTERNS))
     
     if request.water_availability:
-        water_upper = request.water_availability.upper()
-        features['Water_High'] = 1 if 'HIGH' in water_upper else 0
-        features['Water_Medium'] = 1 if 'MEDIUM' in water_upper else 0
-        features['Water_Low'] = 1 if 'LOW' in water_upper else 0
+        features.update(match_patterns(request.water_availability, WATER_PATTERNS))
     
     return features
 
 def get_default_value(feature_name: str) -> float:
     """Get default values for missing features"""
-    defaults = {
-        'Investment': 100.0,
-        'CO2_Emissions': 1.0,
-        'Energy_Renewable': 0.0,
-        'Energy_Fossil': 0.0,
-        'Energy_Nuclear': 0.0,
-        'Water_High': 0.0,
-        'Water_Medium': 0.0,
-        'Water_Low': 0.0
-    }
-    return defaults.get(feature_name, 0.0)
+    return DEFAULTS.get(feature_name, 0.0)
 
 def generate_explanation(prediction: str, confidence: float, request: FeasibilityRequest, features: Dict) -> tuple:
     """Generate explanation for the prediction"""
@@ -302,12 +594,27 @@ def generate_explanation(prediction: str, confidence: float, request: Feasibilit
     
     return explanation, key_factors
 
+@app.get("/worker")
+async def worker_info():
+    """This worker's process, model version and memory (kB, Linux only)"""
+    if model_store is None:
+        raise HTTPException(status_code=500, detail="Model not loaded")
+    pipeline, _ = model_store.get()
+    
+    return {
+        "pid": os.getpid(),
+        "serving": model_store.stats(),
+        "memory": process_memory(),
+        # Pages of the memory-mapped artifact; shared with other workers
+        "model_memory": mapped_memory(pipeline.path) if pipeline.path and os.path.isdir(pipeline.path) else None
+    }
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {
-        "status": "healthy" if model_data else "unhealthy",
-        "model_loaded": model_data is not None,
+        "status": "healthy" if model_store else "unhealthy",
+        "model_loaded": model_store is not None,
         "timestamp": pd.Timestamp.now().isoformat()
     }
 
@@ -0,0 +1,98 @@
+"""
+Throughput of scoring sites one request at a time against the batch
+endpoint, in process through the ASGI app, plus the bare pipeline without
+HTTP for reference.
+
+    python AI/feasibility_model/benchmarks/bench_batch.py --sites 2000
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fastapi.testclient import TestClient
+
+import app as feasibility
+
+TECHNOLOGIES = ["PEM", "ALK", "SOEC", "SMR", "Electrolysis"]
+COUNTRIES = ["Germany", "India", "USA", "Spain", "Australia", "Japan"]
+FIELDS = ["capacity_mw", "country", "technology", "year", "investment_million", "energy_source", "water_availability"]
+
+
+def make_sites(count, rng):
+    return [
+        {
+            "capacity_mw": round(rng.uniform(1, 1000), 1),
+            "country": rng.choice(COUNTRIES),
+            "technology": rng.choice(TECHNOLOGIES),
+            "year": rng.randint(2015, 2035),
+            "investment_million": round(rng.uniform(10, 2000), 1),
+            "energy_source": rng.choice(["Renewable", "Natural gas", "Nuclear"]),
+            "water_availability": rng.choice(["High", "Medium", "Low"]),
+        }
+        for _ in range(count)
+    ]
+
+
+def timed(label, sites, run):
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:>9.1f} ms {len(sites) / elapsed:>10.0f} sites/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sites", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    sites = make_sites(args.sites, random.Random(args.seed))
+    client = TestClient(feasibility.app)
+    pipeline, encoder = feasibility.model_store.get()
+
+    def single_pipeline():
+        labels = []
+        for site in sites:
+            X = encoder.encode_many([feasibility.FeasibilityRequest(**site)])
+            labels.append(pipeline.predict(X)[0][0])
+        return labels
+
+    def batch_pipeline():
+        requests = [feasibility.FeasibilityRequest(**site) for site in sites]
+        return list(pipeline.predict(encoder.encode_many(requests))[0])
+
+    def single_endpoint():
+        return [client.post("/predict-feasibility", json=site).json()["feasible"] for site in sites]
+
+    def batch_endpoint(body, content_type):
+        response = client.post("/predict-feasibility/batch", content=body, headers={"content-type": content_type})
+        return [row["feasible"] for row in response.json()["results"]]
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(sites)
+    bodies = {
+        "json": (json.dumps(sites), "application/json"),
+        "ndjson": ("\n".join(json.dumps(site) for site in sites), "application/x-ndjson"),
+        "csv": (buffer.getvalue(), "text/csv"),
+    }
+
+    print(f"{len(sites)} sites")
+    expected = timed("pipeline, one row at a time", sites, single_pipeline)
+    assert timed("pipeline, one matrix", sites, batch_pipeline) == expected
+    assert timed("POST /predict-feasibility", sites, single_endpoint) == expected
+    for name, (body, content_type) in bodies.items():
+        assert timed(f"POST .../batch ({name})", sites, lambda: batch_endpoint(body, content_type)) == expected
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Per-request cost of encoding a feasibility request into a model input row:
+the feature-dict path (extract_features_from_request, then a lookup with
+default per selected feature) against the compiled FeatureEncoder. Both
+are checked to agree, for the model's features and for every feature the
+request can produce.
+
+    python AI/feasibility_model/benchmarks/bench_feature_encoder.py --requests 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+import app as feasibility
+from feature_encoder import CATEGORIES, NUMERIC_FEATURES, FeatureEncoder
+
+VALUES = {
+    "technology": ["PEM", "ALK", "SOEC", "SMR", "PEM Electrolysis", "Biomass gasification", "ATR + CCS"],
+    "country": ["Germany", "India", "USA", "Spain", "Australia", "Japan", "Brazil", "United Kingdom"],
+    "energy_source": [None, "Renewable", "Natural gas", "Nuclear", "Coal"],
+    "water_availability": [None, "High", "Medium", "Low"],
+}
+
+
+def make_requests(count, rng):
+    return [
+        feasibility.FeasibilityRequest(
+            capacity_mw=round(rng.uniform(1, 1000), 1),
+            year=rng.randint(2015, 2035),
+            investment_million=rng.choice([None, round(rng.uniform(10, 2000), 1)]),
+            co2_emissions=rng.choice([None, round(rng.uniform(0, 2), 2)]),
+            **{field: rng.choice(values) for field, values in VALUES.items()},
+        )
+        for _ in range(count)
+    ]
+
+
+def dict_path(request, selected_features):
+    features = feasibility.extract_features_from_request(request)
+    return [
+        features[feature] if feature in features else feasibility.get_default_value(feature)
+        for feature in selected_features
+    ]
+
+
+def timed(label, requests, run):
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed / len(requests) * 1e6:>8.2f} us/request")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    requests = make_requests(args.requests, random.Random(args.seed))
+    every_feature = [name for name, _, _ in NUMERIC_FEATURES]
+    for _, patterns, _ in CATEGORIES:
+        every_feature.extend(patterns)
+
+    feature_sets = {"model features": feasibility.model_store.pipeline.selected_features, "every feature": every_feature}
+    for label, selected in feature_sets.items():
+        encoder = FeatureEncoder(selected)
+        print(f"{label}: {len(selected)} columns, {args.requests} requests")
+        expected = timed("  feature dict + defaults", requests, lambda: np.array([dict_path(r, selected) for r in requests]))
+        rows = timed("  FeatureEncoder.encode", requests, lambda: np.array([encoder.encode(r) for r in requests]))
+        matrix = timed("  FeatureEncoder.encode_many", requests, lambda: encoder.encode_many(requests))
+        assert np.array_equal(rows, expected) and np.array_equal(matrix, expected)
+
+
+if __name__ == "__main__":
+    main()
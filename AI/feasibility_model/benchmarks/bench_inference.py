@@ -0,0 +1,107 @@
+"""
+Load time and inference latency of the pickled pipeline (joblib, three
+sklearn stages) against the exported artifact (one affine transform and
+a vectorized walk over memory-mapped tree arrays).
+
+Load time is measured in fresh interpreters, so it includes the imports
+each path needs. Latency is measured on random rows around the training
+statistics (all distinct) and on encoded API requests (which repeat, as
+only a few selected features come from the request). Run export_model.py
+first.
+
+    python AI/feasibility_model/benchmarks/bench_inference.py --repeat 5
+"""
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(MODEL_DIR)
+
+import numpy as np
+
+from feature_encoder import FeatureEncoder
+from inference import FeasibilityPipeline, JoblibPipeline, current_artifact
+
+LOAD_SNIPPET = """
+import sys, time, warnings
+warnings.simplefilter("ignore")
+start = time.perf_counter()
+sys.path.insert(0, {model_dir!r})
+import inference
+pipeline = inference.{cls}.load({path!r})
+pipeline.predict(__import__("numpy").zeros((1, len(pipeline.selected_features))))
+print(time.perf_counter() - start)
+"""
+
+
+def load_seconds(cls, path, repeat):
+    times = []
+    for _ in range(repeat):
+        code = LOAD_SNIPPET.format(model_dir=MODEL_DIR, cls=cls, path=path)
+        times.append(float(subprocess.check_output([sys.executable, "-c", code], text=True).split()[-1]))
+    return statistics.median(times)
+
+
+def random_request(rng):
+    return SimpleNamespace(
+        capacity_mw=rng.uniform(1, 1000),
+        country=rng.choice(["Germany", "India", "USA", "Spain", "Japan"]),
+        technology=rng.choice(["PEM", "ALK", "SOEC", "SMR", "PEM Electrolysis", "ATR"]),
+        year=rng.randint(2015, 2035),
+        investment_million=rng.choice([None, rng.uniform(10, 2000)]),
+        co2_emissions=rng.choice([None, rng.uniform(0, 2)]),
+        energy_source=rng.choice([None, "Renewable", "Natural gas"]),
+        water_availability=rng.choice([None, "High", "Low"]),
+    )
+
+
+def latency_ms(pipeline, X, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pipeline.predict(X)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=os.path.join(MODEL_DIR, "hydrogen_feasibility_model.pkl"))
+    parser.add_argument("--artifact", default=current_artifact(os.path.join(MODEL_DIR, "artifacts")))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    args = parser.parse_args()
+    if not args.artifact:
+        raise SystemExit("No artifact; run export_model.py first")
+
+    print(f"{'load (fresh process)':<22} {'pickle':>10} {'artifact':>10}")
+    print(
+        f"{'seconds':<22} {load_seconds('JoblibPipeline', args.model, args.repeat):>10.3f} "
+        f"{load_seconds('FeasibilityPipeline', args.artifact, args.repeat):>10.3f}"
+    )
+
+    pickled = JoblibPipeline.load(args.model)
+    fused = FeasibilityPipeline.load(args.artifact)
+    encoder = FeatureEncoder(fused.selected_features)
+    rng, py_rng = np.random.default_rng(0), random.Random(0)
+    workloads = {
+        "random": lambda size: fused.offset + fused.scale * rng.normal(size=(size, len(fused.selected_features))),
+        "requests": lambda size: encoder.encode_many([random_request(py_rng) for _ in range(size)]),
+    }
+    print(f"\n{'rows':<9} {'per call':>8} {'pickle ms':>10} {'artifact ms':>12} {'speedup':>8}")
+    for name, make_rows in workloads.items():
+        for size in args.sizes:
+            X = make_rows(size)
+            assert np.array_equal(pickled.predict(X)[0], fused.predict(X)[0])
+            slow, fast = latency_ms(pickled, X, args.repeat), latency_ms(fused, X, args.repeat)
+            print(f"{name:<9} {size:>8} {slow:>10.3f} {fast:>12.3f} {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Site ranking over a synthetic table of sites with twelve monthly rows
+each, spread over India: building the table and its BallTree, ranking every
+site, and ranking within a radius and a box. Radius results are checked
+against a brute-force haversine scan.
+
+    python AI/feasibility_model/benchmarks/bench_site_ranking.py --sites 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+import pandas as pd
+
+import app as feasibility
+from site_ranking import EARTH_RADIUS_KM, SiteTable, rank_sites
+
+PLANT = feasibility.FeasibilityRequest(capacity_mw=100, country="India", technology="PEM", year=2025)
+CENTER = (22.3, 70.8, 300.0)
+BBOX = (20.0, 70.0, 25.0, 80.0)
+
+
+def synthetic_rows(sites, seed=0):
+    rng = np.random.default_rng(seed)
+    lat, lon = rng.uniform(8, 35, sites), rng.uniform(68, 97, sites)
+    return pd.DataFrame({
+        "City": np.repeat([f"City{i}" for i in range(sites)], 12),
+        "District": np.repeat([f"District{i % 700}" for i in range(sites)], 12),
+        "Month": np.tile(np.arange(1, 13), sites),
+        "lat": np.repeat(lat, 12),
+        "lon": np.repeat(lon, 12),
+        "Insolation": rng.uniform(3, 7, sites * 12),
+        "speed": rng.uniform(1, 10, sites * 12),
+    })
+
+
+def haversine_km(lat, lon, lat0, lon0):
+    lat, lon, lat0, lon0 = map(np.radians, (lat, lon, lat0, lon0))
+    h = np.sin((lat - lat0) / 2) ** 2 + np.cos(lat) * np.cos(lat0) * np.sin((lon - lon0) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(h))
+
+
+def best_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sites", type=int, default=20000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pipeline, encoder = feasibility.model_store.get()
+    rows = synthetic_rows(args.sites)
+
+    start = time.perf_counter()
+    table = SiteTable(rows)
+    aggregate = time.perf_counter() - start
+    start = time.perf_counter()
+    table.tree
+    tree = time.perf_counter() - start
+
+    indices, distances = table.within_radius(*CENTER)
+    brute = haversine_km(table.lat, table.lon, CENTER[0], CENTER[1])
+    inside = np.flatnonzero(brute <= CENTER[2])
+    assert set(indices) == set(inside), "radius query disagrees with brute force"
+    assert np.allclose(np.sort(distances), np.sort(brute[inside]))
+
+    print(f"{len(table)} sites from {len(rows)} monthly rows")
+    print(f"  aggregate rows     {aggregate * 1000:>8.1f} ms")
+    print(f"  build BallTree     {tree * 1000:>8.1f} ms")
+    runs = [
+        ("all sites", {}),
+        (f"radius {CENTER[2]:.0f} km", {"center": CENTER}),
+        ("bbox", {"bbox": BBOX}),
+        ("radius + bbox", {"center": CENTER, "bbox": BBOX}),
+    ]
+    for name, kwargs in runs:
+        ranking = rank_sites(table, pipeline, encoder, PLANT, k=args.k, **kwargs)
+        elapsed = best_ms(lambda: rank_sites(table, pipeline, encoder, PLANT, k=args.k, **kwargs), args.repeat)
+        print(f"  rank {name:<15} {elapsed:>8.1f} ms  ({ranking['sites_considered']} considered)")
+    print(f"  radius query matches brute force over {len(inside)} sites")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+A capacity x investment grid through /predict-feasibility/sweep against
+the same grid as single /predict-feasibility calls (timed on a sample of
+the points and extrapolated), in process through the ASGI app.
+
+    python AI/feasibility_model/benchmarks/bench_sweep.py --steps 100
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import app as feasibility
+
+BASE = {"capacity_mw": 100.0, "country": "Germany", "technology": "PEM", "year": 2025, "investment_million": 150.0}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--sample", type=int, default=200, help="Single calls actually made")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    client = TestClient(feasibility.app)
+    body = {
+        "base": BASE,
+        "axes": [
+            {"field": "capacity_mw", "start": 1, "stop": 1000, "steps": args.steps},
+            {"field": "investment_million", "start": 10, "stop": 2000, "steps": args.steps},
+        ],
+    }
+    times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        sweep = client.post("/predict-feasibility/sweep", json=body).json()
+        times.append(time.perf_counter() - start)
+    surface = np.array(sweep["probability_yes"])
+
+    capacities, investments = (np.array(axis["values"]) for axis in sweep["axes"])
+    rng = np.random.default_rng(0)
+    picks = rng.integers(0, args.steps, size=(args.sample, 2))
+    start = time.perf_counter()
+    for i, j in picks:
+        single = client.post(
+            "/predict-feasibility",
+            json={**BASE, "capacity_mw": capacities[i], "investment_million": investments[j]},
+        ).json()
+        assert abs(single["probability_yes"] - surface[i, j]) < 1e-12
+    per_call = (time.perf_counter() - start) / args.sample
+
+    points = args.steps * args.steps
+    print(f"{args.steps}x{args.steps} grid ({points} points)")
+    print(f"  sweep endpoint     {min(times) * 1000:>10.1f} ms  (model pass {sweep['elapsed_ms']:.1f} ms)")
+    print(f"  single calls       {per_call * points * 1000:>10.1f} ms  ({per_call * 1000:.2f} ms/call x {points})")
+    print(f"  boundaries found   {sweep['boundary_count']}, feasible share {sweep['feasible_share']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
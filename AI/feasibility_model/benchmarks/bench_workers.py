@@ -0,0 +1,199 @@
+"""
+Scale-out and memory of serve.py. For each worker count the server is
+started, /predict-feasibility is driven by a fixed number of concurrent
+clients, and every worker's memory is read from /proc. This runs once on
+the memory-mapped artifact and once on the pickle (every worker loading
+its own copy) to show what sharing saves. With --swap, a copy of the
+current artifact is activated halfway through the last artifact run; all
+requests must still succeed and every worker must end up on the copy.
+
+    python AI/feasibility_model/benchmarks/bench_workers.py --workers 1 2 4 --duration 10 --swap
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(MODEL_DIR)
+
+import httpx
+
+from export_model import set_current
+from inference import current_artifact
+from procstats import child_pids, mapped_memory, process_memory
+
+ARTIFACT_ROOT = os.path.join(MODEL_DIR, "artifacts")
+TECHNOLOGIES = ["PEM", "ALK", "SOEC", "SMR", "Electrolysis"]
+COUNTRIES = ["Germany", "India", "USA", "Spain", "Australia", "Japan"]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def worker_pids(server_pid, workers):
+    if workers == 1:
+        return [server_pid]
+
+    def is_worker(pid):
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                return b"spawn_main" in f.read()
+        except OSError:
+            return False
+
+    return [pid for pid in child_pids(server_pid) if is_worker(pid)]
+
+
+def start_server(workers, port, env):
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(MODEL_DIR, "serve.py"), "--workers", str(workers), "--port", str(port), "--host", "127.0.0.1"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            if len(worker_pids(process.pid, workers)) == workers and httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Server did not start")
+
+
+def payload(rng):
+    return {
+        "capacity_mw": round(rng.uniform(1, 1000), 1),
+        "country": rng.choice(COUNTRIES),
+        "technology": rng.choice(TECHNOLOGIES),
+        "year": rng.randint(2015, 2035),
+        "investment_million": round(rng.uniform(10, 2000), 1),
+    }
+
+
+async def drive(url, concurrency, duration, seed):
+    latencies, failures = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def client_loop(client, rng):
+        nonlocal failures
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await client.post("/predict-feasibility", json=payload(rng))
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                failures += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        await asyncio.gather(*(client_loop(client, random.Random(seed + i)) for i in range(concurrency)))
+    latencies.sort()
+    return latencies, failures
+
+
+def stage_copy():
+    """A copy of the current artifact under a new version name"""
+    source = current_artifact(ARTIFACT_ROOT)
+    version = f"{os.path.basename(source)}-swaptest"
+    target = os.path.join(ARTIFACT_ROOT, version)
+    shutil.copytree(source, target, dirs_exist_ok=True)
+    manifest_path = os.path.join(target, "manifest.json")
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    manifest["version"] = version
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return os.path.basename(source), version
+
+
+async def run(mode, workers, args, swap):
+    env = dict(os.environ, ARTIFACT_CHECK_SECONDS="0.5")
+    empty = None
+    if mode == "pickle":
+        empty = tempfile.mkdtemp()
+        env["FEASIBILITY_ARTIFACT_DIR"] = empty
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    server = start_server(workers, port, env)
+    restore = None
+    try:
+        await drive(url, args.concurrency, 1.0, 0)  # warm up
+        load = asyncio.create_task(drive(url, args.concurrency, args.duration, 1))
+        if swap:
+            await asyncio.sleep(args.duration / 2)
+            restore, version = stage_copy()
+            set_current(ARTIFACT_ROOT, version)
+        latencies, failures = await load
+
+        pids = worker_pids(server.pid, workers)
+        memory = [process_memory(pid) for pid in pids]
+        # Pages of any artifact version, so a worker that has swapped still counts
+        model = [mapped_memory(ARTIFACT_ROOT, pid) for pid in pids] if mode == "artifact" else None
+
+        p = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000 if latencies else float("nan")
+        rss = sum(m["rss_kb"] for m in memory) / len(memory) / 1024
+        pss = sum(m["pss_kb"] for m in memory) / 1024
+        line = (
+            f"{mode:<9} {workers:>7} {len(latencies) / args.duration:>8.0f} {p(0.5):>7.1f} {p(0.99):>7.1f} "
+            f"{failures:>6} {rss:>9.1f} {pss:>10.1f}"
+        )
+        if model:
+            line += (
+                f"   model pages per worker: rss {sum(m['rss_kb'] for m in model) / len(model):.0f} kB,"
+                f" pss {sum(m['pss_kb'] for m in model) / len(model):.0f} kB"
+            )
+        print(line)
+
+        if swap:
+            # A new connection each time, so the requests spread over the workers
+            seen = [httpx.get(f"{url}/worker", headers={"Connection": "close"}).json() for _ in range(20 * workers)]
+            versions = {w["pid"]: w["serving"]["version"] for w in seen}
+            swaps = {w["pid"]: w["serving"]["swaps"] for w in seen}
+            print(f"  hot swap to {version}: {failures} failed requests; worker versions {versions}, swaps {swaps}")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        if restore:
+            set_current(ARTIFACT_ROOT, restore)
+            shutil.rmtree(os.path.join(ARTIFACT_ROOT, version), ignore_errors=True)
+        if empty:
+            shutil.rmtree(empty, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--modes", nargs="+", choices=["artifact", "pickle"], default=["artifact", "pickle"])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--swap", action="store_true", help="Activate a copy of the artifact during the last artifact run")
+    args = parser.parse_args()
+    if current_artifact(ARTIFACT_ROOT) is None:
+        raise SystemExit("No artifact; run export_model.py first")
+
+    print(f"{os.cpu_count()} CPUs, {args.concurrency} concurrent clients, {args.duration}s per run")
+    print(f"{'mode':<9} {'workers':>7} {'req/s':>8} {'p50 ms':>7} {'p99 ms':>7} {'failed':>6} {'RSS/wkr':>9} {'total PSS':>10}  (MB)")
+    for mode in args.modes:
+        for workers in args.workers:
+            swap = args.swap and mode == "artifact" and workers == args.workers[-1]
+            asyncio.run(run(mode, workers, args, swap))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+# export_model.py
+"""
+Export hydrogen_feasibility_model.pkl to a memory-mappable artifact that
+the API loads instead of the pickle.
+
+    python export_model.py                 # writes artifacts/<version>/, points CURRENT at it
+    python export_model.py --verify        # and checks it against the pickle
+    python export_model.py --no-activate   # export without switching CURRENT
+    python export_model.py --activate v1-...  # serve an exported version (roll back/forward)
+    python export_model.py --list          # exported versions, current one marked
+
+Running servers pick up a new CURRENT without restarting (see serve.py).
+
+The scaler is per column and the selector only keeps columns, so the two
+fold into one affine transform over the selected features. The forest
+becomes flat node arrays covering every tree.
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import shutil
+import tempfile
+import numpy as np
+from types import SimpleNamespace
+from typing import Dict, Tuple
+
+from feature_encoder import FeatureEncoder
+from inference import (
+    ARRAY_NAMES, ARTIFACT_FORMAT, ARTIFACT_FORMAT_VERSION, CURRENT_FILE,
+    FeasibilityPipeline, JoblibPipeline, current_artifact, file_sha256
+)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(BASE_DIR, "hydrogen_feasibility_model.pkl")
+ARTIFACT_ROOT = os.path.join(BASE_DIR, "artifacts")
+
+
+def fuse(model_data: Dict) -> Tuple[Dict[str, np.ndarray], int]:
+    """Arrays of the fused pipeline and the depth of the deepest tree"""
+    scaler, selector, forest = model_data['scaler'], model_data['feature_selector'], model_data['model']
+    support = selector.get_support(indices=True)
+    if len(support) != len(model_data['selected_features']):
+        raise ValueError("selected_features does not match the feature selector")
+    if forest.n_outputs_ != 1:
+        raise ValueError("Only single-output forests can be exported")
+
+    mean = scaler.mean_ if scaler.with_mean else np.zeros(scaler.n_features_in_)
+    scale = scaler.scale_ if scaler.with_std else np.ones(scaler.n_features_in_)
+
+    roots, features, thresholds, children, values = [], [], [], [], []
+    start, max_depth = 0, 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        nodes = np.arange(tree.node_count)
+        leaf = tree.children_left == -1
+        # Leaves loop back to themselves so traversal needs no leaf test
+        children.append(np.stack([
+            np.where(leaf, nodes, tree.children_left),
+            np.where(leaf, nodes, tree.children_right)
+        ], axis=1) + start)
+        features.append(np.where(leaf, 0, tree.feature))
+        thresholds.append(np.where(leaf, np.inf, tree.threshold))
+        counts = tree.value[:, 0, :]
+        values.append(counts / counts.sum(axis=1, keepdims=True))
+        roots.append(start)
+        start += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    arrays = {
+        "offset": np.ascontiguousarray(mean[support], dtype=np.float64),
+        "scale": np.ascontiguousarray(scale[support], dtype=np.float64),
+        "roots": np.array(roots, dtype=np.int32),
+        "feature": np.concatenate(features).astype(np.int32),
+        "threshold": float32_floor(np.concatenate(thresholds)),
+        "children": np.concatenate(children).astype(np.int32),
+        "value": np.concatenate(values).astype(np.float64),
+    }
+    return arrays, max_depth
+
+
+def float32_floor(values: np.ndarray) -> np.ndarray:
+    """
+    Largest float32 at or below each value. Features are float32, so
+    x <= t holds exactly when x <= float32_floor(t), at half the size.
+    """
+    rounded = values.astype(np.float32)
+    above = rounded.astype(np.float64) > values
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+def export(model_path: str, root: str, activate: bool = True) -> str:
+    """Write the artifact for model_path under root and return its directory"""
+    pickled = JoblibPipeline.load(model_path)
+    model_data = pickled.model_data
+    arrays, max_depth = fuse(model_data)
+
+    source_sha256 = file_sha256(model_path)
+    version = f"v{ARTIFACT_FORMAT_VERSION}-{source_sha256[:12]}"
+    path = os.path.join(root, version)
+    os.makedirs(root, exist_ok=True)
+
+    # Build next to the target and rename, so a half-written artifact is never visible
+    staging = tempfile.mkdtemp(prefix=f".{version}-", dir=root)
+    try:
+        os.chmod(staging, 0o755)
+        entries = {}
+        for name in ARRAY_NAMES:
+            file_name = f"{name}.npy"
+            np.save(os.path.join(staging, file_name), arrays[name], allow_pickle=False)
+            entries[name] = {
+                "file": file_name,
+                "dtype": str(arrays[name].dtype),
+                "shape": list(arrays[name].shape),
+                "sha256": file_sha256(os.path.join(staging, file_name)),
+            }
+        manifest = {
+            "format": ARTIFACT_FORMAT,
+            "format_version": ARTIFACT_FORMAT_VERSION,
+            "version": version,
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "source": {"file": os.path.basename(model_path), "sha256": source_sha256},
+            "model_type": model_data.get('model_type', 'Unknown'),
+            "accuracy": float(model_data.get('accuracy', 0.0)),
+            "selected_features": list(model_data['selected_features']),
+            "classes": [str(c) for c in model_data['target_encoder'].classes_[model_data['model'].classes_]],
+            "trees": len(arrays["roots"]),
+            "nodes": len(arrays["feature"]),
+            "max_depth": int(max_depth),
+            "arrays": entries,
+        }
+        with open(os.path.join(staging, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.replace(staging, path)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if activate:
+        set_current(root, version)
+    return path
+
+
+def set_current(root: str, version: str):
+    """Point CURRENT at version with an atomic rename"""
+    if not os.path.isfile(os.path.join(root, version, "manifest.json")):
+        raise FileNotFoundError(f"No artifact {version} in {root}")
+    tmp = os.path.join(root, f".{CURRENT_FILE}.tmp")
+    with open(tmp, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp, os.path.join(root, CURRENT_FILE))
+
+
+def list_versions(root: str):
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name for name in os.listdir(root)
+        if not name.startswith(".") and os.path.isfile(os.path.join(root, name, "manifest.json"))
+    )
+
+
+def verify(model_path: str, path: str, rows: int = 20000, seed: int = 0) -> int:
+    """Compare the artifact with the pickle; returns the number of label mismatches"""
+    pickled = JoblibPipeline.load(model_path)
+    fused = FeasibilityPipeline.load(path, verify=True)
+    rng = np.random.default_rng(seed)
+
+    # Training-like rows around the scaler statistics, plus encoded API requests
+    n = len(fused.selected_features)
+    X = fused.offset + fused.scale * rng.normal(size=(rows, n)) * rng.choice([0.5, 1.0, 3.0], size=(rows, 1))
+    binary = [i for i, name in enumerate(fused.selected_features) if name.startswith("Tech_")]
+    X[:, binary] = rng.integers(0, 2, size=(rows, len(binary)))
+
+    py_rng = random.Random(seed)
+    requests = [
+        SimpleNamespace(
+            capacity_mw=py_rng.uniform(1, 1000),
+            country=py_rng.choice(["Germany", "India", "USA", "Brazil"]),
+            technology=py_rng.choice(["PEM", "ALK", "SOEC", "SMR", "PEM Electrolysis", "SOEC + SMR"]),
+            year=py_rng.randint(2015, 2035),
+            investment_million=py_rng.choice([None, py_rng.uniform(10, 2000)]),
+            co2_emissions=None,
+            energy_source=py_rng.choice([None, "Renewable", "Natural gas"]),
+            water_availability=py_rng.choice([None, "High", "Low"])
+        )
+        for _ in range(1000)
+    ]
+    X = np.vstack([X, FeatureEncoder(fused.selected_features).encode_many(requests)])
+
+    expected_labels, expected = pickled.predict(X)
+    labels, probabilities = fused.predict(X)
+    mismatches = int((labels != expected_labels).sum())
+    print(f"Compared {len(X)} rows: max |Δp| = {np.abs(probabilities - expected).max():.2e}, label mismatches = {mismatches}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=MODEL_PATH, help="Pickled model to export")
+    parser.add_argument("--out", default=ARTIFACT_ROOT, help="Artifact root directory")
+    parser.add_argument("--no-activate", action="store_true", help="Do not point CURRENT at the export")
+    parser.add_argument("--verify", action="store_true", help="Check predictions against the pickle")
+    parser.add_argument("--activate", metavar="VERSION", help="Point CURRENT at an exported version and exit")
+    parser.add_argument("--list", action="store_true", help="List exported versions and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        current = os.path.basename(current_artifact(args.out) or "")
+        for version in list_versions(args.out):
+            print(f"{'*' if version == current else ' '} {version}")
+        return
+    if args.activate:
+        set_current(args.out, args.activate)
+        print(f"✅ CURRENT -> {args.activate}")
+        return
+
+    path = export(args.model, args.out, activate=not args.no_activate)
+    print(f"✅ Exported {args.model} to {path}")
+    if args.verify and verify(args.model, path):
+        raise SystemExit("❌ Artifact predictions differ from the pickle")
+
+
+if __name__ == "__main__":
+    main()
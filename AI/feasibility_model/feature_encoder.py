@@ -0,0 +1,147 @@
+# feature_encoder.py
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+
+# Feature -> substrings of the upper-cased request value that switch it on
+TECHNOLOGY_PATTERNS = {
+    'Tech_PEM': ('PEM',),
+    'Tech_ALK': ('ALK',),
+    'Tech_SOEC': ('SOEC',),
+    'Tech_SMR': ('SMR',),
+    'Tech_ATR': ('ATR',),
+    'Tech_Electrolysis': ('ELECTROLYSIS',),
+    'Tech_Biomass': ('BIOMASS',),
+    'Tech_Solar': ('SOLAR',),
+    'Tech_Wind': ('WIND',)
+}
+
+REGION_PATTERNS = {
+    'Region_Europe': ('GERMANY', 'FRANCE', 'UK', 'UNITED KINGDOM', 'SPAIN', 'ITALY',
+                      'NETHERLANDS', 'BELGIUM', 'SWEDEN', 'NORWAY', 'DENMARK', 'FINLAND'),
+    'Region_Asia': ('CHINA', 'JAPAN', 'KOREA', 'SOUTH KOREA', 'INDIA', 'AUSTRALIA',
+                    'SINGAPORE', 'MALAYSIA', 'THAILAND', 'VIETNAM'),
+    'Region_NA': ('USA', 'UNITED STATES', 'CANADA', 'MEXICO')
+}
+
+ENERGY_PATTERNS = {
+    'Energy_Renewable': ('RENEW',),
+    'Energy_Fossil': ('FOSSIL', 'GAS', 'COAL', 'OIL'),
+    'Energy_Nuclear': ('NUCLEAR',)
+}
+
+WATER_PATTERNS = {
+    'Water_High': ('HIGH',),
+    'Water_Medium': ('MEDIUM',),
+    'Water_Low': ('LOW',)
+}
+
+# (request field, patterns, whether an empty value leaves the features unset)
+CATEGORIES = [
+    ('technology', TECHNOLOGY_PATTERNS, False),
+    ('country', REGION_PATTERNS, False),
+    ('energy_source', ENERGY_PATTERNS, True),
+    ('water_availability', WATER_PATTERNS, True)
+]
+
+# (feature, request field, whether an empty value leaves the feature unset)
+NUMERIC_FEATURES = [
+    ('Capacity_MW', 'capacity_mw', False),
+    ('Year', 'year', False),
+    ('Investment', 'investment_million', True),
+    ('CO2_Emissions', 'co2_emissions', True)
+]
+
+# Values of features a request leaves unset; anything else defaults to 0
+DEFAULTS = {
+    'Investment': 100.0,
+    'CO2_Emissions': 1.0,
+    'Energy_Renewable': 0.0,
+    'Energy_Fossil': 0.0,
+    'Energy_Nuclear': 0.0,
+    'Water_High': 0.0,
+    'Water_Medium': 0.0,
+    'Water_Low': 0.0
+}
+
+# Distinct values remembered per category; later ones are matched each time
+MAX_TABLE_ENTRIES = 4096
+
+
+def match_patterns(value: str, patterns: Dict[str, Tuple[str, ...]]) -> Dict[str, int]:
+    """0/1 per feature: does the upper-cased value contain any of its substrings"""
+    upper = value.upper()
+    return {feature: 1 if any(p in upper for p in substrings) else 0 for feature, substrings in patterns.items()}
+
+
+class FeatureEncoder:
+    """
+    Encoding plan compiled once from the model's selected features.
+
+    Every column starts from its default; numeric fields are copied to their
+    columns and each category value is looked up in a table of the columns
+    it sets, filled the first time the value is seen. Fields and categories
+    with no selected column are dropped from the plan.
+    """
+
+    def __init__(self, selected_features: Sequence[str], defaults: Dict[str, float] = DEFAULTS):
+        self.features = list(selected_features)
+        self.size = len(self.features)
+        column = {name: i for i, name in enumerate(self.features)}
+        self.base = np.array([defaults.get(name, 0.0) for name in self.features], dtype=float)
+
+        self._numeric = [
+            (column[name], field, optional)
+            for name, field, optional in NUMERIC_FEATURES if name in column
+        ]
+        self._categories = []
+        for field, patterns, optional in CATEGORIES:
+            used = {name: substrings for name, substrings in patterns.items() if name in column}
+            if used:
+                columns = np.array([column[name] for name in used], dtype=np.intp)
+                self._categories.append((field, used, columns, optional, {}))
+
+    def _lookup(self, patterns, table, value: str) -> np.ndarray:
+        values = table.get(value)
+        if values is None:
+            values = np.array(list(match_patterns(value, patterns).values()), dtype=float)
+            if len(table) < MAX_TABLE_ENTRIES:
+                table[value] = values
+        return values
+
+    def encode_into(self, request, row: np.ndarray) -> np.ndarray:
+        """Write the model input for one request into row"""
+        row[:] = self.base
+        for col, field, optional in self._numeric:
+            value = getattr(request, field)
+            if value or not optional:
+                row[col] = value
+        for field, patterns, columns, optional, table in self._categories:
+            value = getattr(request, field)
+            if value or not optional:
+                row[columns] = self._lookup(patterns, table, value)
+        return row
+
+    def numeric_column(self, field: str):
+        """Column of a numeric request field, or None if the model does not use it"""
+        for col, name, _ in self._numeric:
+            if name == field:
+                return col
+        return None
+
+    def set_numeric(self, X: np.ndarray, field: str, values) -> np.ndarray:
+        """Overwrite one numeric request field in encoded rows, as encode_into would"""
+        for col, name, optional in self._numeric:
+            if name == field:
+                values = np.asarray(values, dtype=float)
+                X[:, col] = np.where(values != 0, values, self.base[col]) if optional else values
+        return X
+
+    def encode(self, request) -> np.ndarray:
+        return self.encode_into(request, np.empty(self.size))
+
+    def encode_many(self, requests: List) -> np.ndarray:
+        """Model input matrix, one row per request"""
+        X = np.empty((len(requests), self.size))
+        for i, request in enumerate(requests):
+            self.encode_into(request, X[i])
+        return X
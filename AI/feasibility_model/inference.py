@@ -0,0 +1,245 @@
+# inference.py
+import hashlib
+import json
+import os
+import threading
+import time
+import numpy as np
+from typing import Any, Callable, Dict, List, Tuple
+
+ARTIFACT_FORMAT = "feasibility-pipeline"
+ARTIFACT_FORMAT_VERSION = 1
+
+# Arrays of an exported pipeline, one .npy file each
+ARRAY_NAMES = ["offset", "scale", "roots", "feature", "threshold", "children", "value"]
+
+# File in the artifact root naming the version to serve
+CURRENT_FILE = "CURRENT"
+
+# Seconds between checks of CURRENT for a newly activated version
+ARTIFACT_CHECK_SECONDS = float(os.getenv("ARTIFACT_CHECK_SECONDS", "2"))
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FeasibilityPipeline:
+    """
+    Scaler, feature selector and random forest fused into flat arrays.
+
+    Input rows hold the selected features in order. They are scaled by one
+    per-column affine transform, then every tree is walked at once over
+    node arrays in which leaves point to themselves, so each step is the
+    same vectorized update and max_depth steps reach all leaves. Identical
+    rows, common in batches of encoded requests, are walked once.
+    """
+
+    def __init__(self, manifest: Dict, arrays: Dict[str, np.ndarray], path: str = None):
+        self.manifest = manifest
+        self.path = path
+        self.version = manifest["version"]
+        self.selected_features: List[str] = manifest["selected_features"]
+        self.classes = np.array(manifest["classes"])
+        self.accuracy = manifest.get("accuracy", 0.0)
+        self.model_type = manifest.get("model_type", "Unknown")
+        self.max_depth = manifest["max_depth"]
+        for name in ARRAY_NAMES:
+            # A plain view of a memmap is still file backed but indexes faster
+            setattr(self, name, np.asarray(arrays[name]))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True, verify: bool = False) -> "FeasibilityPipeline":
+        """Open an exported artifact directory, memory-mapping its arrays"""
+        with open(os.path.join(path, "manifest.json")) as f:
+            manifest = json.load(f)
+        if manifest.get("format") != ARTIFACT_FORMAT or manifest.get("format_version") != ARTIFACT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported artifact format in {path}: {manifest.get('format')} v{manifest.get('format_version')}")
+        arrays = {}
+        for name in ARRAY_NAMES:
+            entry = manifest["arrays"][name]
+            file_path = os.path.join(path, entry["file"])
+            if verify and file_sha256(file_path) != entry["sha256"]:
+                raise ValueError(f"Checksum mismatch for {file_path}")
+            arrays[name] = np.load(file_path, mmap_mode="r" if mmap else None, allow_pickle=False)
+        return cls(manifest, arrays, path)
+
+    @property
+    def source(self) -> str:
+        return f"artifact {self.version}"
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        # Trees see float32 features, as in sklearn
+        X_scaled = ((np.asarray(X, dtype=float) - self.offset) / self.scale).astype(np.float32)
+        if len(X_scaled) > 1:
+            unique, inverse = distinct_rows(X_scaled)
+            if len(unique) < len(X_scaled):
+                return self._walk(unique)[inverse]
+        return self._walk(X_scaled)
+
+    def _walk(self, X_scaled: np.ndarray) -> np.ndarray:
+        n, width = X_scaled.shape
+        flat = X_scaled.ravel()
+        offsets = (np.arange(n, dtype=np.intp) * width)[:, None]
+        nodes = np.broadcast_to(self.roots, (n, len(self.roots)))
+        for _ in range(self.max_depth):
+            go_right = flat[offsets + self.feature[nodes]] > self.threshold[nodes]
+            nodes = self.children[nodes, go_right.view(np.int8)]
+        return self.value[nodes].sum(axis=1) / len(self.roots)
+
+    def predict(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Predicted labels and class probabilities for rows of selected features"""
+        probabilities = self.predict_proba(X)
+        return self.classes[np.argmax(probabilities, axis=1)], probabilities
+
+
+def distinct_rows(X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Distinct rows of X in first-seen order and, per row, its index among them"""
+    keys = np.ascontiguousarray(X).view(np.dtype((np.void, X.shape[1] * X.itemsize))).ravel()
+    index: Dict[bytes, int] = {}
+    inverse = np.fromiter((index.setdefault(key, len(index)) for key in keys.tolist()), dtype=np.intp, count=len(keys))
+    first = np.empty(len(index), dtype=np.intp)
+    first[inverse[::-1]] = np.arange(len(keys) - 1, -1, -1)
+    return X[first], inverse
+
+
+class JoblibPipeline:
+    """The pickled scaler, selector and model, run stage by stage"""
+
+    def __init__(self, model_data: Dict, path: str = None):
+        self.model_data = model_data
+        self.path = path
+        self.version = None
+        self.selected_features: List[str] = model_data['selected_features']
+        self.classes = model_data['target_encoder'].classes_
+        self.accuracy = model_data.get('accuracy', 0.0)
+        self.model_type = model_data.get('model_type', 'Unknown')
+
+    @classmethod
+    def load(cls, path: str) -> "JoblibPipeline":
+        import joblib
+
+        pipeline = cls(joblib.load(path), path)
+        pipeline.version = f"pickle-{file_sha256(path)[:12]}"
+        return pipeline
+
+    @property
+    def source(self) -> str:
+        return f"pickle {os.path.basename(self.path or '')}"
+
+    def predict(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # The scaler was fitted on every candidate feature; the selector then
+        # keeps selected_features, so the other columns never reach the model
+        support = self.model_data['feature_selector'].get_support(indices=True)
+        X_full = np.zeros((X.shape[0], self.model_data['scaler'].n_features_in_))
+        X_full[:, support] = X
+
+        X_scaled = self.model_data['scaler'].transform(X_full)
+        X_selected = self.model_data['feature_selector'].transform(X_scaled)
+        probabilities = self.model_data['model'].predict_proba(X_selected)
+
+        encoded = self.model_data['model'].classes_[np.argmax(probabilities, axis=1)]
+        labels = self.model_data['target_encoder'].inverse_transform(encoded)
+        return labels, probabilities
+
+
+def current_artifact(root: str):
+    """Directory of the artifact CURRENT points to, or None"""
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(root, version) if version else None
+
+
+def load_pipeline(artifact_root: str, model_path: str):
+    """The current exported artifact if there is one, else the pickle"""
+    path = current_artifact(artifact_root)
+    if path is not None:
+        return FeasibilityPipeline.load(path)
+    return JoblibPipeline.load(model_path)
+
+
+class ModelStore:
+    """
+    The model a process serves, swapped when CURRENT changes.
+
+    At most every check_interval seconds a request stats CURRENT; when it
+    names another version, that artifact is memory-mapped and replaces the
+    served one in a single assignment, so a request sees either the old
+    model or the new one. Mapped files live in the page cache, shared by
+    every process serving the same version. build turns a pipeline into
+    whatever the app serves alongside it (e.g. its feature encoder).
+    """
+
+    def __init__(
+        self,
+        artifact_root: str,
+        model_path: str,
+        build: Callable[[Any], Any] = lambda pipeline: pipeline,
+        check_interval: float = ARTIFACT_CHECK_SECONDS,
+    ):
+        self.artifact_root = artifact_root
+        self.model_path = model_path
+        self.build = build
+        self.check_interval = check_interval
+        self.swaps = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._next_check = time.monotonic() + check_interval
+        self._current_stat = self._stat()
+        self.pipeline = load_pipeline(artifact_root, model_path)
+        self.serving = build(self.pipeline)
+
+    def _stat(self):
+        try:
+            st = os.stat(os.path.join(self.artifact_root, CURRENT_FILE))
+        except FileNotFoundError:
+            return None
+        # CURRENT is replaced by rename, so a new version means a new inode
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def get(self):
+        """What build returned for the pipeline currently served"""
+        if time.monotonic() >= self._next_check and self._lock.acquire(blocking=False):
+            try:
+                self._next_check = time.monotonic() + self.check_interval
+                self._refresh()
+            finally:
+                self._lock.release()
+        return self.serving
+
+    def _refresh(self):
+        current_stat = self._stat()
+        if current_stat is None or current_stat == self._current_stat:
+            return
+        self._current_stat = current_stat
+        path = current_artifact(self.artifact_root)
+        if path is None or os.path.basename(path) == self.pipeline.version:
+            return
+        try:
+            pipeline = FeasibilityPipeline.load(path)
+            serving = self.build(pipeline)
+        except Exception as e:
+            # Keep serving the previous model; retried when CURRENT changes again
+            self.last_error = f"{os.path.basename(path)}: {e}"
+            print(f"❌ Error loading model {path}: {e}")
+            return
+        self.pipeline, self.serving = pipeline, serving
+        self.swaps += 1
+        self.last_error = None
+        print(f"✅ Now serving {pipeline.source} (pid {os.getpid()})")
+
+    def stats(self) -> Dict:
+        return {
+            "version": self.pipeline.version,
+            "source": self.pipeline.source,
+            "swaps": self.swaps,
+            "check_interval_seconds": self.check_interval,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,144 @@
+# prediction_cache.py
+import os
+import threading
+import time
+import numpy as np
+from collections import OrderedDict, deque
+from typing import Any, Dict, Optional
+
+# Entries kept, and seconds an entry stays valid (0 keeps it until evicted)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+
+# Grid steps for continuous features in the cache key, e.g.
+# "Capacity_MW=5,Investment=10"; unlisted features must match exactly
+PREDICTION_CACHE_QUANTA = os.getenv("PREDICTION_CACHE_QUANTA", "")
+
+# Recent lookups kept for the latency percentiles
+LATENCY_WINDOW = 1000
+
+
+def parse_quanta(spec: str) -> Dict[str, float]:
+    """Feature -> grid step from "Feature=step,..." """
+    quanta = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, sep, step = part.partition("=")
+        try:
+            value = float(step)
+        except ValueError:
+            value = None
+        if not sep or not name.strip() or value is None or not value >= 0:
+            raise ValueError(f"Invalid quantization spec: {part!r}")
+        quanta[name.strip()] = value
+    return quanta
+
+
+def _percentiles(values) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None}
+    ordered = sorted(values)
+    return {
+        "p50": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+    }
+
+
+class PredictionCache:
+    """
+    LRU cache of model outputs keyed by the encoded input row.
+
+    Continuous features can be snapped to a grid in the key, so requests
+    that differ by less than a step share one entry. The cache remembers
+    which model version filled it and empties itself when asked about
+    another one.
+    """
+
+    def __init__(
+        self,
+        max_size: int = PREDICTION_CACHE_SIZE,
+        ttl: float = PREDICTION_CACHE_TTL,
+        quanta: Optional[Dict[str, float]] = None,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.quanta = {name: step for name, step in (quanta or {}).items() if step > 0}
+        self._steps: Dict[tuple, np.ndarray] = {}
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.version = None
+        self.hits = self.misses = self.expired = self.evictions = self.invalidations = 0
+        self._latency = {"hit": deque(maxlen=LATENCY_WINDOW), "miss": deque(maxlen=LATENCY_WINDOW)}
+
+    def key(self, row: np.ndarray, features) -> bytes:
+        """Key of an encoded row whose columns are features"""
+        features = tuple(features)
+        steps = self._steps.get(features)
+        if steps is None:
+            steps = self._steps[features] = np.array([self.quanta.get(name, 0.0) for name in features])
+        row = np.array(row, dtype=np.float64)
+        quantized = steps > 0
+        if quantized.any():
+            row[quantized] = np.round(row[quantized] / steps[quantized]) * steps[quantized]
+        return row.tobytes()
+
+    def _check_version(self, version):
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key: bytes, version) -> Optional[Any]:
+        if self.max_size <= 0:
+            return None
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: bytes, value: Any, version):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def record_latency(self, hit: bool, seconds: float):
+        self._latency["hit" if hit else "miss"].append(seconds)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "quanta": self.quanta,
+                "model_version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "latency_ms": {kind: _percentiles(list(values)) for kind, values in self._latency.items()},
+            }
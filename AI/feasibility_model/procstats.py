@@ -0,0 +1,66 @@
+# procstats.py
+import os
+from typing import Dict, Optional
+
+# smaps fields reported, all in kB
+MEMORY_FIELDS = {
+    "Rss": "rss_kb",
+    "Pss": "pss_kb",
+    "Shared_Clean": "shared_clean_kb",
+    "Shared_Dirty": "shared_dirty_kb",
+    "Private_Clean": "private_clean_kb",
+    "Private_Dirty": "private_dirty_kb",
+}
+
+
+def _parse_smaps(lines) -> Dict[str, int]:
+    memory = {name: 0 for name in MEMORY_FIELDS.values()}
+    for line in lines:
+        field, _, rest = line.partition(":")
+        if field in MEMORY_FIELDS:
+            memory[MEMORY_FIELDS[field]] += int(rest.split()[0])
+    return memory
+
+
+def process_memory(pid="self") -> Optional[Dict[str, int]]:
+    """Memory of a process from /proc/<pid>/smaps_rollup, or None off Linux"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            return _parse_smaps(f)
+    except OSError:
+        return None
+
+
+def mapped_memory(prefix: str, pid="self") -> Optional[Dict[str, int]]:
+    """The same figures, counting only mappings of files under prefix"""
+    prefix = os.path.realpath(prefix)
+    try:
+        with open(f"/proc/{pid}/smaps") as f:
+            lines, inside = [], False
+            for line in f:
+                head = line.split()
+                # Mapping headers start with an address range, e.g. 7f..-7f.. r--s
+                if head and "-" in head[0] and ":" not in head[0]:
+                    inside = len(head) >= 6 and head[5].startswith(prefix)
+                elif inside:
+                    lines.append(line)
+    except OSError:
+        return None
+    return _parse_smaps(lines)
+
+
+def child_pids(pid: int):
+    """Direct children of a process"""
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command may contain spaces; fields resume after its ")"
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return children
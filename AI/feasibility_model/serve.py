@@ -0,0 +1,39 @@
+# serve.py
+"""
+Serve the feasibility API from several worker processes.
+
+    python serve.py --workers 4 --port 8001
+
+Every worker memory-maps the CURRENT artifact read-only (export it first
+with python export_model.py), so the model weights are held once in the
+page cache however many workers run. To roll out another model, export it
+or switch CURRENT with export_model.py --activate VERSION; each worker
+picks the new version up within ARTIFACT_CHECK_SECONDS, without a restart.
+GET /worker shows which process answered, its version and its memory.
+"""
+import argparse
+import os
+import uvicorn
+
+from inference import current_artifact
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8001")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))))
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+
+    artifact_root = os.getenv("FEASIBILITY_ARTIFACT_DIR", os.path.join(BASE_DIR, "artifacts"))
+    if current_artifact(artifact_root) is None:
+        print("⚠️  No exported artifact; every worker will load its own copy of the pickle. Run export_model.py first.")
+
+    uvicorn.run("app:app", host=args.host, port=args.port, workers=args.workers, log_level=args.log_level, app_dir=BASE_DIR)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# site_ranking.py
+import os
+import threading
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Candidate sites served by /rank-sites when a request brings none;
+# monthly rows as loaded by backend/map_data_add.js
+SITES_CSV = os.getenv("SITES_CSV", os.path.join(os.path.dirname(os.path.abspath(__file__)), "D2.csv"))
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Resource levels that count as full marks: kWh/m²/day of insolation, and
+# m/s of wind (power grows with the cube of speed, capped at this speed)
+SOLAR_REFERENCE = 6.5
+WIND_REFERENCE = 12.0
+
+SITE_COLUMNS = ["City", "District", "lat", "lon", "Insolation", "speed"]
+
+
+class SiteTable:
+    """
+    Candidate sites with their mean and worst-month solar and wind
+    resource, aggregated from monthly rows, and a haversine BallTree over
+    their coordinates, built by the first radius query.
+    """
+
+    def __init__(self, rows: pd.DataFrame):
+        missing = [c for c in SITE_COLUMNS if c not in rows.columns]
+        if missing:
+            raise ValueError(f"Site table is missing columns: {', '.join(missing)}")
+        rows = rows[SITE_COLUMNS].copy()
+        for column in ["lat", "lon", "Insolation", "speed"]:
+            rows[column] = pd.to_numeric(rows[column], errors="coerce")
+        rows = rows.dropna(subset=["lat", "lon"])
+        rows = rows[rows["lat"].between(-90, 90) & rows["lon"].between(-180, 180)]
+
+        # dropna=False keeps sites with no City or District
+        sites = rows.groupby(["City", "District", "lat", "lon"], sort=False, as_index=False, dropna=False).agg(
+            insolation=("Insolation", "mean"),
+            insolation_min=("Insolation", "min"),
+            wind_speed=("speed", "mean"),
+            wind_speed_min=("speed", "min"),
+            months=("Insolation", "size"),
+        )
+        self.sites = sites.reset_index(drop=True)
+        self.lat = self.sites["lat"].to_numpy(dtype=float)
+        self.lon = self.sites["lon"].to_numpy(dtype=float)
+        self._tree = None
+
+    @classmethod
+    def from_csv(cls, path_or_buffer) -> "SiteTable":
+        return cls(pd.read_csv(path_or_buffer, skipinitialspace=True))
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> "SiteTable":
+        return cls(pd.DataFrame.from_records(records))
+
+    def __len__(self) -> int:
+        return len(self.sites)
+
+    @property
+    def tree(self) -> BallTree:
+        # BallTree takes (lat, lon) in radians
+        if self._tree is None:
+            self._tree = BallTree(np.radians(np.column_stack([self.lat, self.lon])), metric="haversine")
+        return self._tree
+
+    def within_radius(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions of sites within radius_km of (lat, lon) and their distances in km"""
+        if not len(self):
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        indices, distances = self.tree.query_radius(
+            np.radians([[lat, lon]]), r=radius_km / EARTH_RADIUS_KM, return_distance=True
+        )
+        return indices[0], distances[0] * EARTH_RADIUS_KM
+
+    def within_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> np.ndarray:
+        """Positions of sites inside a box; min_lon > max_lon wraps across 180°"""
+        lat_ok = (self.lat >= min_lat) & (self.lat <= max_lat)
+        if min_lon <= max_lon:
+            lon_ok = (self.lon >= min_lon) & (self.lon <= max_lon)
+        else:
+            lon_ok = (self.lon >= min_lon) | (self.lon <= max_lon)
+        return np.flatnonzero(lat_ok & lon_ok)
+
+
+_default_table: Tuple[Optional[float], Optional[SiteTable]] = (None, None)
+_default_table_lock = threading.Lock()
+
+
+def default_site_table(path: str = SITES_CSV) -> SiteTable:
+    """The SITES_CSV table with its BallTree built, reloaded when the file changes"""
+    global _default_table
+    mtime = os.path.getmtime(path)
+    with _default_table_lock:
+        if _default_table[0] != mtime:
+            table = SiteTable.from_csv(path)
+            if len(table):
+                table.tree
+            _default_table = (mtime, table)
+        return _default_table[1]
+
+
+def _text(value) -> Optional[str]:
+    return None if pd.isna(value) else str(value)
+
+
+def _number(value) -> Optional[float]:
+    # Sites without readings for a resource have NaN means; JSON has no NaN
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+def resource_score(insolation: np.ndarray, wind_speed: np.ndarray, solar_weight: float) -> np.ndarray:
+    """0-1 blend of solar and wind potential, solar_weight for solar"""
+    solar = np.clip(np.nan_to_num(insolation) / SOLAR_REFERENCE, 0.0, 1.0)
+    wind = np.clip(np.nan_to_num(wind_speed) / WIND_REFERENCE, 0.0, 1.0) ** 3
+    return solar_weight * solar + (1 - solar_weight) * wind
+
+
+def rank_sites(
+    table: SiteTable,
+    pipeline,
+    encoder,
+    plant,
+    k: int = 10,
+    center: Optional[Tuple[float, float, float]] = None,
+    bbox: Optional[Sequence[float]] = None,
+    solar_weight: float = 0.5,
+) -> Dict:
+    """
+    Top-k sites for a plant (a FeasibilityRequest).
+
+    Sites are first narrowed by center (lat, lon, radius_km) and bbox
+    (min_lat, min_lon, max_lat, max_lon). Every remaining site is scored in
+    one model pass. The score is the probability of "Yes" times the site's
+    resource score. The model has no site-level inputs, so its probability
+    is the same for every site, and the resource score sets the order.
+    """
+    candidates = np.arange(len(table))
+    distances = None
+    if center is not None:
+        candidates, distances = table.within_radius(*center)
+        order = np.argsort(candidates)
+        candidates, distances = candidates[order], distances[order]
+    if bbox is not None:
+        inside = np.isin(candidates, table.within_bbox(*bbox))
+        candidates = candidates[inside]
+        distances = distances[inside] if distances is not None else None
+
+    sites = table.sites.iloc[candidates]
+    X = np.tile(encoder.encode(plant), (len(candidates), 1))
+    if len(candidates):
+        labels, probabilities = pipeline.predict(X)
+        probability_yes = probabilities[:, list(pipeline.classes).index('Yes')]
+    else:
+        labels, probability_yes = np.empty(0, dtype=object), np.empty(0)
+    resource = resource_score(sites["insolation"].to_numpy(), sites["wind_speed"].to_numpy(), solar_weight)
+    scores = probability_yes * resource
+
+    top = min(k, len(candidates))
+    best = np.argpartition(-scores, top - 1)[:top] if top else np.empty(0, dtype=np.intp)
+    best = best[np.lexsort((candidates[best], -scores[best]))]
+
+    results = []
+    for i in best:
+        site = sites.iloc[i]
+        result = {
+            "city": _text(site["City"]),
+            "district": _text(site["District"]),
+            "lat": float(site["lat"]),
+            "lon": float(site["lon"]),
+            "score": float(scores[i]),
+            "probability_yes": float(probability_yes[i]),
+            "feasible": str(labels[i]),
+            "resource_score": float(resource[i]),
+            "insolation": _number(site["insolation"]),
+            "insolation_min": _number(site["insolation_min"]),
+            "wind_speed": _number(site["wind_speed"]),
+            "wind_speed_min": _number(site["wind_speed_min"]),
+        }
+        if distances is not None:
+            result["distance_km"] = float(distances[i])
+        results.append(result)
+    return {"sites_total": len(table), "sites_considered": int(len(candidates)), "results": results}
@@ -0,0 +1,63 @@
+# sweep.py
+import os
+import numpy as np
+from typing import Dict, List, Tuple
+
+# Request fields a sweep can vary
+SWEEP_FIELDS = ("capacity_mw", "investment_million", "co2_emissions", "year")
+
+# Grid limits per axis and per sweep
+MAX_SWEEP_STEPS = int(os.getenv("MAX_SWEEP_STEPS", "500"))
+MAX_SWEEP_POINTS = int(os.getenv("MAX_SWEEP_POINTS", "250000"))
+
+# Boundary points returned; the count reports how many were found
+MAX_BOUNDARY_POINTS = 2000
+
+
+def axis_values(field: str, start: float, stop: float, steps: int) -> np.ndarray:
+    values = np.linspace(start, stop, steps)
+    # Years are whole numbers in requests
+    return np.round(values) if field == "year" else values
+
+
+def build_grid(encoder, base_row: np.ndarray, axes: List[Tuple[str, np.ndarray]]) -> np.ndarray:
+    """Encoded rows for every grid point, first axis slowest"""
+    shape = [len(values) for _, values in axes]
+    X = np.tile(base_row, (int(np.prod(shape)), 1))
+    grids = np.meshgrid(*[values for _, values in axes], indexing="ij")
+    for (field, _), grid in zip(axes, grids):
+        encoder.set_numeric(X, field, grid.ravel())
+    return X
+
+
+def find_boundaries(
+    axes: List[Tuple[str, np.ndarray]],
+    probability_yes: np.ndarray,
+    feasible: np.ndarray,
+    limit: int = MAX_BOUNDARY_POINTS,
+) -> Tuple[List[Dict], int]:
+    """
+    Points where the prediction flips between neighbouring grid points,
+    along each axis with the others held fixed. The crossing is placed
+    where the linearly interpolated probability of "Yes" reaches 0.5.
+    """
+    points, found = [], 0
+    for axis, (field, values) in enumerate(axes):
+        flips = np.argwhere(np.diff(feasible.astype(np.int8), axis=axis) != 0)
+        found += len(flips)
+        for index in flips[: max(0, limit - len(points))]:
+            before = tuple(index)
+            after = tuple(i + 1 if a == axis else i for a, i in enumerate(index))
+            p0, p1 = probability_yes[before], probability_yes[after]
+            t = float(np.clip((0.5 - p0) / (p1 - p0), 0.0, 1.0)) if p1 != p0 else 0.5
+            v0, v1 = values[index[axis]], values[index[axis] + 1]
+            point = {
+                "field": field,
+                "value": float(v0 + t * (v1 - v0)),
+                "direction": "No->Yes" if feasible[after] else "Yes->No",
+            }
+            others = {name: float(vals[index[a]]) for a, (name, vals) in enumerate(axes) if a != axis}
+            if others:
+                point["at"] = others
+            points.append(point)
+    return points, found
@@ -0,0 +1,65 @@
+"""The exported artifact against the pickled pipeline it was built from"""
+import numpy as np
+import pytest
+
+import app as feasibility
+from export_model import MODEL_PATH, export
+from feature_encoder import FeatureEncoder
+from inference import FeasibilityPipeline, JoblibPipeline, load_pipeline
+
+
+@pytest.fixture(scope="module")
+def artifact_root(tmp_path_factory):
+    return str(tmp_path_factory.mktemp("artifacts"))
+
+
+@pytest.fixture(scope="module")
+def pipelines(artifact_root):
+    path = export(MODEL_PATH, artifact_root, activate=False)
+    return JoblibPipeline.load(MODEL_PATH), FeasibilityPipeline.load(path, verify=True)
+
+
+def sample(fused, rows=5000, seed=0):
+    """Rows around the scaler statistics at several spreads, plus encoded API requests"""
+    rng = np.random.default_rng(seed)
+    n = len(fused.selected_features)
+    X = fused.offset + fused.scale * rng.normal(size=(rows, n)) * rng.choice([0.5, 1.0, 3.0], size=(rows, 1))
+    binary = [i for i, name in enumerate(fused.selected_features) if name.startswith("Tech_")]
+    X[:, binary] = rng.integers(0, 2, size=(rows, len(binary)))
+
+    requests = [
+        feasibility.FeasibilityRequest(
+            capacity_mw=float(capacity), country=country, technology=technology, year=int(year),
+            investment_million=investment, energy_source=energy
+        )
+        for capacity, country, technology, year, investment, energy in zip(
+            rng.uniform(1, 1000, 500),
+            rng.choice(["Germany", "India", "USA", "Brazil"], 500),
+            rng.choice(["PEM", "ALK", "SOEC", "SMR", "PEM Electrolysis", "SOEC + SMR"], 500),
+            rng.integers(2015, 2036, 500),
+            rng.choice([None, 50.0, 800.0], 500),
+            rng.choice([None, "Renewable", "Natural gas"], 500),
+        )
+    ]
+    return np.vstack([X, FeatureEncoder(fused.selected_features).encode_many(requests)])
+
+
+def test_artifact_describes_the_pickle(pipelines):
+    pickled, fused = pipelines
+    assert list(fused.selected_features) == list(pickled.selected_features)
+    assert list(fused.classes) == list(pickled.classes)
+
+
+def test_artifact_predicts_like_the_pickle(pipelines):
+    pickled, fused = pipelines
+    X = sample(fused)
+    expected_labels, expected = pickled.predict(X)
+    labels, probabilities = fused.predict(X)
+    assert np.array_equal(labels, expected_labels)
+    assert np.array_equal(probabilities, expected)
+
+
+def test_current_artifact_is_served(artifact_root, pipelines):
+    assert isinstance(load_pipeline(artifact_root, MODEL_PATH), JoblibPipeline)
+    export(MODEL_PATH, artifact_root)
+    assert isinstance(load_pipeline(artifact_root, MODEL_PATH), FeasibilityPipeline)
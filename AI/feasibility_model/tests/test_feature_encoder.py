@@ -0,0 +1,69 @@
+"""FeatureEncoder against the feature-dict path it replaced"""
+import numpy as np
+import pytest
+
+import app as feasibility
+from feature_encoder import CATEGORIES, NUMERIC_FEATURES, FeatureEncoder
+
+EVERY_FEATURE = [name for name, _, _ in NUMERIC_FEATURES] + [
+    name for _, patterns, _ in CATEGORIES for name in patterns
+]
+
+NAN = float("nan")
+
+REQUESTS = [
+    dict(capacity_mw=100.0, country="Germany", technology="PEM", year=2024,
+         investment_million=150.0, energy_source="Renewable", co2_emissions=0.5, water_availability="High"),
+    dict(capacity_mw=5.0, country="india", technology="pem electrolysis", year=2030),
+    dict(capacity_mw=250.0, country="United Kingdom", technology="ATR + CCS", year=2028,
+         energy_source="Natural gas", water_availability="Medium"),
+    # Categories no pattern knows
+    dict(capacity_mw=40.0, country="Brazil", technology="Plasma pyrolysis", year=2026,
+         energy_source="Geothermal", water_availability="Scarce"),
+    dict(capacity_mw=1.0, country="", technology="", year=2020, energy_source="", water_availability=""),
+    # Zero optional values fall back to their defaults
+    dict(capacity_mw=0.0, country="USA", technology="SMR", year=2015, investment_million=0.0, co2_emissions=0.0),
+    # NaN inputs pass through to the model row unchanged
+    dict(capacity_mw=NAN, country="Japan", technology="SOEC", year=2035, investment_million=NAN, co2_emissions=NAN),
+]
+
+
+def reference(request, selected):
+    features = feasibility.extract_features_from_request(request)
+    return [
+        features[feature] if feature in features else feasibility.get_default_value(feature)
+        for feature in selected
+    ]
+
+
+@pytest.fixture(params=["model features", "every feature"])
+def selected(request):
+    if request.param == "every feature":
+        return EVERY_FEATURE
+    return feasibility.model_store.pipeline.selected_features
+
+
+@pytest.fixture
+def requests():
+    return [feasibility.FeasibilityRequest(**fields) for fields in REQUESTS]
+
+
+def test_encode_matches_feature_dict(selected, requests):
+    expected = np.array([reference(r, selected) for r in requests], dtype=float)
+    encoder = FeatureEncoder(selected)
+
+    assert np.array_equal(np.array([encoder.encode(r) for r in requests]), expected, equal_nan=True)
+    assert np.array_equal(encoder.encode_many(requests), expected, equal_nan=True)
+    # Again, now from the filled lookup tables
+    assert np.array_equal(encoder.encode_many(requests), expected, equal_nan=True)
+
+
+def test_set_numeric_matches_encode(requests):
+    encoder = FeatureEncoder(EVERY_FEATURE)
+    values = [120.0, 0.0, NAN, 3.5, 0.0, 7.0, NAN]
+    for _, field, _ in NUMERIC_FEATURES:
+        if field == "year":
+            continue
+        changed = [r.model_copy(update={field: v}) for r, v in zip(requests, values)]
+        X = encoder.set_numeric(encoder.encode_many(requests), field, values)
+        assert np.array_equal(X, encoder.encode_many(changed), equal_nan=True), field
@@ -1,138 +1,122 @@
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from PyPDF2 import PdfReader
-from langchain.prompts import PromptTemplate
-from langchain_community.vectorstores import FAISS
-from langchain.text_splitter import CharacterTextSplitter
-from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
-from langchain.chains import LLMChain
-import os
-from dotenv import load_dotenv
-
-# Load environment
-load_dotenv()
-google_api_key = os.getenv("GOOGLE_API_KEY")
-
-# FastAPI app
-app = FastAPI()
+from typing import Optional, Tuple
+from services.admin_api import build_admin_router
+from services.ingest_api import build_ingest_router
+from services.retrieval import get_service
+from services.routing import ROUTING_GRID_PATH, get_router, route_ends, route_facts
+from services.spatial_index import get_spatial_index, spatial_facts
+from services.streaming import context_headers, sse_response
 
 # Input schema
 class QueryRequest(BaseModel):
     question: str
     type: str 
-plant_template_str = """
-You are an expert advisor in hydrogen infrastructure planning.  
-Your task is to recommend an optimal location for setting up a hydrogen plant.  
-
-Inputs: Budget, Capacity, Preferred renewable source, Logistic preference.  
-
-Context:  
-{context}  
-
-User Question: {question}  
-
-Instructions:  
-- Recommend best possible plant location.  
-- Justify based on budget, capacity, renewable source, and logistics.  
-- If missing info, approximate reasonably from context.  
-- Generate a structured report with: Location, Justification, Risks, Alignment, Benefits.  
-"""
-
-storage_template_str = """
-You are tasked with recommending an optimal location for a hydrogen storage facility.  
-
-Inputs: Budget, Capacity, Technology (optional), Proximity Preference (plant/demand/port).  
-
-Context:  
-{context}  
-
-User Question: {question}  
-
-Instructions:  
-- Recommend best possible storage location.  
-- Justify based on technology, budget, and proximity preference.  
-- If missing info, approximate reasonably.  
-- Provide a structured report: Location, Rationale, Risks, Alignment.  
-"""
-
-distribution_hub_template_str = """
-You are tasked with recommending an optimal location for a hydrogen distribution hub.  
-
-Inputs: Budget, Capacity, Service Radius, Proximity Preference, Location Preference (optional), Land Requirement.  
-
-Context:  
-{context}  
-
-User Question: {question}  
-
-Instructions:  
-- Recommend feasible hub location(s).  
-- Justify considering demand centers, pipelines, land availability, and regulatory factors.  
-- Provide a structured report: Recommended Location(s), Rationale, Risks, Strategic Alignment.  
-"""
-
-pipeline_template_str = """
-You are a domain expert in pipeline planning.  
-
-Inputs: Capacity, Length Estimate, Route Preference.  
-
-Context:  
-{context}  
-
-User Question: {question}  
-
-Instructions:  
-- Predict feasible plant/pipeline route location(s).  
-- Approximate based on demand, geography, and infrastructure context.  
-- Provide a structured report: Suggested Location, Justification, Risks, Alignment.  
-"""
-
-pdf_paths = [
-    "backend/src/FastAPI/PIPELINE.pdf",
-    "backend/src/FastAPI/STORAGE.pdf",
-    "backend/src/FastAPI/Distribution_Hub.pdf",
-    "backend/src/FastAPI/Plant_asset.pdf"
-]
-
-raw_text = ""
-for path in pdf_paths:
-    pdfreader = PdfReader(path)
-    for page in pdfreader.pages:
-        content = page.extract_text()
-        if content:
-            raw_text += content + "\n"
-
-text_splitter = CharacterTextSplitter(
-    separator="\n", chunk_size=1000, chunk_overlap=200, length_function=len,
-)
-texts = text_splitter.split_text(raw_text)
-
-embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001",google_api_key=google_api_key)
-document_search = FAISS.from_texts(texts, embeddings)
-
-llm = ChatGoogleGenerativeAI(model="gemini-1.5-flash", temperature=0.0, google_api_key=google_api_key)
-
-@app.post("/ask")
-def ask_question(req: QueryRequest):
-    # Retrieve docs
-    docs = document_search.similarity_search(req.question)
-    context = "\n".join([d.page_content for d in docs])
-
+    # Optional geometry; otherwise read from the question's Location,
+    # Service Radius and Proximity/Logistic Preference lines
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    radius_km: Optional[float] = None
+    proximity: Optional[str] = None
+    # Pipeline ends as [lat, lon]; otherwise read from Origin/Destination
+    # lines or a Location naming two places
+    origin: Optional[Tuple[float, float]] = None
+    destination: Optional[Tuple[float, float]] = None
+
+class RouteRequest(BaseModel):
+    origin: Tuple[float, float]
+    destination: Tuple[float, float]
+
+logger = logging.getLogger(__name__)
+
+# Asset reports come from the "assets" corpus of the shared retrieval service,
+# one partition per asset type
+service = get_service()
+asset_types = service.templates("assets")
+
+router = APIRouter()
+
+
+def request_facts(req: QueryRequest, asset_type: str) -> Optional[str]:
+    """
+    Nearby known assets for the prompt context, if the request has a
+    location, and for pipelines the least-cost route between its ends.
+    Blocking: loads the asset and grid files when they change.
+    """
+    try:
+        index = get_spatial_index()
+        route_engine = get_router() if asset_type == "pipeline" else None
+    except (OSError, ValueError) as e:
+        logger.warning("Spatial data unavailable: %s", e)
+        return None
+    facts = [spatial_facts(index, req.question, req.lat, req.lon, req.radius_km, req.proximity)]
+    if route_engine is not None:
+        ends = (req.origin, req.destination) if req.origin and req.destination else route_ends(index, req.question)
+        if ends is not None:
+            try:
+                facts.append(route_facts(route_engine.route(tuple(ends[0]), tuple(ends[1]))))
+            except ValueError as e:
+                logger.info("No route for the pipeline request: %s", e)
+    facts = [f for f in facts if f]
+    return "\n\n".join(facts) if facts else None
+
+
+@router.post("/ask")
+async def ask_question(req: QueryRequest, response: Response):
     # Select template dynamically
-    templates = {
-        "plant": plant_template_str,
-        "storage": storage_template_str,
-        "distribution_hub": distribution_hub_template_str,
-        "pipeline": pipeline_template_str,
-    }
-
-    template_str = templates.get(req.type.lower())
-    if not template_str:
-        return {"error": f"Invalid asset type: {req.type}. Must be one of {list(templates.keys())}"}
-
-    custom_prompt = PromptTemplate(template=template_str, input_variables=["context", "question"])
-    qa_chain = LLMChain(llm=llm, prompt=custom_prompt)
-
-    # Run chain
-    response = qa_chain.run(context=context, question=req.question)
-    return {"answer": response}
+    asset_type = req.type.lower()
+    if asset_type not in asset_types:
+        return {"error": f"Invalid asset type: {req.type}. Must be one of {asset_types}"}
+
+    facts = await run_in_threadpool(request_facts, req, asset_type)
+    answer, report = await service.answer("assets", asset_type, req.question, partition=asset_type, facts=facts)
+    response.headers.update(context_headers(report))
+    return {"answer": answer}
+
+
+@router.post("/ask/stream")
+async def ask_question_stream(req: QueryRequest):
+    """Same as /ask, but sends the report as server-sent events while it is generated"""
+    asset_type = req.type.lower()
+    if asset_type not in asset_types:
+        return {"error": f"Invalid asset type: {req.type}. Must be one of {asset_types}"}
+
+    facts = await run_in_threadpool(request_facts, req, asset_type)
+    return sse_response(
+        await service.stream("assets", asset_type, req.question, partition=asset_type, facts=facts)
+    )
+
+
+@router.post("/route")
+def pipeline_route(req: RouteRequest):
+    """Least-cost pipeline route between two [lat, lon] points over the cost grid"""
+    try:
+        route_engine = get_router()
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=503, detail=f"Cost grid failed to load: {str(e)}")
+    if route_engine is None:
+        raise HTTPException(status_code=503, detail=f"No cost grid at {ROUTING_GRID_PATH}")
+    try:
+        route = route_engine.route(req.origin, req.destination)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if route is None:
+        raise HTTPException(status_code=404, detail="No passable route joins origin and destination")
+    return route
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Indexes load in the background so the port binds immediately
+    service.load(["assets"])
+    yield
+
+
+# FastAPI app serving only /ask; server.py hosts every corpus in one process
+app = FastAPI(lifespan=lifespan)
+app.include_router(router)
+app.include_router(build_ingest_router(lambda: service.ready_corpus("assets"), on_change=service.answer_cache.clear))
+app.include_router(build_admin_router(service, ["assets"]))
@@ -0,0 +1,66 @@
+"""
+Per-request overhead of building PromptTemplate + LLMChain on every call,
+compared with looking up a chain compiled once by ChainRegistry.
+
+Uses a fake LLM with no latency so only the framework overhead is timed.
+
+    python backend/src/FastAPI/benchmarks/bench_chain_registry.py
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from langchain.chains import LLMChain
+from langchain.prompts import PromptTemplate
+from langchain_community.llms.fake import FakeListLLM
+
+from services.chains import TEMPLATE_DIR, ChainRegistry
+
+ASSET_TYPES = ["plant", "storage", "distribution_hub", "pipeline"]
+CONTEXT = "Hazira storage: 2.5 million cubic meters. " * 60
+QUESTION = "Best location for a 100MW PEM plant in Gujarat"
+
+
+def per_request(llm, sources, asset_type):
+    # What ask_question used to do on every call
+    templates = {name: sources[name] for name in ASSET_TYPES}
+    prompt = PromptTemplate(template=templates[asset_type], input_variables=["context", "question"])
+    return LLMChain(llm=llm, prompt=prompt)
+
+
+def timed(fn, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(ASSET_TYPES[i % len(ASSET_TYPES)])
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")
+
+    llm = FakeListLLM(responses=["ok"])
+    sources = {}
+    for name in ASSET_TYPES:
+        with open(os.path.join(TEMPLATE_DIR, f"{name}.txt"), "r", encoding="utf-8") as f:
+            sources[name] = f.read()
+    registry = ChainRegistry(llm, ASSET_TYPES)
+
+    build = timed(lambda t: per_request(llm, sources, t), args.iterations)
+    lookup = timed(registry.chain, args.iterations)
+    print(f"construct chain per request: {build:8.1f} us")
+    print(f"registry lookup:             {lookup:8.1f} us")
+
+    run = timed(lambda t: registry.chain(t).run(context=CONTEXT, question=QUESTION), args.iterations // 5)
+    print(f"chain run (fake LLM):        {run:8.1f} us")
+    print(f"overhead removed per request: {build - lookup:.1f} us ({(build - lookup) / (build + run):.0%} of a fake-LLM request)")
+
+
+if __name__ == "__main__":
+    main()
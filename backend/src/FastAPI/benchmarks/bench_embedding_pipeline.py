@@ -0,0 +1,90 @@
+"""
+Compare sequential embedding with the batched, concurrent pipeline, and
+check that an interrupted run resumes from its checkpoint.
+
+Runs offline with StubEmbeddings; --latency simulates one API round trip.
+
+    python backend/src/FastAPI/benchmarks/bench_embedding_pipeline.py
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from services.embedding_pipeline import EmbeddingPipeline, StubEmbeddings
+from services.pdf_extract import StreamingSplitter
+
+FASTAPI_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+PDFS = ["PIPELINE.pdf", "STORAGE.pdf", "Distribution_Hub.pdf", "Plant_asset.pdf"]
+
+
+class SimulatedCrash(RuntimeError):
+    pass
+
+
+class FlakyEmbeddings(StubEmbeddings):
+    """Fails hard after a number of calls, like a process killed mid-ingest"""
+
+    def __init__(self, fail_after: int, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+        self.fail_after = fail_after
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        if self.fail_after and self.calls > self.fail_after:
+            raise SimulatedCrash("simulated crash")
+        return super().embed_documents(texts)
+
+
+def load_chunks():
+    splitter = StreamingSplitter(separator="\n", chunk_size=1000, chunk_overlap=200)
+    texts = []
+    for name in PDFS:
+        texts.extend(splitter.split_pdf(os.path.join(FASTAPI_DIR, name)))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per embedding call")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    texts = load_chunks()
+    print(f"{len(texts)} chunks from {len(PDFS)} PDFs, {args.latency * 1000:.0f} ms per call")
+
+    embeddings = StubEmbeddings(latency=args.latency)
+    start = time.perf_counter()
+    for i in range(0, len(texts), args.batch_size):
+        embeddings.embed_documents(texts[i:i + args.batch_size])
+    sequential = time.perf_counter() - start
+    print(f"sequential batches:  {sequential:.2f}s")
+
+    pipeline = EmbeddingPipeline(embeddings, batch_size=args.batch_size, concurrency=args.concurrency)
+    start = time.perf_counter()
+    pipeline.embed(texts)
+    concurrent = time.perf_counter() - start
+    print(f"pipeline (x{args.concurrency}):     {concurrent:.2f}s  ({sequential / concurrent:.1f}x faster)")
+
+    with tempfile.TemporaryDirectory() as checkpoint_dir:
+        batches = -(-len(texts) // args.batch_size)
+        flaky = FlakyEmbeddings(fail_after=batches // 2, latency=0.0)
+        interrupted = EmbeddingPipeline(
+            flaky, batch_size=args.batch_size, concurrency=1, max_retries=0, checkpoint_dir=checkpoint_dir
+        )
+        try:
+            interrupted.embed(texts, checkpoint_key="bench")
+        except SimulatedCrash:
+            pass
+        resumed = FlakyEmbeddings(fail_after=0, latency=0.0)
+        EmbeddingPipeline(resumed, batch_size=args.batch_size, checkpoint_dir=checkpoint_dir).embed(texts, checkpoint_key="bench")
+        print(f"resume: {flaky.fail_after} batch(es) done before crash, {resumed.calls} of {batches} re-run after restart")
+
+
+if __name__ == "__main__":
+    main()
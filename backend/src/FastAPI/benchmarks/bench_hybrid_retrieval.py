@@ -0,0 +1,103 @@
+"""
+Retrieval quality and latency of vector-only, BM25-only, fused and
+fused + reranked (hybrid) search over the bundled PDFs.
+
+Queries come from lines of the documents: "keyword" queries keep only the
+rarest terms of a line (scheme names, figures, places), "line" queries
+use the whole line. A hit is any chunk containing that line. Runs offline
+with StubEmbeddings, which are far weaker than the real model, so compare
+the vector column with caution and the others with each other.
+
+    python backend/src/FastAPI/benchmarks/bench_hybrid_retrieval.py --k 4
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from services.corpus import Corpus
+from services.embedding_pipeline import StubEmbeddings
+from services.hybrid import HybridRetriever, tokenize
+from services.index_store import IndexStore
+
+FASTAPI_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+PDFS = ["hydrogen.pdf", "PIPELINE.pdf", "STORAGE.pdf", "Distribution_Hub.pdf", "Plant_asset.pdf"]
+SPLITTER_PARAMS = {"separator": "\n", "chunk_size": 1192, "chunk_overlap": 200}
+
+
+def make_queries(retriever, count, rng):
+    """(kind, query text, source line)"""
+    bm25, docs, _ = retriever._bm25()
+    queries = []
+    while len(queries) < count:
+        doc = rng.choice(docs)
+        lines = [line.strip() for line in doc.page_content.split("\n") if len(tokenize(line)) >= 6]
+        if not lines:
+            continue
+        line = rng.choice(lines)
+        rare = sorted(set(tokenize(line)), key=bm25.idf, reverse=True)[:4]
+        rng.shuffle(rare)
+        queries.append(("keyword", " ".join(rare), line))
+        queries.append(("line", line, line))
+    return queries
+
+
+def evaluate(search, queries, k):
+    results = {}
+    for kind in ("keyword", "line"):
+        recall, rr, latencies = [], [], []
+        for _, text, line in (q for q in queries if q[0] == kind):
+            start = time.perf_counter()
+            docs = search(text)[:k]
+            latencies.append((time.perf_counter() - start) * 1e6)
+            ranks = [i for i, d in enumerate(docs) if line in d.page_content]
+            recall.append(bool(ranks))
+            rr.append(1 / (ranks[0] + 1) if ranks else 0.0)
+        latencies.sort()
+        results[kind] = {
+            "recall": statistics.mean(recall),
+            "mrr": statistics.mean(rr),
+            "p50_us": latencies[len(latencies) // 2],
+            "p95_us": latencies[int(len(latencies) * 0.95)],
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--fetch-k", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    embeddings = StubEmbeddings()
+    paths = [os.path.join(FASTAPI_DIR, name) for name in PDFS]
+    with tempfile.TemporaryDirectory() as root:
+        corpus = Corpus("bench", paths, SPLITTER_PARAMS, embeddings, "stub", index_store=IndexStore(root))
+    retriever = HybridRetriever(corpus, k=args.k, fetch_k=args.fetch_k)
+    bm25, docs, _ = retriever._bm25()
+
+    queries = make_queries(retriever, args.queries // 2, random.Random(args.seed))
+    vectors = {text: embeddings.embed_query(text) for _, text, _ in queries}
+    methods = {
+        "vector": lambda q: corpus.similarity_search_by_vector(vectors[q], k=args.k),
+        "bm25": lambda q: [docs[i] for i, _ in bm25.search(q, args.k)],
+        "fused": lambda q: retriever.search_by_vector(q, vectors[q], fusion_only=True),
+        "hybrid": lambda q: retriever.search_by_vector(q, vectors[q]),
+    }
+
+    print(f"{len(docs)} chunks, {len(queries)} queries, k={args.k}, fetch_k={args.fetch_k}")
+    print(f"{'method':<8} {'queries':<8} {'recall':>7} {'mrr':>6} {'p50 us':>8} {'p95 us':>8}")
+    for name, search in methods.items():
+        for kind, r in evaluate(search, queries, args.k).items():
+            print(f"{name:<8} {kind:<8} {r['recall']:>7.3f} {r['mrr']:>6.3f} {r['p50_us']:>8.1f} {r['p95_us']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
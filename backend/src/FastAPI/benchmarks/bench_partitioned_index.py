@@ -0,0 +1,97 @@
+"""
+Retrieval precision, recall and latency of one merged asset index versus
+one index per asset type routed by the request's `type`.
+
+Queries are sentences taken from each asset document; a hit is the chunk
+they came from. Runs offline with StubEmbeddings.
+
+    python backend/src/FastAPI/benchmarks/bench_partitioned_index.py
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from services.corpus import Corpus, PartitionedCorpus
+from services.embedding_pipeline import StubEmbeddings
+from services.index_store import IndexStore
+
+FASTAPI_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+ASSET_PDFS = {
+    "pipeline": "PIPELINE.pdf",
+    "storage": "STORAGE.pdf",
+    "distribution_hub": "Distribution_Hub.pdf",
+    "plant": "Plant_asset.pdf",
+}
+ASSET_TYPE_OF = {name: asset_type for asset_type, name in ASSET_PDFS.items()}
+SPLITTER_PARAMS = {"separator": "\n", "chunk_size": 1000, "chunk_overlap": 200}
+
+
+def make_queries(partitioned, per_type, rng):
+    """(asset type, query text, chunk id it was drawn from)"""
+    queries = []
+    for asset_type, corpus in partitioned.partitions.items():
+        store, _ = corpus._state
+        docs = [store.docstore.search(doc_id) for doc_id in store.index_to_docstore_id.values()]
+        for doc in rng.sample(docs, min(per_type, len(docs))):
+            lines = [line for line in doc.page_content.split("\n") if len(line.split()) >= 6]
+            if lines:
+                queries.append((asset_type, rng.choice(lines), doc.metadata["chunk_id"]))
+    return queries
+
+
+def evaluate(search, queries, k):
+    precision, recall, latencies = [], [], []
+    for asset_type, text, chunk_id in queries:
+        start = time.perf_counter()
+        docs = search(text, asset_type)
+        latencies.append((time.perf_counter() - start) * 1e6)
+        precision.append(sum(ASSET_TYPE_OF[d.metadata["source"]] == asset_type for d in docs) / k)
+        recall.append(any(d.metadata["chunk_id"] == chunk_id for d in docs))
+    latencies.sort()
+    return {
+        "precision": statistics.mean(precision),
+        "recall": statistics.mean(recall),
+        "p50_us": latencies[len(latencies) // 2],
+        "p95_us": latencies[int(len(latencies) * 0.95)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--queries-per-type", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    embeddings = StubEmbeddings()
+    paths = {t: [os.path.join(FASTAPI_DIR, name)] for t, name in ASSET_PDFS.items()}
+    with tempfile.TemporaryDirectory() as root:
+        store = IndexStore(root)
+        partitioned = PartitionedCorpus("assets", paths, SPLITTER_PARAMS, embeddings, "stub", index_store=store)
+        merged = Corpus(
+            "merged", [p for group in paths.values() for p in group], SPLITTER_PARAMS, embeddings, "stub", index_store=store
+        )
+
+        queries = make_queries(partitioned, args.queries_per_type, random.Random(args.seed))
+        vectors = {text: embeddings.embed_query(text) for _, text, _ in queries}
+        results = {
+            "merged": evaluate(lambda q, t: merged.similarity_search_by_vector(vectors[q], k=args.k), queries, args.k),
+            "partitioned": evaluate(
+                lambda q, t: partitioned.similarity_search_by_vector(vectors[q], k=args.k, partition=t), queries, args.k
+            ),
+        }
+
+    print(f"{len(queries)} queries, k={args.k}")
+    print(f"{'index':<12} {'precision':>9} {'recall':>7} {'p50 us':>8} {'p95 us':>8}")
+    for name, r in results.items():
+        print(f"{name:<12} {r['precision']:>9.3f} {r['recall']:>7.3f} {r['p50_us']:>8.1f} {r['p95_us']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Least-cost pipeline routing on synthetic state-scale cost grids: graph
+build time, cold routes (bounded Dijkstra) against an unbounded Dijkstra
+from the same origin, and repeated origin/destination pairs served from
+the route cache. Every bounded route's cost is checked against the
+unbounded search.
+
+    python backend/src/FastAPI/benchmarks/bench_routing.py --sizes 250 500 1000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+from scipy.ndimage import gaussian_filter
+from scipy.sparse.csgraph import dijkstra
+
+from services.routing import CostGrid, Router
+
+NORTH, WEST, CELL_DEG = 24.7, 68.1, 0.01
+
+
+def synthetic_cost(size, rng):
+    """Smooth terrain costing 1-5 per km, with about 1% impassable cells (lakes, reserves)"""
+    terrain = gaussian_filter(rng.random((size, size)), size / 75)
+    terrain = (terrain - terrain.min()) / (terrain.max() - terrain.min())
+    cost = 1 + 4 * terrain ** 2
+    blocked = gaussian_filter(rng.random((size, size)), size / 60)
+    cost[blocked > np.quantile(blocked, 0.99)] = np.inf
+    return cost
+
+
+def random_point(rng, size):
+    return NORTH - rng.uniform(0, size * CELL_DEG), WEST + rng.uniform(0, size * CELL_DEG)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[250, 500, 1000])
+    parser.add_argument("--routes", type=int, default=20)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    print(f"{'grid':>10} {'cells':>9} {'build ms':>9} {'route p50/max ms':>17} {'unbounded p50 ms':>17} {'cached us':>10}")
+    for size in args.sizes:
+        cost = synthetic_cost(size, rng)
+        start = time.perf_counter()
+        grid = CostGrid(cost, NORTH, WEST, CELL_DEG)
+        build = time.perf_counter() - start
+        router = Router(grid)
+
+        pairs = [(random_point(rng, size), random_point(rng, size)) for _ in range(args.routes)]
+        cold, unbounded, cached = [], [], []
+        for origin, destination in pairs:
+            start = time.perf_counter()
+            route = router.route(origin, destination)
+            cold.append(time.perf_counter() - start)
+
+            source, target = grid.snap(*origin), grid.snap(*destination)
+            start = time.perf_counter()
+            full = dijkstra(grid.graph, directed=False, indices=source)[target]
+            unbounded.append(time.perf_counter() - start)
+            if route is None:
+                assert not np.isfinite(full)
+            else:
+                assert abs(route["cost"] - full) < 1e-3, "bounded search missed the least-cost route"
+
+            start = time.perf_counter()
+            router.route(destination, origin)
+            cached.append(time.perf_counter() - start)
+
+        print(
+            f"{f'{size}x{size}':>10} {size * size:>9} {build * 1000:>9.0f} "
+            f"{'%.0f / %.0f' % (statistics.median(cold) * 1000, max(cold) * 1000):>17} "
+            f"{statistics.median(unbounded) * 1000:>17.0f} {statistics.median(cached) * 1e6:>10.0f}"
+        )
+    print("every route matches the unbounded search")
+
+
+if __name__ == "__main__":
+    main()
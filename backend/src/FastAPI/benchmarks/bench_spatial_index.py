@@ -0,0 +1,86 @@
+"""
+Query latency of SpatialIndex as the number of assets grows, against a
+brute-force haversine scan over the same points. Assets are random points
+over South Asia spread across a few kinds; every query's answer is checked
+against the scan.
+
+    python backend/src/FastAPI/benchmarks/bench_spatial_index.py --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from services.spatial_index import EARTH_RADIUS_KM, SpatialIndex
+
+KINDS = ["plant", "demand", "port", "renewable"]
+
+
+def make_assets(n, rng):
+    lat, lon = rng.uniform(5, 37, n), rng.uniform(60, 98, n)
+    kinds = rng.choice(KINDS, n)
+    return [{"kind": k, "name": f"{k}-{i}", "lat": a, "lon": o} for i, (k, a, o) in enumerate(zip(kinds, lat, lon))]
+
+
+def haversine_km(lat, lon, lat0, lon0):
+    lat, lon, lat0, lon0 = map(np.radians, (lat, lon, lat0, lon0))
+    h = np.sin((lat - lat0) / 2) ** 2 + np.cos(lat) * np.cos(lat0) * np.sin((lon - lon0) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(h))
+
+
+def percentiles(seconds):
+    ordered = sorted(seconds)
+    return ordered[len(ordered) // 2] * 1e6, ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 500000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--radius", type=float, default=50.0)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    print(f"{'assets':>8} {'build ms':>9} {'knn p50/p99 us':>16} {'radius p50/p99 us':>18} {'scan p50 us':>12} {'in radius':>10}")
+    for n in args.sizes:
+        assets = make_assets(n, rng)
+        start = time.perf_counter()
+        index = SpatialIndex(assets)
+        build = time.perf_counter() - start
+
+        kinds = np.array([a["kind"] for a in index.assets])
+        ports, demand = np.flatnonzero(kinds == "port"), kinds == "demand"
+        queries = np.column_stack([rng.uniform(5, 37, args.queries), rng.uniform(60, 98, args.queries)])
+        knn, radius, scan, found = [], [], [], 0
+        for lat, lon in queries:
+            start = time.perf_counter()
+            nearest = index.nearest(lat, lon, k=args.k, kind="port")
+            knn.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            count, _ = index.within_radius(lat, lon, args.radius, kind="demand", limit=args.k)
+            radius.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            distances = haversine_km(index.lat, index.lon, lat, lon)
+            scan.append(time.perf_counter() - start)
+
+            best = np.sort(distances[ports])[: args.k]
+            assert np.allclose([a["distance_km"] for a in nearest], best, atol=1e-3), "nearest disagrees with scan"
+            assert count == int(np.sum(demand & (distances <= args.radius))), "radius count disagrees with scan"
+            found += count
+
+        print(
+            f"{n:>8} {build * 1000:>9.1f} {'%.0f / %.0f' % percentiles(knn):>16} "
+            f"{'%.0f / %.0f' % percentiles(radius):>18} {percentiles(scan)[0]:>12.0f} {found / args.queries:>10.1f}"
+        )
+    print("all answers match the brute-force scan")
+
+
+if __name__ == "__main__":
+    main()
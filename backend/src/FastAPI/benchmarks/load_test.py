@@ -0,0 +1,192 @@
+"""
+Open-loop load test for /ask, /chat and /predict-feasibility.
+
+Requests are fired on a fixed (or Poisson) schedule at the target rate,
+whether or not earlier ones have finished, and latency percentiles and
+throughput are reported per endpoint.
+
+Against running servers:
+
+    RAG_BACKEND=fake uvicorn server:app --app-dir backend/src/FastAPI --port 8000
+    python backend/src/FastAPI/benchmarks/load_test.py --rps 20 --duration 30 \\
+        --rag-url http://localhost:8000 --feasibility-url http://localhost:8001
+
+Or fully offline, with the apps mounted in this process on the fake backend:
+
+    python backend/src/FastAPI/benchmarks/load_test.py --in-process --rps 20
+"""
+import argparse
+import asyncio
+import importlib.util
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+FASTAPI_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+FEASIBILITY_DIR = os.path.join(FASTAPI_DIR, "..", "..", "..", "AI", "feasibility_model")
+
+ASSET_TYPES = ["plant", "storage", "distribution_hub", "pipeline"]
+PLACES = ["Gujarat", "Odisha", "Tamil Nadu", "Rajasthan", "Kerala", "Maharashtra", "Andhra Pradesh", "Karnataka"]
+ASK_QUESTIONS = [
+    "Best location for a {mw} MW PEM plant in {place}",
+    "Storage options near {place} for {mw} tonnes per day",
+    "Pipeline route from {place} to the nearest port for {mw} MW",
+    "Distribution hub sizing for {place} demand of {mw} tonnes",
+]
+CHAT_QUESTIONS = [
+    "What incentives does {place} offer for green hydrogen projects above {mw} MW?",
+    "What is the national green hydrogen production target and how does {place} contribute?",
+    "Which SIGHT scheme components apply to a {mw} MW electrolyser in {place}?",
+]
+TECHNOLOGIES = ["PEM", "ALK", "SOEC", "SMR", "Electrolysis"]
+COUNTRIES = ["Germany", "India", "USA", "Spain", "Australia", "Japan"]
+
+
+def question(templates, rng, pool, repeat):
+    # A share of repeats from a small pool exercises the answer cache
+    if pool and rng.random() < repeat:
+        return rng.choice(pool)
+    text = rng.choice(templates).format(mw=rng.randint(5, 2000), place=rng.choice(PLACES))
+    pool.append(text)
+    del pool[:-20]
+    return text
+
+
+def ask_payload(rng, pool, repeat):
+    return {"question": question(ASK_QUESTIONS, rng, pool, repeat), "type": rng.choice(ASSET_TYPES)}
+
+
+def chat_payload(rng, pool, repeat):
+    return {"question": question(CHAT_QUESTIONS, rng, pool, repeat)}
+
+
+def predict_payload(rng, pool, repeat):
+    return {
+        "capacity_mw": round(rng.uniform(1, 1000), 1),
+        "country": rng.choice(COUNTRIES),
+        "technology": rng.choice(TECHNOLOGIES),
+        "year": rng.randint(2015, 2035),
+        "investment_million": round(rng.uniform(10, 2000), 1),
+        "energy_source": rng.choice(["Renewable", "Natural gas", "Nuclear"]),
+        "water_availability": rng.choice(["High", "Medium", "Low"]),
+    }
+
+
+# endpoint -> (target service, path, payload factory)
+ENDPOINTS = {
+    "ask": ("rag", "/ask", ask_payload),
+    "chat": ("rag", "/chat", chat_payload),
+    "predict": ("feasibility", "/predict-feasibility", predict_payload),
+}
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+async def one_request(client, path, payload, results):
+    start = time.perf_counter()
+    try:
+        response = await client.post(path, json=payload)
+        status = response.status_code
+    except httpx.TimeoutException:
+        status = "timeout"
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    results.append((status, time.perf_counter() - start))
+
+
+async def run_phase(client, path, factory, args, rng):
+    loop = asyncio.get_running_loop()
+    results, tasks, pool = [], [], []
+    start = loop.time()
+    offset = 0.0
+    while offset < args.duration:
+        delay = start + offset - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        payload = factory(rng, pool, args.repeat)
+        tasks.append(asyncio.create_task(one_request(client, path, payload, results)))
+        offset += rng.expovariate(args.rps) if args.arrival == "poisson" else 1 / args.rps
+    await asyncio.gather(*tasks)
+    return results, loop.time() - start
+
+
+def report(name, results, elapsed):
+    statuses = Counter(status for status, _ in results)
+    ok = sorted(latency for status, latency in results if isinstance(status, int) and status < 400)
+    print(
+        f"{name:<8} {len(results):>6} {len(ok) / elapsed:>9.1f} "
+        f"{percentile(ok, 0.50) * 1000:>8.1f} {percentile(ok, 0.95) * 1000:>8.1f} {percentile(ok, 0.99) * 1000:>8.1f}  "
+        + ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items(), key=str))
+    )
+
+
+def in_process_apps():
+    """ASGI apps of both services on the offline backend"""
+    os.environ.setdefault("RAG_BACKEND", "fake")
+    sys.path.append(FASTAPI_DIR)
+    import server
+
+    # No lifespan under ASGITransport; build the corpora before timing anything
+    for name in server.CORPORA:
+        server.service.corpus(name)
+
+    # app.py imports its sibling modules
+    sys.path.append(FEASIBILITY_DIR)
+    spec = importlib.util.spec_from_file_location("feasibility_app", os.path.join(FEASIBILITY_DIR, "app.py"))
+    feasibility = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(feasibility)
+    return {"rag": server.app, "feasibility": feasibility.app}
+
+
+async def main_async(args):
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    if args.in_process:
+        apps = in_process_apps()
+        clients = {
+            name: httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=timeout)
+            for name, app in apps.items()
+        }
+    else:
+        urls = {"rag": args.rag_url, "feasibility": args.feasibility_url}
+        clients = {name: httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) for name, url in urls.items()}
+
+    rng = random.Random(args.seed)
+    print(f"target {args.rps} req/s for {args.duration}s per endpoint, {args.arrival} arrivals")
+    print(f"{'endpoint':<8} {'sent':>6} {'ok req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+    try:
+        for name in args.endpoints:
+            service, path, factory = ENDPOINTS[name]
+            results, elapsed = await run_phase(clients[service], path, factory, args, rng)
+            report(name, results, elapsed)
+    finally:
+        for client in clients.values():
+            await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument("--rps", type=float, default=10.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per endpoint")
+    parser.add_argument("--arrival", choices=["constant", "poisson"], default="poisson")
+    parser.add_argument("--repeat", type=float, default=0.2, help="Share of questions repeated from recent ones")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--max-connections", type=int, default=500)
+    parser.add_argument("--rag-url", default=os.getenv("RAG_URL", "http://localhost:8000"))
+    parser.add_argument("--feasibility-url", default=os.getenv("FEASIBILITY_URL", "http://localhost:8001"))
+    parser.add_argument("--in-process", action="store_true", help="Serve the apps in this process on RAG_BACKEND=fake")
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
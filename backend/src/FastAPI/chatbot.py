@@ -1,83 +1,56 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI, Response
 from pydantic import BaseModel
-from PyPDF2 import PdfReader
 from fastapi.middleware.cors import CORSMiddleware
-from langchain.prompts import PromptTemplate
-from langchain_community.vectorstores import FAISS
-from langchain.text_splitter import CharacterTextSplitter
-from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
-from langchain.chains import LLMChain
 from typing import Optional
-import os
-from dotenv import load_dotenv
+from services.admin_api import build_admin_router
+from services.ingest_api import build_ingest_router
+from services.retrieval import get_service
+from services.streaming import context_headers, sse_response
 
-load_dotenv()
-google_api_key = os.getenv("GOOGLE_API_KEY")
 class QueryRequest(BaseModel):
     question: str
     type: Optional[str] = None
-app = FastAPI()
+
 origins = [
     "http://localhost:5173",    
     "https://h2grid.vercel.app" 
 ]
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,        
-    allow_credentials=True,
-    allow_methods=["*"],           
-    allow_headers=["*"],           
-)
 
-pdf_paths = [
-    "backend/src/FastAPI/green-h2.pdf",
-    "backend/src/FastAPI/hydrogen.pdf"
-]
+# Policy questions come from the "policy" corpus of the shared retrieval service
+service = get_service()
 
-raw_text = ""
-for path in pdf_paths:
-    pdfreader = PdfReader(path)
-    for page in pdfreader.pages:
-        content = page.extract_text()
-        if content:
-            raw_text += content + "\n"
+router = APIRouter()
 
-text_splitter = CharacterTextSplitter(
-    separator="\n", chunk_size=1192, chunk_overlap=200, length_function=len,
-)
-texts = text_splitter.split_text(raw_text)
+@router.post("/chat")
+async def ask_question(req: QueryRequest, response: Response):
+    answer, report = await service.answer("policy", "chat", req.question)
+    response.headers.update(context_headers(report))
+    return {"answer": answer}
 
-embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001",google_api_key=google_api_key)
-document_search = FAISS.from_texts(texts, embeddings)
 
-llm = ChatGoogleGenerativeAI(model="gemini-1.5-flash", temperature=0.0, google_api_key=google_api_key)
+@router.post("/chat/stream")
+async def ask_question_stream(req: QueryRequest):
+    """Same as /chat, but sends the answer as server-sent events while it is generated"""
+    return sse_response(await service.stream("policy", "chat", req.question))
 
-@app.post("/chat")
-def ask_question(req: QueryRequest):
-    # Retrieve docs
-    docs = document_search.similarity_search(req.question)
-    context = "\n".join([d.page_content for d in docs])
-    template_str="""
-    You are an expert assistant specialized in answering questions about Hydrogen and Green Hydrogen in India. 
-    Use the provided context from documents to answer the question as accurately as possible. 
 
-    Context:
-    {context}
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Indexes load in the background so the port binds immediately
+    service.load(["policy"])
+    yield
 
-    Question:
-   {question}
 
-    Instructions:
-    - Only use facts from the context to answer.
-    - If the answer is not found in the context, say: 
-    "I could not find this information in the provided documents."
-    - Keep the answer clear, structured, and concise.
-    - If relevant, mention specific policies, targets, or projects.
-
-    Answer:
-"""
-    custom_prompt = PromptTemplate(template=template_str, input_variables=["context", "question"])
-    qa_chain = LLMChain(llm=llm, prompt=custom_prompt)
-
-    response = qa_chain.run(context=context, question=req.question)
-    return {"answer": response}
+# FastAPI app serving only /chat; server.py hosts every corpus in one process
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=origins,        
+    allow_credentials=True,
+    allow_methods=["*"],           
+    allow_headers=["*"],           
+)
+app.include_router(router)
+app.include_router(build_ingest_router(lambda: service.ready_corpus("policy"), on_change=service.answer_cache.clear))
+app.include_router(build_admin_router(service, ["policy"]))
@@ -0,0 +1,66 @@
+"""
+Command line client for the /ingest endpoints of a running RAG service.
+
+    python backend/src/FastAPI/ingest.py add policy.pdf other.pdf
+    python backend/src/FastAPI/ingest.py add Port_storage.pdf --asset-type storage
+    python backend/src/FastAPI/ingest.py remove policy.pdf
+    python backend/src/FastAPI/ingest.py list --url http://localhost:8001
+    python backend/src/FastAPI/ingest.py list --corpus policy   # against server.py
+"""
+import argparse
+import json
+import os
+import sys
+import urllib.error
+import urllib.parse
+import urllib.request
+
+
+def call(url: str, method: str, data: bytes = None) -> dict:
+    headers = {"Content-Type": "application/pdf"} if data is not None else {}
+    req = urllib.request.Request(url, data=data, method=method, headers=headers)
+    try:
+        with urllib.request.urlopen(req) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return {"error": e.code, "detail": json.loads(e.read() or b"{}").get("detail")}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Manage documents of a live RAG corpus")
+    parser.add_argument("--url", default=os.getenv("RAG_URL", "http://localhost:8000"), help="Base URL of the service")
+    parser.add_argument("--corpus", help="Corpus name when the service hosts several (server.py)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add", help="Add or replace PDFs")
+    add.add_argument("paths", nargs="+")
+    add.add_argument("--asset-type", help="Partition for new documents of the /ask asset corpus")
+    remove = sub.add_parser("remove", help="Remove documents by name")
+    remove.add_argument("names", nargs="+")
+    sub.add_parser("list", help="List indexed documents")
+    args = parser.parse_args(argv)
+
+    base = args.url.rstrip("/") + "/ingest"
+    if args.corpus:
+        base += f"/{urllib.parse.quote(args.corpus)}"
+    failed = False
+    if args.command == "list":
+        print(json.dumps(call(base, "GET"), indent=2))
+    elif args.command == "add":
+        for path in args.paths:
+            url = f"{base}/{urllib.parse.quote(os.path.basename(path))}"
+            if args.asset_type:
+                url += "?" + urllib.parse.urlencode({"asset_type": args.asset_type})
+            with open(path, "rb") as f:
+                result = call(url, "PUT", f.read())
+            failed |= "error" in result
+            print(json.dumps(result))
+    else:
+        for name in args.names:
+            result = call(f"{base}/{urllib.parse.quote(name)}", "DELETE")
+            failed |= "error" in result
+            print(json.dumps(result))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
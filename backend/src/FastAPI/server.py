@@ -0,0 +1,48 @@
+"""
+One process for every RAG corpus: /ask (asset reports) and /chat (policy)
+share the embedding client, answer cache and concurrency limit.
+
+    uvicorn server:app --app-dir backend/src/FastAPI
+
+Each corpus gets its own ingestion routes under /ingest/<corpus>. Corpora
+load in the background after the port binds; /ready reports when.
+"""
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+import app as assets_api
+import chatbot as policy_api
+from services.admin_api import build_admin_router
+from services.ingest_api import build_ingest_router
+from services.retrieval import get_service
+
+CORPORA = ["assets", "policy"]
+
+service = get_service()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    service.load(CORPORA)
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=policy_api.origins,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+app.include_router(assets_api.router)
+app.include_router(policy_api.router)
+for name in CORPORA:
+    app.include_router(
+        build_ingest_router(
+            lambda name=name: service.ready_corpus(name), on_change=service.answer_cache.clear, prefix=f"/ingest/{name}"
+        )
+    )
+app.include_router(build_admin_router(service, CORPORA))
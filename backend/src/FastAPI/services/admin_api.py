@@ -0,0 +1,40 @@
+from typing import List
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+
+from services.retrieval import RetrievalService
+
+
+def build_admin_router(service: RetrievalService, corpora: List[str]) -> APIRouter:
+    """
+    Health, readiness, template reload and cache statistics. /health only
+    says the process is up; /ready is 503 until every corpus in `corpora`
+    has loaded.
+    """
+    router = APIRouter(tags=["admin"])
+
+    @router.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    @router.get("/ready")
+    def ready():
+        status = service.readiness(corpora)
+        is_ready = all(s["status"] == "ready" for s in status.values())
+        return JSONResponse({"ready": is_ready, "corpora": status}, status_code=200 if is_ready else 503)
+
+    @router.post("/admin/reload-templates")
+    def reload_templates():
+        """Pick up edited templates/*.txt without a restart"""
+        try:
+            changed = service.reload_templates()
+        except (OSError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Template reload failed: {str(e)}")
+        return {"reloaded": changed}
+
+    @router.get("/cache/stats")
+    def cache_stats():
+        return service.stats()
+
+    return router
@@ -0,0 +1,121 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    return WHITESPACE_RE.sub(" ", question).strip().lower()
+
+
+class AnswerCache:
+    """
+    LRU cache of generated answers, partitioned by namespace (the asset type).
+
+    Lookups try the normalized question text first, which needs no
+    embedding, then fall back to the most similar cached question whose
+    cosine similarity clears the threshold.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = int(os.getenv("ANSWER_CACHE_SIZE", "1024")),
+        ttl: float = float(os.getenv("ANSWER_CACHE_TTL", "3600")),
+        threshold: float = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95")),
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        # (namespace, normalized question) -> (answer, unit vector, stored at)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, np.ndarray, float]]" = OrderedDict()
+        # namespace -> (keys, stacked vectors), rebuilt lazily after writes
+        self._matrices: Dict[str, Tuple[List[Tuple[str, str]], np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def get_exact(self, namespace: str, question: str) -> Optional[str]:
+        key = (namespace, normalize_question(question))
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.exact_hits += 1
+            return entry[0]
+
+    def get_similar(self, namespace: str, vector: List[float]) -> Optional[str]:
+        query = _unit(vector)
+        with self._lock:
+            keys, matrix = self._matrix(namespace)
+            if keys:
+                scores = matrix @ query
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    entry = self._live_entry(keys[best])
+                    if entry is not None:
+                        self._entries.move_to_end(keys[best])
+                        self.semantic_hits += 1
+                        return entry[0]
+            self.misses += 1
+            return None
+
+    def put(self, namespace: str, question: str, vector: List[float], answer: str) -> None:
+        key = (namespace, normalize_question(question))
+        with self._lock:
+            self._entries[key] = (answer, _unit(vector), time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._matrices.pop(evicted[0], None)
+            self._matrices.pop(namespace, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._matrices.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.exact_hits + self.semantic_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "similarity_threshold": self.threshold,
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.exact_hits + self.semantic_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+    def _live_entry(self, key):
+        """Return an entry if present and fresh, expiring it otherwise"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[2] > self.ttl:
+            del self._entries[key]
+            self._matrices.pop(key[0], None)
+            return None
+        return entry
+
+    def _matrix(self, namespace: str):
+        if namespace not in self._matrices:
+            keys = [key for key in self._entries if key[0] == namespace]
+            vectors = [self._entries[key][1] for key in keys]
+            self._matrices[namespace] = (keys, np.vstack(vectors) if vectors else None)
+        return self._matrices[namespace]
+
+
+def _unit(vector) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm else array
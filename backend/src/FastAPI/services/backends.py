@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import os
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+
+from services.embedding_pipeline import StubEmbeddings
+
+load_dotenv()
+
+# "google" talks to Gemini; "fake" runs offline with simulated latency
+RAG_BACKEND = os.getenv("RAG_BACKEND", "google")
+
+EMBEDDING_MODEL = "models/embedding-001"
+LLM_MODEL = "gemini-1.5-flash"
+
+# Latency specs: "0.5" or "fixed:0.5", "uniform:0.2,1.0",
+# "normal:mean,stddev", "lognormal:median,sigma" (seconds)
+FAKE_LLM_LATENCY = os.getenv("FAKE_LLM_LATENCY", "lognormal:0.8,0.4")
+FAKE_EMBED_LATENCY = os.getenv("FAKE_EMBED_LATENCY", "lognormal:0.05,0.3")
+FAKE_SEED = int(os.getenv("FAKE_SEED", "0"))
+
+
+def parse_latency(spec: str, seed: int = FAKE_SEED) -> Callable[[], float]:
+    """A sampler of non-negative delays in seconds from a latency spec"""
+    kind, _, args = spec.partition(":") if ":" in spec else ("fixed", "", spec)
+    values = [float(v) for v in args.split(",") if v.strip()]
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    if kind == "fixed" and len(values) == 1:
+        draw = lambda: values[0]
+    elif kind == "uniform" and len(values) == 2:
+        draw = lambda: rng.uniform(values[0], values[1])
+    elif kind == "normal" and len(values) == 2:
+        draw = lambda: rng.gauss(values[0], values[1])
+    elif kind == "lognormal" and len(values) == 2:
+        # median * e^(sigma * z): a long right tail like real API calls
+        draw = lambda: values[0] * rng.lognormvariate(0.0, values[1])
+    else:
+        raise ValueError(f"Invalid latency spec: {spec!r}")
+
+    def sample() -> float:
+        with lock:
+            return max(0.0, draw())
+
+    return sample
+
+
+class FakeEmbeddings(StubEmbeddings):
+    """StubEmbeddings with a sampled delay per call, sync or async"""
+
+    def __init__(self, latency: Callable[[], float], size: int = 256):
+        super().__init__(size=size)
+        self.sample_latency = latency
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.sample_latency())
+        return [self._vector(text) for text in texts]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(self.sample_latency())
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+class FakeLLM(LLM):
+    """
+    Deterministic offline LLM: the answer depends only on the prompt, and
+    each call takes a sampled time, spread over the tokens when streaming.
+    """
+
+    latency: Any
+    words: int = 60
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-rag"
+
+    def _answer(self, prompt: str) -> List[str]:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        question = prompt.rsplit("Question:", 1)[-1].strip().splitlines()[0][:200] if "Question:" in prompt else ""
+        header = f"[fake {digest[:12]}] Report for: {question}".split()
+        filler = [f"w{digest[i % 64]}{i}" for i in range(max(0, self.words - len(header)))]
+        return [word + " " for word in header + filler]
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> str:
+        time.sleep(self.latency())
+        return "".join(self._answer(prompt)).strip()
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> str:
+        await asyncio.sleep(self.latency())
+        return "".join(self._answer(prompt)).strip()
+
+    async def _astream(
+        self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs
+    ) -> AsyncIterator[GenerationChunk]:
+        words = self._answer(prompt)
+        delay = self.latency() / len(words)
+        for word in words:
+            await asyncio.sleep(delay)
+            yield GenerationChunk(text=word)
+
+
+def build_backend(name: str = RAG_BACKEND) -> Tuple[Any, Any, str]:
+    """(embeddings, llm, embedding model name) for the configured backend"""
+    if name == "fake":
+        embeddings = FakeEmbeddings(parse_latency(FAKE_EMBED_LATENCY))
+        llm = FakeLLM(latency=parse_latency(FAKE_LLM_LATENCY, FAKE_SEED + 1))
+        # Fake vectors get their own index cache key
+        return embeddings, llm, "fake-stub-256"
+    if name == "google":
+        # Imported here so the fake backend runs without the Google client installed
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
+
+        google_api_key = os.getenv("GOOGLE_API_KEY")
+        embeddings = GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL, google_api_key=google_api_key)
+        llm = ChatGoogleGenerativeAI(model=LLM_MODEL, temperature=0.0, google_api_key=google_api_key)
+        return embeddings, llm, EMBEDDING_MODEL
+    raise ValueError(f"Unknown RAG_BACKEND: {name!r} (expected 'google' or 'fake')")
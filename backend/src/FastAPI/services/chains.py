@@ -0,0 +1,58 @@
+import os
+import threading
+from typing import Dict, List, Tuple
+
+from langchain.chains import LLMChain
+from langchain.prompts import PromptTemplate
+
+from services.index_store import BASE_DIR
+
+TEMPLATE_DIR = os.getenv("TEMPLATE_DIR", os.path.join(BASE_DIR, "templates"))
+
+INPUT_VARIABLES = ["context", "question"]
+
+
+class ChainRegistry:
+    """
+    One prompt and one compiled chain per template, built once at startup.
+
+    Templates are read from <template_dir>/<name>.txt. reload() re-reads them
+    and swaps the whole set in at once, so a request never sees a mix of
+    old and new templates.
+    """
+
+    def __init__(self, llm, names: List[str], template_dir: str = TEMPLATE_DIR):
+        self.llm = llm
+        self.names = list(names)
+        self.template_dir = template_dir
+        self._sources: Dict[str, str] = {}
+        self._entries: Dict[str, Tuple[PromptTemplate, LLMChain]] = {}
+        self._reload_lock = threading.Lock()
+        self.reload()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def prompt(self, name: str) -> PromptTemplate:
+        return self._entries[name][0]
+
+    def chain(self, name: str) -> LLMChain:
+        return self._entries[name][1]
+
+    def reload(self) -> List[str]:
+        """Rebuild chains whose template file changed; return their names"""
+        with self._reload_lock:
+            sources, entries, changed = {}, {}, []
+            for name in self.names:
+                with open(os.path.join(self.template_dir, f"{name}.txt"), "r", encoding="utf-8") as f:
+                    source = f.read()
+                sources[name] = source
+                if name in self._entries and self._sources.get(name) == source:
+                    entries[name] = self._entries[name]
+                    continue
+                # Raises on a template that lost {context} or {question}
+                prompt = PromptTemplate(template=source, input_variables=INPUT_VARIABLES, validate_template=True)
+                entries[name] = (prompt, LLMChain(llm=self.llm, prompt=prompt))
+                changed.append(name)
+            self._sources, self._entries = sources, entries
+        return changed
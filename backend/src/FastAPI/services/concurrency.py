@@ -0,0 +1,79 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from fastapi import HTTPException
+
+T = TypeVar("T")
+
+
+class RequestCoalescer:
+    """
+    Share one in-flight computation between identical concurrent requests.
+
+    The first caller for a key starts the work; callers arriving while it
+    runs await the same task. A caller that disconnects does not cancel the
+    work for the others.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+
+class ConcurrencyLimiter:
+    """
+    Bound the work running at once and the number of requests waiting for
+    a slot. Past that, new requests are rejected with 429 instead of
+    letting the queue grow without bound.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = int(os.getenv("MAX_CONCURRENT_REQUESTS", "16")),
+        max_queue: int = int(os.getenv("MAX_QUEUED_REQUESTS", "64")),
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+        self.rejected = 0
+
+    def check(self) -> None:
+        """Raise 429 now if a new request would not fit in the queue"""
+        if self._semaphore.locked() and self._waiting >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=429, detail="Server busy, please retry shortly", headers={"Retry-After": "1"}
+            )
+
+    async def acquire(self) -> None:
+        """Queue for a slot, or raise 429 if the queue is full; pair with release()"""
+        self.check()
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+    def release(self) -> None:
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
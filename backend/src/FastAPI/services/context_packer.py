@@ -0,0 +1,125 @@
+import hashlib
+import math
+import os
+from typing import Dict, List, Optional, Tuple
+
+# Upper bound on the context sent with each prompt
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1024"))
+
+# A segment is cut to the leftover budget only if at least this much is left
+MIN_SEGMENT_TOKENS = 64
+
+# Gemini has no local tokenizer; ~4 characters per token is close for English
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _position(doc) -> Optional[Tuple[str, int]]:
+    """(document hash, chunk number) from chunk ids of the form <sha256[:16]>-<n>"""
+    chunk_id = doc.metadata.get("chunk_id")
+    if not chunk_id or "-" not in chunk_id:
+        return None
+    prefix, _, number = chunk_id.rpartition("-")
+    return (prefix, int(number)) if number.isdigit() else None
+
+
+def merge_overlapping(first: str, second: str, separator: str = "\n") -> str:
+    """
+    Join consecutive chunks, keeping the text they share only once. The
+    splitter overlaps whole splits, so only an overlap that starts and ends
+    on a separator counts (chunks are stripped, so spaces next to it may be
+    missing); anything else is joined as two pieces.
+    """
+    start = max(0, len(first) - len(second))
+    while True:
+        start = first.find(second[0], start) if second else -1
+        if start == -1:
+            return first + separator + second
+        size = len(first) - start
+        on_boundary = (start == 0 or first[:start].rstrip(" \t\r").endswith(separator)) and (
+            size == len(second) or second[size:].lstrip(" \t\r").startswith(separator)
+        )
+        if on_boundary and second.startswith(first[start:]):
+            return first + second[size:]
+        start += 1
+
+
+class ContextPacker:
+    """
+    Builds the prompt context from retrieved chunks, best first.
+
+    Duplicate chunks are dropped, consecutive chunks of one document are
+    merged so their overlap is sent once, and segments are added in
+    relevance order until the token budget is spent.
+    """
+
+    def __init__(self, token_budget: int = CONTEXT_TOKEN_BUDGET, separator: str = "\n"):
+        self.token_budget = token_budget
+        self.separator = separator
+
+    def pack(self, docs) -> Tuple[str, Dict]:
+        """The context string and a report of what packing saved"""
+        naive = self.separator.join(d.page_content for d in docs)
+
+        # Best rank of each distinct chunk, keyed by position in its document
+        seen, chunks = set(), []
+        for rank, doc in enumerate(docs):
+            digest = hashlib.sha1(doc.page_content.encode("utf-8")).digest()
+            if digest in seen:
+                continue
+            seen.add(digest)
+            chunks.append((rank, _position(doc), doc.page_content))
+
+        # Runs of consecutive chunk numbers become one segment
+        segments: List[Tuple[int, str]] = []
+        by_document: Dict[str, List[Tuple[int, int, str]]] = {}
+        for rank, position, text in chunks:
+            if position is None:
+                segments.append((rank, text))
+            else:
+                by_document.setdefault(position[0], []).append((position[1], rank, text))
+        for parts in by_document.values():
+            parts.sort()
+            number, rank, text = parts[0]
+            for next_number, next_rank, next_text in parts[1:]:
+                if next_number == number + 1:
+                    text = merge_overlapping(text, next_text, self.separator)
+                    rank = min(rank, next_rank)
+                else:
+                    segments.append((rank, text))
+                    rank, text = next_rank, next_text
+                number = next_number
+            segments.append((rank, text))
+
+        packed, used, dropped = [], 0, 0
+        for _, text in sorted(segments, key=lambda s: s[0]):
+            remaining = self.token_budget - used - (estimate_tokens(self.separator) if packed else 0)
+            tokens = estimate_tokens(text)
+            if tokens > remaining:
+                if remaining < MIN_SEGMENT_TOKENS:
+                    dropped += 1
+                    continue
+                text = self._truncate(text, remaining)
+                tokens = estimate_tokens(text)
+            packed.append(text)
+            used += tokens + (estimate_tokens(self.separator) if len(packed) > 1 else 0)
+
+        context = self.separator.join(packed)
+        tokens_before, tokens_after = estimate_tokens(naive), estimate_tokens(context)
+        return context, {
+            "chunks": len(docs),
+            "segments": len(packed),
+            "dropped_segments": dropped,
+            "tokens_before": tokens_before,
+            "tokens": tokens_after,
+            "tokens_saved": tokens_before - tokens_after,
+        }
+
+    def _truncate(self, text: str, tokens: int) -> str:
+        """Cut to the budget at the last separator that fits"""
+        limit = tokens * CHARS_PER_TOKEN
+        cut = text.rfind(self.separator, 0, limit)
+        return text[: cut if cut > 0 else limit]
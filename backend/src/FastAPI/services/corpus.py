@@ -0,0 +1,413 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import faiss
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from services.embedding_pipeline import EmbeddingPipeline
+from services.index_store import BASE_DIR, FORMAT_VERSION, IndexStore, file_sha256
+from services.pdf_extract import StreamingSplitter
+
+logger = logging.getLogger(__name__)
+
+# Uploaded documents are kept here, one sub-directory per corpus
+CORPUS_DIR = os.getenv("CORPUS_DIR", os.path.join(BASE_DIR, "corpus"))
+
+# Physically drop tombstoned chunks once they make up this share of the index
+COMPACT_RATIO = 0.25
+
+
+def _clone_store(store: FAISS) -> FAISS:
+    return FAISS(
+        store.embedding_function,
+        faiss.clone_index(store.index),
+        InMemoryDocstore(dict(store.docstore._dict)),
+        dict(store.index_to_docstore_id),
+    )
+
+
+def _chunk_prefix(name: str, sha256: str) -> str:
+    # Per document name, so two copies of one PDF never share chunk ids
+    return hashlib.sha256(f"{name}\0{sha256}".encode("utf-8")).hexdigest()[:16]
+
+
+def _read_upload(upload_dir: str, document: str) -> Optional[bytes]:
+    path = os.path.join(upload_dir, document)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _restore_upload(upload_dir: str, document: str, previous: Optional[bytes]) -> None:
+    """Put back the file an upload replaced, or delete it if there was none"""
+    if previous is not None:
+        _write_upload(upload_dir, document, previous)
+    else:
+        try:
+            os.remove(os.path.join(upload_dir, document))
+        except FileNotFoundError:
+            pass
+
+
+def _write_upload(upload_dir: str, document: str, data: bytes) -> str:
+    os.makedirs(upload_dir, exist_ok=True)
+    path = os.path.join(upload_dir, document)
+    tmp_path = path + ".part"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+
+class Corpus:
+    """
+    A named, incrementally updatable document index.
+
+    Writers embed new chunks off to the side, then publish a new copy of the
+    index with a single reference swap, so queries never wait on ingestion.
+    Removed documents are tombstoned immediately and compacted once
+    tombstones pass COMPACT_RATIO of the index; their names are remembered
+    so seed documents stay removed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        pdf_paths: List[str],
+        splitter_params: Dict,
+        embeddings,
+        embedding_model: str,
+        index_store: Optional[IndexStore] = None,
+        pipeline: Optional[EmbeddingPipeline] = None,
+        metadata: Optional[Dict] = None,
+    ):
+        self.name = name
+        # Extra tags stamped on every chunk, e.g. the asset type
+        self.metadata = metadata or {}
+        self.splitter_params = splitter_params
+        self.embeddings = embeddings
+        self.embedding_model = embedding_model
+        self.index_store = index_store or IndexStore()
+        self.text_splitter = StreamingSplitter(**splitter_params)
+        self.key = self.index_store.cache_key(splitter_params, embedding_model)
+        self.pipeline = pipeline or EmbeddingPipeline(
+            embeddings, checkpoint_dir=os.path.join(self.index_store.root, ".checkpoints")
+        )
+
+        # (store, tombstoned chunk ids) is swapped as one tuple so readers
+        # always see a consistent pair
+        self._state = (None, frozenset())
+        # Bumped on every publish so side indexes know when to rebuild
+        self.version = 0
+        self._documents: Dict[str, Dict] = {}
+        # Documents removed through the API; seeding skips them
+        self._removed = set()
+        # Seed documents that could not be read, with the reason
+        self.failed: Dict[str, str] = {}
+        self._write_lock = threading.Lock()
+
+        cached = self.index_store.load(name, self.key, embeddings)
+        if cached is not None:
+            store, manifest = cached
+            self._documents = manifest.get("documents", {})
+            self._removed = set(manifest.get("removed", []))
+            self._state = (store, frozenset(manifest.get("tombstones", [])))
+            logger.info("Loaded cached '%s' index (%d documents)", name, len(self._documents))
+
+        # Seed documents are re-embedded only if their content changed; a
+        # missing or corrupt one is skipped rather than failing the corpus,
+        # and one removed through the API stays removed
+        seeds = [path for path in pdf_paths if os.path.basename(path) not in self._removed]
+        self.add_documents(seeds, skip_failed=True)
+
+    @property
+    def upload_dir(self) -> str:
+        return os.path.join(CORPUS_DIR, self.name)
+
+    def documents(self) -> Dict[str, Dict]:
+        return {
+            name: {"path": doc["path"], "sha256": doc["sha256"], "chunks": len(doc["chunk_ids"])}
+            for name, doc in self._documents.items()
+        }
+
+    def chunks(self) -> List[Document]:
+        """Every live chunk, e.g. to build a keyword index beside the vectors"""
+        store, tombstones = self._state
+        if store is None:
+            return []
+        docs = [store.docstore.search(doc_id) for doc_id in store.index_to_docstore_id.values()]
+        return [d for d in docs if d.metadata.get("chunk_id") not in tombstones]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs):
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k=k, **kwargs)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k=k, **kwargs)]
+
+    def similarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4, **kwargs):
+        """(document, L2 distance) pairs, closest first"""
+        store, tombstones = self._state
+        if store is None:
+            return []
+        # Over-fetch so that filtering tombstones still leaves k results
+        fetch_k = min(k + len(tombstones), store.index.ntotal)
+        pairs = store.similarity_search_with_score_by_vector(embedding, k=fetch_k, **kwargs)
+        return [(d, score) for d, score in pairs if d.metadata.get("chunk_id") not in tombstones][:k]
+
+    async def asimilarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs):
+        # FAISS releases the GIL while searching, so a worker thread keeps the loop free
+        return await asyncio.to_thread(self.similarity_search_by_vector, embedding, k, **kwargs)
+
+    def save_upload(self, document: str, data: bytes) -> str:
+        return _write_upload(self.upload_dir, document, data)
+
+    def read_upload(self, document: str) -> Optional[bytes]:
+        return _read_upload(self.upload_dir, document)
+
+    def restore_upload(self, document: str, previous: Optional[bytes]) -> None:
+        _restore_upload(self.upload_dir, document, previous)
+
+    def check_document(self, name: str, partition: Optional[str] = None) -> None:
+        """Raise ValueError if add_document would reject these arguments"""
+        if partition is not None:
+            raise ValueError(f"Corpus '{self.name}' has no partitions")
+
+    def add_document(self, path: str, name: Optional[str] = None) -> Dict:
+        return self.add_documents([path], [name] if name else None)[0]
+
+    def add_documents(
+        self, paths: List[str], names: Optional[List[str]] = None, skip_failed: bool = False
+    ) -> List[Dict]:
+        """
+        Embed new or changed documents and publish them to the live index.
+        With skip_failed, unreadable documents are reported and skipped
+        instead of raising.
+        """
+        names = names or [os.path.basename(path) for path in paths]
+        results, pending = [], []
+        for path, name in zip(paths, names):
+            try:
+                sha256 = file_sha256(path)
+                self.failed.pop(name, None)
+                known = self._documents.get(name)
+                if known and known["sha256"] == sha256:
+                    results.append({"document": name, "status": "unchanged", "chunks": len(known["chunk_ids"])})
+                    continue
+                # Chunks stream from the PDF through the embedder, outside
+                # the lock: this is the slow part
+                staged, ids = self._embed_document(path, name, sha256)
+            except Exception as e:
+                if not skip_failed:
+                    raise
+                logger.exception("Skipping '%s' in '%s'", name, self.name)
+                self.failed[name] = str(e)
+                results.append({"document": name, "status": "failed", "error": str(e)})
+                continue
+            pending.append((path, name, sha256, staged, ids))
+            results.append({"document": name, "status": "updated" if known else "added", "chunks": len(ids)})
+
+        if pending:
+            with self._write_lock:
+                store, tombstones = self._state
+                tombstones = set(tombstones)
+                fresh = set()
+                for path, name, sha256, staged, ids in pending:
+                    if name in self._documents:
+                        tombstones.update(self._documents[name]["chunk_ids"])
+                    fresh.update(ids)
+                # A re-added document gets its tombstoned chunk ids back, so
+                # those must leave the index before it can be added again
+                ntotal = store.index.ntotal if store is not None else 0
+                if tombstones & fresh or len(tombstones) > COMPACT_RATIO * ntotal:
+                    store = self._compact(store, tombstones)
+                    tombstones = set()
+                elif store is not None:
+                    store = _clone_store(store)
+                for path, name, sha256, staged, ids in pending:
+                    if staged is not None:
+                        if store is None:
+                            store = staged
+                        else:
+                            store.merge_from(staged)
+                    self._documents[name] = {"path": path, "sha256": sha256, "chunk_ids": ids}
+                    self._removed.discard(name)
+                self._publish(store, tombstones)
+            for path, name, sha256, staged, ids in pending:
+                self.pipeline.discard_checkpoint(self._checkpoint_key(name, sha256))
+        return results
+
+    def _embed_document(self, path: str, name: str, sha256: str) -> Tuple[Optional[FAISS], List[str]]:
+        """A staging index over one PDF's chunks, embedded a round at a time"""
+        prefix = _chunk_prefix(name, sha256)
+        metadata = {**self.metadata, "source": name, "sha256": sha256}
+        staged, ids = None, []
+        # The checkpoint is kept until the document is published
+        slices = self.pipeline.embed_slices(
+            self.text_splitter.split_pdf(path, sha256),
+            checkpoint_key=self._checkpoint_key(name, sha256),
+            keep_checkpoint=True,
+        )
+        for texts, vectors in slices:
+            chunk_ids = [f"{prefix}-{i}" for i in range(len(ids), len(ids) + len(texts))]
+            ids.extend(chunk_ids)
+            metadatas = [{**metadata, "chunk_id": chunk_id} for chunk_id in chunk_ids]
+            text_embeddings = list(zip(texts, vectors))
+            if staged is None:
+                staged = FAISS.from_embeddings(text_embeddings, self.embeddings, metadatas=metadatas, ids=chunk_ids)
+            else:
+                staged.add_embeddings(text_embeddings, metadatas=metadatas, ids=chunk_ids)
+        return staged, ids
+
+    def _checkpoint_key(self, name: str, sha256: str) -> str:
+        return f"{self.name}-{self.key[:16]}-{_chunk_prefix(name, sha256)}"
+
+    def remove_document(self, name: str) -> bool:
+        """Tombstone a document's chunks; they stop matching immediately"""
+        with self._write_lock:
+            doc = self._documents.pop(name, None)
+            if doc is None:
+                return False
+            self._removed.add(name)
+            store, tombstones = self._state
+            tombstones = set(tombstones) | set(doc["chunk_ids"])
+            if store is not None and len(tombstones) > COMPACT_RATIO * store.index.ntotal:
+                store = self._compact(store, tombstones)
+                tombstones = set()
+            self._publish(store, tombstones)
+        return True
+
+    def _compact(self, store: Optional[FAISS], tombstones: set) -> Optional[FAISS]:
+        """Return a private, writable copy of the store without tombstoned chunks"""
+        if store is None:
+            return None
+        store = _clone_store(store)
+        dead = [doc_id for doc_id in store.index_to_docstore_id.values() if doc_id in tombstones]
+        if dead:
+            store.delete(dead)
+        return store if store.index.ntotal else None
+
+    def _publish(self, store: Optional[FAISS], tombstones: set) -> None:
+        self._state = (store, frozenset(tombstones))
+        self.version += 1
+        manifest = {
+            "format": FORMAT_VERSION,
+            "splitter": self.splitter_params,
+            "embedding_model": self.embedding_model,
+            "documents": self._documents,
+            "tombstones": sorted(tombstones),
+            "removed": sorted(self._removed),
+        }
+        self.index_store.save(self.name, self.key, store, manifest)
+
+
+class PartitionedCorpus:
+    """
+    A corpus split into one Corpus per partition (here: per asset type).
+
+    Searches routed to a partition only scan that partition's index; a
+    search without one merges the nearest chunks of every partition.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        partitions: Dict[str, List[str]],
+        splitter_params: Dict,
+        embeddings,
+        embedding_model: str,
+        index_store: Optional[IndexStore] = None,
+        partition_key: str = "asset_type",
+    ):
+        self.name = name
+        self.embeddings = embeddings
+        self.partition_key = partition_key
+        self.partitions: Dict[str, Corpus] = {
+            partition: Corpus(
+                f"{name}-{partition}",
+                pdf_paths,
+                splitter_params,
+                embeddings,
+                embedding_model,
+                index_store=index_store,
+                metadata={partition_key: partition},
+            )
+            for partition, pdf_paths in partitions.items()
+        }
+
+    @property
+    def upload_dir(self) -> str:
+        return os.path.join(CORPUS_DIR, self.name)
+
+    def documents(self) -> Dict[str, Dict]:
+        return {
+            name: {**doc, self.partition_key: partition}
+            for partition, corpus in self.partitions.items()
+            for name, doc in corpus.documents().items()
+        }
+
+    def similarity_search(self, query: str, k: int = 4, partition: Optional[str] = None, **kwargs):
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k=k, partition=partition, **kwargs)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, partition: Optional[str] = None, **kwargs):
+        if partition is not None:
+            corpus = self.partitions.get(partition)
+            return corpus.similarity_search_by_vector(embedding, k=k, **kwargs) if corpus else []
+        pairs = [
+            pair
+            for corpus in self.partitions.values()
+            for pair in corpus.similarity_search_with_score_by_vector(embedding, k=k, **kwargs)
+        ]
+        pairs.sort(key=lambda pair: pair[1])
+        return [doc for doc, _ in pairs[:k]]
+
+    async def asimilarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, partition: Optional[str] = None, **kwargs
+    ):
+        return await asyncio.to_thread(self.similarity_search_by_vector, embedding, k, partition, **kwargs)
+
+    def save_upload(self, document: str, data: bytes) -> str:
+        return _write_upload(self.upload_dir, document, data)
+
+    def read_upload(self, document: str) -> Optional[bytes]:
+        return _read_upload(self.upload_dir, document)
+
+    def restore_upload(self, document: str, previous: Optional[bytes]) -> None:
+        _restore_upload(self.upload_dir, document, previous)
+
+    def check_document(self, name: str, partition: Optional[str] = None) -> None:
+        """Raise ValueError if add_document would reject these arguments"""
+        partition = partition or self._partition_of(name)
+        if partition not in self.partitions:
+            raise ValueError(f"{self.partition_key} must be one of {list(self.partitions)}")
+
+    def add_document(self, path: str, name: Optional[str] = None, partition: Optional[str] = None) -> Dict:
+        name = name or os.path.basename(path)
+        self.check_document(name, partition)
+        current = self._partition_of(name)
+        partition = partition or current
+        # A document that moves partition leaves its old one
+        if current and current != partition:
+            self.partitions[current].remove_document(name)
+        result = self.partitions[partition].add_document(path, name)
+        return {**result, self.partition_key: partition}
+
+    @property
+    def failed(self) -> Dict[str, str]:
+        return {name: error for corpus in self.partitions.values() for name, error in corpus.failed.items()}
+
+    def remove_document(self, name: str) -> bool:
+        partition = self._partition_of(name)
+        return partition is not None and self.partitions[partition].remove_document(name)
+
+    def _partition_of(self, name: str) -> Optional[str]:
+        for partition, corpus in self.partitions.items():
+            if name in corpus.documents():
+                return partition
+        return None
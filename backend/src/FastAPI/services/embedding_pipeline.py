@@ -0,0 +1,226 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# Error fragments that mean "slow down" rather than "this batch is bad"
+RATE_LIMIT_MARKERS = ("429", "resource_exhausted", "resource exhausted", "quota", "rate limit")
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class StubEmbeddings(Embeddings):
+    """
+    Deterministic offline embedder for tests and benchmarks.
+
+    Words are hashed into a fixed-size signed bag-of-words vector, so texts
+    sharing vocabulary land close together without any network access.
+    """
+
+    def __init__(self, size: int = 256, latency: float = 0.0):
+        self.size = size
+        self.latency = latency
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.zeros(self.size, dtype=np.float32)
+        for token in TOKEN_RE.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.size] += 1.0 if value & (1 << 63) else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def _run_blocking(coro):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # e.g. uvicorn importing the app from within its loop: use a helper thread
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+class _Pacer:
+    """Shared start-time budget for the batches of one embedding run"""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self.lock = asyncio.Lock()
+        self.next_start = 0.0
+        self.paused_until = 0.0
+
+    def pause(self, delay: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+
+    async def wait(self) -> None:
+        async with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start, self.paused_until)
+            self.next_start = start + self.min_interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class EmbeddingPipeline:
+    """
+    Embed texts in batches, several batches at a time.
+
+    Failed batches are retried with exponential backoff; rate-limit errors
+    also pause every other worker. Finished batches are checkpointed to disk
+    so an interrupted run resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        batch_size: int = int(os.getenv("EMBED_BATCH_SIZE", "32")),
+        concurrency: int = int(os.getenv("EMBED_CONCURRENCY", "4")),
+        requests_per_minute: Optional[float] = float(os.getenv("EMBED_RPM", "0")) or None,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        checkpoint_dir: Optional[str] = None,
+    ):
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.min_interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.checkpoint_dir = checkpoint_dir
+
+    def embed(self, texts: List[str], checkpoint_key: Optional[str] = None) -> List[List[float]]:
+        """Blocking wrapper around aembed, safe to call from inside an event loop"""
+        return _run_blocking(self.aembed(texts, checkpoint_key))
+
+    async def aembed(self, texts: List[str], checkpoint_key: Optional[str] = None) -> List[List[float]]:
+        checkpoint_path = self._checkpoint_path(checkpoint_key)
+        vectors = await self._aembed(texts, self._load_checkpoint(checkpoint_path), checkpoint_path)
+        self.discard_checkpoint(checkpoint_key)
+        return vectors
+
+    def embed_slices(
+        self, texts: Iterable[str], checkpoint_key: Optional[str] = None, keep_checkpoint: bool = False
+    ) -> Iterator[Tuple[List[str], List[List[float]]]]:
+        """
+        Embed a stream of texts without materializing it: one round of
+        batch_size * concurrency texts is read, embedded and yielded back
+        with its vectors at a time. The checkpoint spans the whole stream
+        and is removed at its end unless keep_checkpoint is set.
+        """
+        checkpoint_path = self._checkpoint_path(checkpoint_key)
+        done = self._load_checkpoint(checkpoint_path)
+        texts = iter(texts)
+        while True:
+            chunk = list(islice(texts, self.batch_size * self.concurrency))
+            if not chunk:
+                break
+            vectors = _run_blocking(self._aembed(chunk, done, checkpoint_path))
+            # Only vectors still to be yielded stay in memory
+            for text in chunk:
+                done.pop(text_hash(text), None)
+            yield chunk, vectors
+        if not keep_checkpoint:
+            self.discard_checkpoint(checkpoint_key)
+
+    def discard_checkpoint(self, checkpoint_key: Optional[str]) -> None:
+        checkpoint_path = self._checkpoint_path(checkpoint_key)
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+    async def _aembed(
+        self, texts: List[str], done: Dict[str, List[float]], checkpoint_path: Optional[str]
+    ) -> List[List[float]]:
+        todo = []
+        for text in dict.fromkeys(texts):
+            if text_hash(text) not in done:
+                todo.append(text)
+        batches = [todo[i:i + self.batch_size] for i in range(0, len(todo), self.batch_size)]
+        if batches:
+            logger.info(
+                "Embedding %d chunk(s) in %d batch(es), %d resumed", len(todo), len(batches), len(texts) - len(todo)
+            )
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pacer = _Pacer(self.min_interval)
+        checkpoint = open(checkpoint_path, "a", encoding="utf-8") if checkpoint_path else None
+        try:
+            async def run(batch):
+                async with semaphore:
+                    vectors = await self._embed_batch(batch, pacer)
+                for text, vector in zip(batch, vectors):
+                    h = text_hash(text)
+                    done[h] = vector
+                    if checkpoint:
+                        checkpoint.write(json.dumps({"h": h, "v": vector}) + "\n")
+                if checkpoint:
+                    checkpoint.flush()
+
+            await asyncio.gather(*(run(batch) for batch in batches))
+        finally:
+            if checkpoint:
+                checkpoint.close()
+
+        return [done[text_hash(text)] for text in texts]
+
+    async def _embed_batch(self, batch: List[str], pacer: _Pacer) -> List[List[float]]:
+        for attempt in range(self.max_retries + 1):
+            await pacer.wait()
+            try:
+                return await asyncio.to_thread(self.embeddings.embed_documents, batch)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+                if any(marker in str(e).lower() for marker in RATE_LIMIT_MARKERS):
+                    # Back everyone off, not just this batch
+                    pacer.pause(delay)
+                logger.warning(
+                    "Embedding batch failed (%s); retry %d/%d in %.1fs", e, attempt + 1, self.max_retries, delay
+                )
+                await asyncio.sleep(delay)
+
+    def _checkpoint_path(self, checkpoint_key: Optional[str]) -> Optional[str]:
+        if not (self.checkpoint_dir and checkpoint_key):
+            return None
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        return os.path.join(self.checkpoint_dir, f"{checkpoint_key}.jsonl")
+
+    def _load_checkpoint(self, path: Optional[str]) -> Dict[str, List[float]]:
+        done = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn last line from an interrupted run
+                        continue
+                    done[record["h"]] = record["v"]
+        return done
@@ -0,0 +1,167 @@
+import asyncio
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from services.corpus import Corpus
+
+# Chunks returned to the prompt, and candidates fetched from each retriever
+HYBRID_K = int(os.getenv("HYBRID_K", "4"))
+HYBRID_FETCH_K = int(os.getenv("HYBRID_FETCH_K", "20"))
+
+# Weight of query-term coverage against the fused rank in the rerank
+RERANK_WEIGHT = float(os.getenv("HYBRID_RERANK_WEIGHT", "0.5"))
+
+# Reciprocal rank fusion damping; 60 is the usual choice
+RRF_K = 60
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or that the this to was were what which who will with".split()
+)
+
+# Letters and numbers are separate tokens, so "500MW" matches "500 MW"
+_TOKEN = re.compile(r"[a-z]+|[0-9]+(?:\.[0-9]+)?")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over an inverted index of numpy posting arrays"""
+
+    def __init__(self, texts: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(texts)
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        lengths = np.zeros(self.size, dtype=np.float32)
+        self.term_sets = []
+        for i, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            lengths[i] = sum(counts.values())
+            self.term_sets.append(frozenset(counts))
+            for term, tf in counts.items():
+                docs, tfs = postings.setdefault(term, ([], []))
+                docs.append(i)
+                tfs.append(tf)
+        avg_length = float(lengths.mean()) if self.size else 0.0
+        self._norm = k1 * (1 - b + b * lengths / avg_length) if avg_length else lengths
+        self.postings = {
+            term: (np.array(docs, dtype=np.int32), np.array(tfs, dtype=np.float32))
+            for term, (docs, tfs) in postings.items()
+        }
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings[term][0]) if term in self.postings else 0
+        return math.log(1 + (self.size - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """(position, score) of the k best matching texts"""
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(tokenize(query)):
+            if term not in self.postings:
+                continue
+            docs, tfs = self.postings[term]
+            scores[docs] += self.idf(term) * tfs * (self.k1 + 1) / (tfs + self._norm[docs])
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k)[:k]]
+        order = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(int(i), float(scores[i])) for i in order]
+
+
+class HybridRetriever:
+    """
+    BM25 and vector search over one Corpus, fused by reciprocal rank and
+    reranked by how much of the query's rare terms each chunk contains.
+
+    The BM25 index is rebuilt lazily whenever the corpus publishes a new
+    version, so ingestion and removal are picked up without a restart.
+    """
+
+    def __init__(
+        self,
+        corpus: Corpus,
+        k: int = HYBRID_K,
+        fetch_k: int = HYBRID_FETCH_K,
+        rerank_weight: float = RERANK_WEIGHT,
+    ):
+        self.corpus = corpus
+        self.k = k
+        self.fetch_k = fetch_k
+        self.rerank_weight = rerank_weight
+        self._index: Optional[Tuple[int, BM25Index, List[Document], Dict[str, int]]] = None
+        self._build_lock = threading.Lock()
+
+    def _bm25(self) -> Tuple[BM25Index, List[Document], Dict[str, int]]:
+        index = self._index
+        if index is None or index[0] != self.corpus.version:
+            with self._build_lock:
+                index = self._index
+                if index is None or index[0] != self.corpus.version:
+                    # Read the version first: a publish in between only causes another rebuild
+                    version = self.corpus.version
+                    docs = self.corpus.chunks()
+                    positions = {d.metadata["chunk_id"]: i for i, d in enumerate(docs)}
+                    index = (version, BM25Index([d.page_content for d in docs]), docs, positions)
+                    self._index = index
+        return index[1], index[2], index[3]
+
+    def search(self, query: str, k: Optional[int] = None, **kwargs) -> List[Document]:
+        return self.search_by_vector(query, self.corpus.embeddings.embed_query(query), k=k, **kwargs)
+
+    def search_by_vector(
+        self, query: str, embedding: List[float], k: Optional[int] = None, fusion_only: bool = False
+    ) -> List[Document]:
+        k = k or self.k
+        bm25, docs, positions = self._bm25()
+
+        fused: Dict[str, float] = {}
+        by_id: Dict[str, Document] = {}
+        vector_hits = self.corpus.similarity_search_with_score_by_vector(embedding, k=self.fetch_k)
+        for rank, (doc, _) in enumerate(vector_hits):
+            chunk_id = doc.metadata["chunk_id"]
+            by_id[chunk_id] = doc
+            fused[chunk_id] = 1 / (RRF_K + rank + 1)
+        for rank, (position, _) in enumerate(bm25.search(query, self.fetch_k)):
+            doc = docs[position]
+            chunk_id = doc.metadata["chunk_id"]
+            by_id[chunk_id] = doc
+            fused[chunk_id] = fused.get(chunk_id, 0.0) + 1 / (RRF_K + rank + 1)
+
+        ranked = sorted(fused, key=fused.get, reverse=True)
+        if fusion_only or not ranked:
+            return [by_id[chunk_id] for chunk_id in ranked[:k]]
+        reranked = self._rerank(query, ranked[: k * 3], fused, by_id, bm25, positions)
+        return [by_id[chunk_id] for chunk_id in reranked[:k]]
+
+    async def asearch_by_vector(self, query: str, embedding: List[float], k: Optional[int] = None) -> List[Document]:
+        return await asyncio.to_thread(self.search_by_vector, query, embedding, k)
+
+    def _rerank(
+        self,
+        query: str,
+        candidates: List[str],
+        fused: Dict[str, float],
+        by_id: Dict[str, Document],
+        bm25: BM25Index,
+        positions: Dict[str, int],
+    ) -> List[str]:
+        """Fused score plus the idf-weighted share of query terms a chunk contains"""
+        weights = {term: bm25.idf(term) for term in set(tokenize(query))}
+        total = sum(weights.values()) or 1.0
+        top = fused[candidates[0]]
+        scores = {}
+        for chunk_id in candidates:
+            position = positions.get(chunk_id)
+            chunk_terms = bm25.term_sets[position] if position is not None else set(tokenize(by_id[chunk_id].page_content))
+            coverage = sum(w for term, w in weights.items() if term in chunk_terms) / total
+            scores[chunk_id] = fused[chunk_id] / top + self.rerank_weight * coverage
+        return sorted(candidates, key=scores.get, reverse=True)
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from typing import Dict, Optional, Tuple
+
+import faiss
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Where built indexes live; one sub-directory per corpus, one per cache key
+INDEX_CACHE_DIR = os.getenv("INDEX_CACHE_DIR", os.path.join(BASE_DIR, ".index_cache"))
+
+# Bump when the on-disk layout changes so old entries are never mis-read
+FORMAT_VERSION = 2
+
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "docstore.json"
+MANIFEST_FILE = "manifest.json"
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    """Hash a file's contents without reading it into memory at once"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IndexStore:
+    """
+    Content-addressed cache of FAISS indexes.
+
+    An entry is keyed by the splitter parameters and the embedding model;
+    its manifest records the hash of every source PDF so only documents
+    whose content changed are re-embedded. Indexes are memory-mapped on load.
+    """
+
+    def __init__(self, root: str = INDEX_CACHE_DIR):
+        self.root = root
+
+    def cache_key(self, splitter_params: Dict, embedding_model: str) -> str:
+        payload = {
+            "format": FORMAT_VERSION,
+            "splitter": splitter_params,
+            "embedding_model": embedding_model,
+        }
+        encoded = json.dumps(payload, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def entry_dir(self, name: str, key: str) -> str:
+        return os.path.join(self.root, name, key)
+
+    def load(self, name: str, key: str, embeddings) -> Optional[Tuple[Optional[FAISS], Dict]]:
+        """Memory-map a cached index and its manifest, or return None on a miss"""
+        path = self.entry_dir(name, key)
+        manifest_path = os.path.join(path, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return None
+
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if not os.path.exists(os.path.join(path, INDEX_FILE)):
+            # Every document was removed; the corpus is empty
+            return None, manifest
+
+        index = faiss.read_index(
+            os.path.join(path, INDEX_FILE), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+        )
+        with open(os.path.join(path, DOCSTORE_FILE), "r", encoding="utf-8") as f:
+            records = json.load(f)
+
+        docstore = InMemoryDocstore({
+            record["id"]: Document(page_content=record["page_content"], metadata=record["metadata"])
+            for record in records
+        })
+        index_to_docstore_id = {i: record["id"] for i, record in enumerate(records)}
+        return FAISS(embeddings, index, docstore, index_to_docstore_id), manifest
+
+    def save(self, name: str, key: str, store: Optional[FAISS], manifest: Dict) -> str:
+        """Write an index atomically and drop stale entries of the same corpus"""
+        corpus_dir = os.path.join(self.root, name)
+        os.makedirs(corpus_dir, exist_ok=True)
+        tmp_dir = os.path.join(corpus_dir, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_dir)
+
+        if store is not None:
+            records = []
+            for i in range(store.index.ntotal):
+                doc_id = store.index_to_docstore_id[i]
+                doc = store.docstore.search(doc_id)
+                records.append({"id": doc_id, "page_content": doc.page_content, "metadata": doc.metadata})
+
+            faiss.write_index(store.index, os.path.join(tmp_dir, INDEX_FILE))
+            with open(os.path.join(tmp_dir, DOCSTORE_FILE), "w", encoding="utf-8") as f:
+                json.dump(records, f)
+        # The manifest goes last: its presence marks a complete entry
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        # Move the old entry aside rather than deleting it first, so there is
+        # never a moment with no index under final_dir
+        final_dir = self.entry_dir(name, key)
+        old_dir = None
+        if os.path.exists(final_dir):
+            old_dir = os.path.join(corpus_dir, f".old-{uuid.uuid4().hex}")
+            os.replace(final_dir, old_dir)
+        os.replace(tmp_dir, final_dir)
+        if old_dir is not None:
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+        for entry in os.listdir(corpus_dir):
+            if entry != key:
+                shutil.rmtree(os.path.join(corpus_dir, entry), ignore_errors=True)
+        return final_dir
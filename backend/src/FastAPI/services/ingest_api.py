@@ -0,0 +1,87 @@
+import os
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional, Union
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+
+if TYPE_CHECKING:
+    from services.corpus import Corpus, PartitionedCorpus
+
+# Largest PDF accepted by PUT /ingest/{document}, checked before it is held in memory
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+
+
+async def read_upload_body(request: Request, limit: int) -> bytes:
+    """The request body; 413 by Content-Length, or mid-stream once over `limit` bytes"""
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise HTTPException(status_code=413, detail=f"Upload too large: {declared} bytes (max {limit})")
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise HTTPException(status_code=413, detail=f"Upload too large: over {limit} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def build_ingest_router(
+    get_corpus: Callable[[], Awaitable[Union["Corpus", "PartitionedCorpus"]]],
+    on_change: Optional[Callable[[], None]] = None,
+    prefix: str = "/ingest",
+) -> APIRouter:
+    """
+    Routes to add, replace, list and remove documents of a live corpus.
+    get_corpus resolves the corpus per request, so the routes can be mounted
+    before it has loaded. on_change runs after every change, e.g. to drop
+    cached answers.
+    """
+    router = APIRouter(prefix=prefix, tags=["ingest"])
+
+    @router.get("")
+    async def list_documents():
+        corpus = await get_corpus()
+        return {"corpus": corpus.name, "documents": corpus.documents(), "failed": corpus.failed}
+
+    @router.put("/{document}")
+    async def ingest_document(document: str, request: Request, asset_type: Optional[str] = None):
+        """
+        Upload a PDF as the raw request body; only its chunks are embedded.
+        Partitioned corpora need asset_type for documents they do not know yet.
+        """
+        if os.path.basename(document) != document or not document.lower().endswith(".pdf"):
+            raise HTTPException(status_code=400, detail="Document name must be a plain *.pdf file name")
+        data = await read_upload_body(request, MAX_UPLOAD_BYTES)
+        if not data.startswith(b"%PDF"):
+            raise HTTPException(status_code=400, detail="Request body is not a PDF")
+
+        corpus = await get_corpus()
+        kwargs = {"partition": asset_type} if asset_type else {}
+        try:
+            corpus.check_document(document, **kwargs)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Ingestion error: {str(e)}")
+
+        # A rejected upload must not leave its file behind or clobber the
+        # version already ingested
+        previous = await run_in_threadpool(corpus.read_upload, document)
+        path = await run_in_threadpool(corpus.save_upload, document, data)
+        try:
+            result = await run_in_threadpool(corpus.add_document, path, document, **kwargs)
+        except Exception as e:
+            await run_in_threadpool(corpus.restore_upload, document, previous)
+            raise HTTPException(status_code=400, detail=f"Ingestion error: {str(e)}")
+        if on_change and result["status"] != "unchanged":
+            on_change()
+        return {"corpus": corpus.name, **result}
+
+    @router.delete("/{document}")
+    async def remove_document(document: str):
+        corpus = await get_corpus()
+        if not await run_in_threadpool(corpus.remove_document, document):
+            raise HTTPException(status_code=404, detail=f"Unknown document: {document}")
+        if on_change:
+            on_change()
+        return {"corpus": corpus.name, "document": document, "status": "removed"}
+
+    return router
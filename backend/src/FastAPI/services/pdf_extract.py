@@ -0,0 +1,187 @@
+import json
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Iterable, Iterator, List, Optional
+
+from PyPDF2 import PdfReader
+
+from services.index_store import INDEX_CACHE_DIR, file_sha256
+
+# Processes parsing pages; 1 parses in the calling process
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(os.cpu_count() or 1, 8))))
+
+# Pages handed to a worker per task; each task opens the PDF once
+PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+
+# Extracted page text, one JSON line per page, keyed by the PDF's sha256
+PAGE_CACHE_DIR = os.getenv("PAGE_CACHE_DIR", os.path.join(INDEX_CACHE_DIR, ".pages"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the server process already runs threads
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+    return _pool
+
+
+def _extract_range(path: str, start: int, stop: int) -> List[str]:
+    reader = PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _page_count(path: str) -> int:
+    return len(PdfReader(path).pages)
+
+
+def _iter_extracted(path: str, workers: int, pages_per_task: int) -> Iterator[str]:
+    pages = _page_count(path)
+    if workers <= 1 or pages <= pages_per_task:
+        for start in range(0, pages, pages_per_task):
+            yield from _extract_range(path, start, min(start + pages_per_task, pages))
+        return
+
+    # Keep a bounded window of ranges in flight so results never pile up
+    # faster than the splitter consumes them
+    pool = _get_pool(workers)
+    ranges = iter(range(0, pages, pages_per_task))
+    in_flight = deque()
+    for start in ranges:
+        in_flight.append(pool.submit(_extract_range, path, start, min(start + pages_per_task, pages)))
+        if len(in_flight) >= workers * 2:
+            break
+    while in_flight:
+        texts = in_flight.popleft().result()
+        start = next(ranges, None)
+        if start is not None:
+            in_flight.append(pool.submit(_extract_range, path, start, min(start + pages_per_task, pages)))
+        yield from texts
+
+
+def iter_pdf_pages(
+    path: str,
+    sha256: Optional[str] = None,
+    workers: int = PDF_EXTRACT_WORKERS,
+    pages_per_task: int = PAGES_PER_TASK,
+    cache_dir: Optional[str] = PAGE_CACHE_DIR,
+) -> Iterator[str]:
+    """
+    Yield the text of each page in order, parsing pages across a process
+    pool. Text is cached per file hash, so a re-indexed PDF is not parsed
+    again; pass cache_dir=None to skip the cache.
+    """
+    if cache_dir is None:
+        yield from _iter_extracted(path, workers, pages_per_task)
+        return
+
+    cache_path = os.path.join(cache_dir, f"{sha256 or file_sha256(path)}.jsonl")
+    if os.path.exists(cache_path):
+        with open(cache_path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+        return
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.part"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for text in _iter_extracted(path, workers, pages_per_task):
+                f.write(json.dumps(text) + "\n")
+                yield text
+        # Only a fully extracted document is published to the cache
+        os.replace(tmp_path, cache_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def iter_document_text(pages: Iterable[str]) -> Iterator[str]:
+    """Page texts joined the way the corpus always has: non-empty pages, each followed by a newline"""
+    for text in pages:
+        if text:
+            yield text + "\n"
+
+
+class StreamingSplitter:
+    """
+    CharacterTextSplitter that consumes text piece by piece.
+
+    Produces exactly the chunks of CharacterTextSplitter.split_text on the
+    concatenated text, but only holds the current chunk window and one
+    page, never the whole document.
+    """
+
+    def __init__(
+        self,
+        separator: str = "\n\n",
+        chunk_size: int = 4000,
+        chunk_overlap: int = 200,
+        is_separator_regex: bool = False,
+        strip_whitespace: bool = True,
+    ):
+        if chunk_overlap > chunk_size:
+            raise ValueError(f"Got a larger chunk overlap ({chunk_overlap}) than chunk size ({chunk_size})")
+        self.separator = separator
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.strip_whitespace = strip_whitespace
+        self._pattern = re.compile(separator if is_separator_regex else re.escape(separator)) if separator else None
+
+    def split_text(self, text: str) -> List[str]:
+        return list(self.split([text]))
+
+    def split_pdf(self, path: str, sha256: Optional[str] = None) -> Iterator[str]:
+        return self.split(iter_document_text(iter_pdf_pages(path, sha256)))
+
+    def split(self, pieces: Iterable[str]) -> Iterator[str]:
+        return self._merge(self._splits(pieces))
+
+    def _splits(self, pieces: Iterable[str]) -> Iterator[str]:
+        # The text after the last separator may continue in the next piece
+        carry = ""
+        for piece in pieces:
+            if self._pattern is None:
+                yield from piece
+                continue
+            parts = self._pattern.split(carry + piece)
+            carry = parts.pop()
+            yield from (part for part in parts if part)
+        if carry:
+            yield carry
+
+    def _merge(self, splits: Iterator[str]) -> Iterator[str]:
+        # Same windowing as TextSplitter._merge_splits, yielding as it goes
+        separator_len = len(self.separator)
+        current: deque = deque()
+        total = 0
+        for d in splits:
+            d_len = len(d)
+            if total + d_len + (separator_len if current else 0) > self.chunk_size:
+                if current:
+                    doc = self._join(current)
+                    if doc is not None:
+                        yield doc
+                    while total > self.chunk_overlap or (
+                        total + d_len + (separator_len if current else 0) > self.chunk_size and total > 0
+                    ):
+                        total -= len(current[0]) + (separator_len if len(current) > 1 else 0)
+                        current.popleft()
+            current.append(d)
+            total += d_len + (separator_len if len(current) > 1 else 0)
+        doc = self._join(current)
+        if doc is not None:
+            yield doc
+
+    def _join(self, docs) -> Optional[str]:
+        text = self.separator.join(docs)
+        if self.strip_whitespace:
+            text = text.strip()
+        return text or None
@@ -0,0 +1,337 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from fastapi import HTTPException
+
+from services.answer_cache import AnswerCache, normalize_question
+from services.concurrency import ConcurrencyLimiter, RequestCoalescer
+from services.context_packer import ContextPacker
+from services.streaming import retrieval_metadata, sse, stream_text
+
+# langchain, faiss and the model clients take seconds to import; they are
+# imported by the loader thread so the app can bind its port first
+if TYPE_CHECKING:
+    from services.chains import ChainRegistry
+    from services.corpus import Corpus, PartitionedCorpus
+    from services.hybrid import HybridRetriever
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Named corpora hosted by the service. A corpus with "partitions" gets one
+# index per key (the /ask asset types); "templates" are the prompts it serves;
+# "hybrid" adds BM25 to vector search for exact scheme names and figures.
+CORPORA = {
+    "assets": {
+        "partitions": {
+            "pipeline": [os.path.join(BASE_DIR, "PIPELINE.pdf")],
+            "storage": [os.path.join(BASE_DIR, "STORAGE.pdf")],
+            "distribution_hub": [os.path.join(BASE_DIR, "Distribution_Hub.pdf")],
+            "plant": [os.path.join(BASE_DIR, "Plant_asset.pdf")],
+        },
+        "splitter": {"separator": "\n", "chunk_size": 1000, "chunk_overlap": 200},
+        "templates": ["plant", "storage", "distribution_hub", "pipeline"],
+    },
+    "policy": {
+        "pdf_paths": [os.path.join(BASE_DIR, "hydrogen.pdf")],
+        "splitter": {"separator": "\n", "chunk_size": 1192, "chunk_overlap": 200},
+        "templates": ["chat"],
+        "hybrid": True,
+    },
+}
+
+# How long a request arriving during startup waits for its corpus before a 503
+READY_WAIT_SECONDS = float(os.getenv("READY_WAIT_SECONDS", "5"))
+
+# A corpus that failed to load is retried after this delay, doubling per
+# consecutive failure up to the cap, so a transient outage heals without a restart
+LOAD_RETRY_SECONDS = float(os.getenv("LOAD_RETRY_SECONDS", "5"))
+LOAD_RETRY_MAX_SECONDS = float(os.getenv("LOAD_RETRY_MAX_SECONDS", "300"))
+
+AnyCorpus = Union["Corpus", "PartitionedCorpus"]
+
+
+class RetrievalService:
+    """
+    Every RAG corpus of the process behind one object.
+
+    The embedding client, LLM, answer cache, request coalescer and
+    concurrency limit are shared; corpora and their chains are built on
+    first use, so a process only loads the corpora its routes need. Apps
+    call load() at startup to build them on background threads instead.
+    """
+
+    def __init__(
+        self, embeddings=None, llm=None, corpora: Dict[str, Dict] = CORPORA, embedding_model: Optional[str] = None
+    ):
+        # Without clients, the RAG_BACKEND ones are built with the first corpus
+        self.embeddings = embeddings
+        self.llm = llm
+        self.config = corpora
+        self.embedding_model = embedding_model
+        self.corpora: Dict[str, AnyCorpus] = {}
+        self.chains: Dict[str, "ChainRegistry"] = {}
+        self.retrievers: Dict[str, "HybridRetriever"] = {}
+        self.answer_cache = AnswerCache()
+        self.coalescer = RequestCoalescer()
+        self.limiter = ConcurrencyLimiter()
+        self.packer = ContextPacker()
+        self.context_tokens = 0
+        self.context_tokens_saved = 0
+        self.load_errors: Dict[str, str] = {}
+        self._build_locks = {name: threading.Lock() for name in corpora}
+        self._backend_lock = threading.Lock()
+        self._loaded: Dict[str, threading.Event] = {}
+        self._load_lock = threading.Lock()
+        self._load_failures: Dict[str, int] = {}
+        self._retry_at: Dict[str, float] = {}
+
+    def _ensure_backend(self) -> None:
+        with self._backend_lock:
+            if self.embeddings is None or self.llm is None:
+                from services.backends import build_backend
+
+                # RAG_BACKEND picks Gemini or the offline fake
+                embeddings, llm, embedding_model = build_backend()
+                self.embeddings = self.embeddings or embeddings
+                self.llm = self.llm or llm
+                self.embedding_model = self.embedding_model or embedding_model
+
+    def corpus(self, name: str) -> AnyCorpus:
+        if name not in self.corpora:
+            with self._build_locks[name]:
+                if name not in self.corpora:
+                    from services.chains import ChainRegistry
+                    from services.corpus import Corpus, PartitionedCorpus
+                    from services.hybrid import HybridRetriever
+
+                    self._ensure_backend()
+                    config = self.config[name]
+                    if "partitions" in config:
+                        corpus = PartitionedCorpus(
+                            name, config["partitions"], config["splitter"], self.embeddings, self.embedding_model
+                        )
+                    else:
+                        corpus = Corpus(
+                            name, config["pdf_paths"], config["splitter"], self.embeddings, self.embedding_model
+                        )
+                    if config.get("hybrid"):
+                        self.retrievers[name] = HybridRetriever(corpus)
+                    self.chains[name] = ChainRegistry(self.llm, config["templates"])
+                    self.corpora[name] = corpus
+        return self.corpora[name]
+
+    def load(self, names: List[str]) -> None:
+        """
+        Start building corpora on background threads; returns at once.
+        A corpus that failed is started again once its retry delay is up.
+        """
+        with self._load_lock:
+            for name in names:
+                if name in self._loaded and not self._retry_due(name):
+                    continue
+                event = self._loaded[name] = threading.Event()
+                threading.Thread(target=self._load, args=(name, event), name=f"load-{name}", daemon=True).start()
+
+    def _retry_due(self, name: str) -> bool:
+        return (
+            self._loaded[name].is_set()
+            and name in self.load_errors
+            and time.monotonic() >= self._retry_at.get(name, 0.0)
+        )
+
+    def _load(self, name: str, event: threading.Event) -> None:
+        start = time.perf_counter()
+        try:
+            self.corpus(name)
+            self.load_errors.pop(name, None)
+            self._load_failures.pop(name, None)
+            logger.info("Corpus '%s' ready in %.1fs", name, time.perf_counter() - start)
+        except Exception as e:
+            failures = self._load_failures[name] = self._load_failures.get(name, 0) + 1
+            delay = min(LOAD_RETRY_SECONDS * 2 ** (failures - 1), LOAD_RETRY_MAX_SECONDS)
+            self._retry_at[name] = time.monotonic() + delay
+            self.load_errors[name] = str(e)
+            logger.exception("Corpus '%s' failed to load; retrying in %.0fs", name, delay)
+        finally:
+            event.set()
+
+    def readiness(self, names: List[str]) -> Dict[str, Dict]:
+        status = {}
+        for name in names:
+            if name in self.corpora:
+                status[name] = {"status": "ready", "failed_documents": self.corpora[name].failed}
+            elif name in self.load_errors:
+                # A readiness probe is what drives retries when no requests arrive
+                self.load([name])
+                status[name] = {"status": "failed", "error": self.load_errors[name]}
+            else:
+                status[name] = {"status": "loading"}
+        return status
+
+    async def ready_corpus(self, name: str, wait: float = READY_WAIT_SECONDS) -> AnyCorpus:
+        """The corpus once loaded; waits up to `wait` seconds, then raises 503"""
+        if name in self.corpora:
+            return self.corpora[name]
+        self.load([name])
+        deadline = time.monotonic() + wait
+        while not self._loaded[name].is_set() and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if name in self.corpora:
+            return self.corpora[name]
+        if name in self.load_errors:
+            retry_in = max(self._retry_at.get(name, 0.0) - time.monotonic(), 1.0)
+            raise HTTPException(
+                status_code=503,
+                detail=f"Corpus '{name}' failed to load: {self.load_errors[name]}",
+                headers={"Retry-After": str(int(retry_in))},
+            )
+        raise HTTPException(
+            status_code=503, detail=f"Corpus '{name}' is still loading", headers={"Retry-After": "5"}
+        )
+
+    def templates(self, corpus: str) -> List[str]:
+        return list(self.config[corpus]["templates"])
+
+    async def answer(
+        self, corpus: str, template: str, question: str, partition: Optional[str] = None, facts: Optional[str] = None
+    ) -> Tuple[str, Optional[Dict]]:
+        """
+        Cached, coalesced and rate-limited retrieval + generation. Returns the
+        answer and the context packing report (None for cached answers).
+        facts are put ahead of the retrieved context.
+        """
+        await self.ready_corpus(corpus)
+        namespace = _namespace(corpus, template, facts)
+        # Serve repeated questions without embedding
+        cached = self.answer_cache.get_exact(namespace, question)
+        if cached is not None:
+            return cached, None
+
+        async def run():
+            async with self.limiter.slot():
+                # Then near-duplicates of earlier questions
+                question_vector = await self.embeddings.aembed_query(question)
+                cached = self.answer_cache.get_similar(namespace, question_vector)
+                if cached is not None:
+                    return cached, None
+
+                docs = await self._retrieve(corpus, question, question_vector, partition)
+                context, report = self._pack(namespace, docs, facts)
+                response = await self.chains[corpus].chain(template).arun(context=context, question=question)
+                self.answer_cache.put(namespace, question, question_vector, response)
+                return response, report
+
+        # Identical questions in flight share one retrieval and LLM call
+        key = (corpus, template, partition, normalize_question(question), facts)
+        return await self.coalescer.run(key, run)
+
+    async def stream(
+        self, corpus: str, template: str, question: str, partition: Optional[str] = None, facts: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Server-sent events for one answer: token events as the model writes,
+        then a done event with the retrieved chunk ids. Raises 503 or 429
+        before the first event.
+        """
+        await self.ready_corpus(corpus)
+        namespace = _namespace(corpus, template, facts)
+        cached = self.answer_cache.get_exact(namespace, question)
+        if cached is not None:
+            async def cached_events():
+                yield sse("token", {"text": cached})
+                yield sse("done", {"cached": True})
+
+            return cached_events()
+        # Hold the slot before the response starts, while a 429 can still be
+        # sent; the stream gives it back when it ends
+        await self.limiter.acquire()
+
+        async def events():
+            try:
+                question_vector = await self.embeddings.aembed_query(question)
+                similar = self.answer_cache.get_similar(namespace, question_vector)
+                if similar is not None:
+                    yield sse("token", {"text": similar})
+                    yield sse("done", {"cached": True})
+                    return
+
+                docs = await self._retrieve(corpus, question, question_vector, partition)
+                context, report = self._pack(namespace, docs, facts)
+                prompt = self.chains[corpus].prompt(template).format(context=context, question=question)
+
+                parts = []
+                async for text in stream_text(self.llm, prompt):
+                    parts.append(text)
+                    yield sse("token", {"text": text})
+                self.answer_cache.put(namespace, question, question_vector, "".join(parts))
+                yield sse("done", {"cached": False, **retrieval_metadata(docs), "context": report})
+            except Exception as e:
+                yield sse("error", {"detail": str(getattr(e, "detail", e))})
+            finally:
+                self.limiter.release()
+
+        return events()
+
+    def reload_templates(self) -> Dict[str, List[str]]:
+        changed = {name: registry.reload() for name, registry in self.chains.items()}
+        if any(changed.values()):
+            self.answer_cache.clear()
+        return changed
+
+    def stats(self) -> Dict:
+        return {
+            **self.answer_cache.stats(),
+            "coalesced_requests": self.coalescer.coalesced,
+            "rejected_requests": self.limiter.rejected,
+            "context_tokens": self.context_tokens,
+            "context_tokens_saved": self.context_tokens_saved,
+            "corpora": sorted(self.corpora),
+        }
+
+    def _pack(self, namespace: str, docs, facts: Optional[str] = None) -> Tuple[str, Dict]:
+        context, report = self.packer.pack(docs)
+        if facts:
+            context = f"{facts}\n\n{context}"
+        self.context_tokens += report["tokens"]
+        self.context_tokens_saved += report["tokens_saved"]
+        logger.info(
+            "%s context: %d chunks -> %d segments, %d tokens (%d saved)",
+            namespace, report["chunks"], report["segments"], report["tokens"], report["tokens_saved"],
+        )
+        return context, report
+
+    async def _retrieve(self, corpus: str, question: str, question_vector: List[float], partition: Optional[str]):
+        if corpus in self.retrievers:
+            return await self.retrievers[corpus].asearch_by_vector(question, question_vector)
+        store = self.corpora[corpus]
+        if "partitions" in self.config[corpus]:
+            return await store.asimilarity_search_by_vector(question_vector, partition=partition)
+        return await store.asimilarity_search_by_vector(question_vector)
+
+
+def _namespace(corpus: str, template: str, facts: Optional[str]) -> str:
+    # Answers built on different facts (e.g. another location) are cached apart
+    namespace = f"{corpus}/{template}"
+    if facts:
+        namespace += "#" + hashlib.sha1(facts.encode("utf-8")).hexdigest()[:12]
+    return namespace
+
+
+_service: Optional[RetrievalService] = None
+_service_lock = threading.Lock()
+
+
+def get_service() -> RetrievalService:
+    """The process-wide service; every route module shares this instance"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = RetrievalService()
+    return _service
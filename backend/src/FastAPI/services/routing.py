@@ -0,0 +1,288 @@
+import math
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from scipy.spatial import cKDTree
+
+from services.index_store import BASE_DIR
+from services.spatial_index import EARTH_RADIUS_KM, NUMBER_RE, SpatialIndex, question_fields, resolve_point
+
+# Cost grid for pipeline routes: an .npz with `cost` (rows north to south,
+# cost per km of each cell; inf or nan cells cannot be crossed) and the
+# grid's `north`, `west` and `cell_deg` in degrees
+ROUTING_GRID_PATH = os.getenv("ROUTING_GRID_PATH", os.path.join(BASE_DIR, "cost_grid.npz"))
+
+# Origin/destination pairs whose routes are kept
+ROUTE_CACHE_SIZE = int(os.getenv("ROUTE_CACHE_SIZE", "1024"))
+
+# Waypoints of a route listed in the /ask context
+FACTS_WAYPOINTS = 20
+
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+
+# Forward neighbour steps (row, col); the graph is undirected, so the other
+# four directions are the same edges read backwards
+STEPS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+
+class CostGrid:
+    """
+    A cost surface over a lat/lon grid as an 8-connected graph. An edge's
+    weight is the step length in km times the mean cost of its two cells,
+    so a route's weight is its cost and flat unit cost gives plain km.
+    """
+
+    def __init__(self, cost: np.ndarray, north: float, west: float, cell_deg: float):
+        cost = np.asarray(cost, dtype=float)
+        if cost.ndim != 2 or cell_deg <= 0:
+            raise ValueError("The cost grid must be a 2-D array with a positive cell size")
+        self.cost = np.where(np.isfinite(cost) & (cost > 0), cost, np.inf)
+        self.north, self.west, self.cell_deg = float(north), float(west), float(cell_deg)
+        self.rows, self.cols = cost.shape
+        self.passable = np.isfinite(self.cost)
+
+        # East-west steps shrink with latitude; the rest do not
+        lat = self.north - (np.arange(self.rows) + 0.5) * self.cell_deg
+        self.dx_km = self.cell_deg * KM_PER_DEGREE * np.cos(np.radians(lat))
+        self.dy_km = self.cell_deg * KM_PER_DEGREE
+
+        sources, targets, weights = [], [], []
+        node = np.arange(self.rows * self.cols).reshape(self.rows, self.cols)
+        for dr, dc in STEPS:
+            r0, r1 = 0, self.rows - dr
+            c0, c1 = max(0, -dc), self.cols - max(0, dc)
+            a = (slice(r0, r1), slice(c0, c1))
+            b = (slice(r0 + dr, r1 + dr), slice(c0 + dc, c1 + dc))
+            ok = self.passable[a] & self.passable[b]
+            # Rows of a diagonal step average the two latitudes' widths
+            dx = (self.dx_km[r0:r1] + self.dx_km[r0 + dr:r1 + dr])[:, None] / 2 if dc else 0.0
+            length = np.hypot(dx * abs(dc), self.dy_km * dr) * np.ones(ok.shape)
+            sources.append(node[a][ok])
+            targets.append(node[b][ok])
+            weights.append((length * (self.cost[a] + self.cost[b]) / 2)[ok])
+        size = self.rows * self.cols
+        self.graph = csr_matrix(
+            (np.concatenate(weights), (np.concatenate(sources), np.concatenate(targets))), shape=(size, size)
+        )
+        self._snap = None
+
+    @classmethod
+    def load(cls, path: str) -> "CostGrid":
+        with np.load(path, allow_pickle=False) as data:
+            try:
+                return cls(data["cost"], float(data["north"]), float(data["west"]), float(data["cell_deg"]))
+            except (KeyError, TypeError) as e:
+                raise ValueError(f"{path} is not a cost grid (cost, north, west and cell_deg): {e}")
+
+    def cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        row = int((self.north - lat) // self.cell_deg)
+        col = int((lon - self.west) // self.cell_deg)
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise ValueError(f"{lat}, {lon} is outside the cost grid")
+        return row, col
+
+    def center(self, row: int, col: int) -> Tuple[float, float]:
+        return self.north - (row + 0.5) * self.cell_deg, self.west + (col + 0.5) * self.cell_deg
+
+    def snap(self, lat: float, lon: float) -> int:
+        """Node of the passable cell at or nearest to a point"""
+        row, col = self.cell(lat, lon)
+        if self.passable[row, col]:
+            return row * self.cols + col
+        if self._snap is None:
+            if not self.passable.any():
+                raise ValueError("The cost grid has no passable cells")
+            self._snap = cKDTree(np.argwhere(self.passable))
+        _, i = self._snap.query([row, col])
+        row, col = self._snap.data[i].astype(int)
+        return row * self.cols + col
+
+    def straight_cost(self, source: int, target: int) -> float:
+        """
+        Cost of following the straight line between two cells, or inf if it
+        crosses an impassable cell. Any least-cost route costs no more, so
+        it bounds the search.
+        """
+        (r0, c0), (r1, c1) = divmod(source, self.cols), divmod(target, self.cols)
+        steps = max(abs(r1 - r0), abs(c1 - c0))
+        if steps == 0:
+            return 0.0
+        rows = np.rint(np.linspace(r0, r1, steps + 1)).astype(int)
+        cols = np.rint(np.linspace(c0, c1, steps + 1)).astype(int)
+        cost = self.cost[rows, cols]
+        if not np.isfinite(cost).all():
+            return math.inf
+        dr, dc = np.diff(rows), np.diff(cols)
+        dx = (self.dx_km[rows[:-1]] + self.dx_km[rows[1:]]) / 2
+        length = np.hypot(dx * np.abs(dc), self.dy_km * np.abs(dr))
+        return float(np.sum(length * (cost[:-1] + cost[1:]) / 2))
+
+
+def simplify(cells: np.ndarray) -> np.ndarray:
+    """Keep the ends and the cells where the path changes direction"""
+    if len(cells) <= 2:
+        return cells
+    steps = np.diff(cells, axis=0)
+    turns = np.flatnonzero(np.any(steps[1:] != steps[:-1], axis=1)) + 1
+    return cells[np.concatenate([[0], turns, [len(cells) - 1]])]
+
+
+class Router:
+    """
+    Least-cost routes over a CostGrid with Dijkstra, bounded by the cost
+    of the straight line so only cells that could lie on a cheaper route
+    are settled. Routes are cached by their end cells in either order.
+    """
+
+    def __init__(self, grid: CostGrid, cache_size: int = ROUTE_CACHE_SIZE):
+        self.grid = grid
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[int, int], Optional[Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def route(self, origin: Tuple[float, float], destination: Tuple[float, float]) -> Optional[Dict]:
+        """The route between two points, or None if no passable route joins them"""
+        source, target = self.grid.snap(*origin), self.grid.snap(*destination)
+        key = (min(source, target), max(source, target))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return _oriented(self._cache[key], source <= target)
+            self.misses += 1
+
+        route = self._search(*key)
+        with self._lock:
+            self._cache[key] = route
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return _oriented(route, source <= target)
+
+    def _search(self, source: int, target: int) -> Optional[Dict]:
+        grid = self.grid
+        if source == target:
+            nodes = np.array([source])
+            cost = 0.0
+        else:
+            bound = grid.straight_cost(source, target)
+            distances, predecessors = dijkstra(
+                grid.graph, directed=False, indices=source, return_predecessors=True, limit=bound * (1 + 1e-9)
+            )
+            if not np.isfinite(distances[target]):
+                return None
+            cost = float(distances[target])
+            path = [target]
+            while path[-1] != source:
+                path.append(predecessors[path[-1]])
+            nodes = np.array(path[::-1])
+
+        cells = np.column_stack(np.divmod(nodes, grid.cols))
+        rows, cols = cells[:, 0], cells[:, 1]
+        dx = (grid.dx_km[rows[:-1]] + grid.dx_km[rows[1:]]) / 2
+        length = float(np.sum(np.hypot(dx * np.abs(np.diff(cols)), grid.dy_km * np.abs(np.diff(rows)))))
+        (lat0, lon0), (lat1, lon1) = grid.center(*cells[0]), grid.center(*cells[-1])
+        return {
+            "origin": [lat0, lon0],
+            "destination": [lat1, lon1],
+            "length_km": round(length, 3),
+            "straight_km": round(_haversine_km(lat0, lon0, lat1, lon1), 3),
+            "cost": round(cost, 3),
+            "cells": len(nodes),
+            "waypoints": [list(grid.center(r, c)) for r, c in simplify(cells)],
+        }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "grid": [self.grid.rows, self.grid.cols],
+                "cell_deg": self.grid.cell_deg,
+                "cached_routes": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+def _oriented(route: Optional[Dict], forward: bool) -> Optional[Dict]:
+    # Cached routes run from the lower node; flip them for the other direction
+    if route is None or forward:
+        return route
+    return {
+        **route,
+        "origin": route["destination"],
+        "destination": route["origin"],
+        "waypoints": route["waypoints"][::-1],
+    }
+
+
+def _haversine_km(lat0: float, lon0: float, lat1: float, lon1: float) -> float:
+    lat0, lon0, lat1, lon1 = map(math.radians, (lat0, lon0, lat1, lon1))
+    h = math.sin((lat1 - lat0) / 2) ** 2 + math.cos(lat0) * math.cos(lat1) * math.sin((lon1 - lon0) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+def route_ends(
+    index: SpatialIndex, question: str
+) -> Optional[Tuple[Tuple[float, float], Tuple[float, float]]]:
+    """
+    Route ends from the question's Origin and Destination lines, or else
+    from a Location line naming two known assets or points
+    ("Hazira,Ahmedabad", "21.1,72.6,23.0,72.6", "21.1,72.6; Ahmedabad").
+    """
+    fields = question_fields(question)
+    if "origin" in fields and "destination" in fields:
+        origin, destination = resolve_point(index, fields["origin"]), resolve_point(index, fields["destination"])
+        return (origin, destination) if origin and destination else None
+    location = fields.get("location", "").strip("[] ")
+    numbers = NUMBER_RE.findall(location)
+    if len(numbers) == 4 and not NUMBER_RE.sub("", location).strip(" ,;"):
+        parts = [",".join(numbers[:2]), ",".join(numbers[2:])]
+    else:
+        parts = [p for p in location.split(";" if ";" in location else ",") if p.strip()]
+    if len(parts) != 2:
+        return None
+    origin, destination = resolve_point(index, parts[0]), resolve_point(index, parts[1])
+    return (origin, destination) if origin and destination else None
+
+
+def route_facts(route: Optional[Dict]) -> str:
+    """A route as context lines for the pipeline report"""
+    if route is None:
+        return "Least-cost pipeline route: no passable route joins the two ends on the cost grid."
+    detour = route["length_km"] / route["straight_km"] - 1 if route["straight_km"] else 0.0
+    waypoints = route["waypoints"]
+    if len(waypoints) > FACTS_WAYPOINTS:
+        keep = np.linspace(0, len(waypoints) - 1, FACTS_WAYPOINTS).round().astype(int)
+        waypoints = [waypoints[i] for i in keep]
+    return "\n".join([
+        "Least-cost pipeline route (cost grid, Dijkstra):",
+        f"- From {route['origin'][0]:.4f}, {route['origin'][1]:.4f} to "
+        f"{route['destination'][0]:.4f}, {route['destination'][1]:.4f}",
+        f"- Length: {route['length_km']:.1f} km (straight line {route['straight_km']:.1f} km, "
+        f"detour {detour:.0%}); cost {route['cost']:.1f}",
+        "- Waypoints: " + "; ".join(f"{lat:.3f}, {lon:.3f}" for lat, lon in waypoints),
+    ])
+
+
+_router: Tuple[Optional[float], Optional[Router]] = (None, None)
+_router_lock = threading.Lock()
+
+
+def get_router(path: str = ROUTING_GRID_PATH) -> Optional[Router]:
+    """The router over ROUTING_GRID_PATH, rebuilt when the file changes; None without one"""
+    global _router
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+    with _router_lock:
+        if _router[0] != mtime:
+            _router = (mtime, Router(CostGrid.load(path)) if mtime is not None else None)
+        return _router[1]
@@ -0,0 +1,231 @@
+import csv
+import json
+import math
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from services.index_store import BASE_DIR
+
+# Known plants, demand centers, ports, renewable sites... one per row with
+# kind, name, lat and lon; other columns are returned with the asset.
+# CSV or a JSON list of objects; without the file the index is empty.
+SPATIAL_ASSETS_PATH = os.getenv("SPATIAL_ASSETS_PATH", os.path.join(BASE_DIR, "assets.csv"))
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Nearest assets listed per kind in the /ask context, and how many more of
+# the preferred kind
+FACTS_PER_KIND = 3
+FACTS_PREFERRED = 5
+
+REQUIRED_FIELDS = ("kind", "name", "lat", "lon")
+
+# "Key: value" lines of the questions the asset controllers send
+FIELD_RE = re.compile(r"^\s*([A-Za-z][A-Za-z ]*?)\s*:\s*(.*?)\s*$", re.MULTILINE)
+NUMBER_RE = re.compile(r"[-+]?\d+(?:\.\d+)?")
+MILES_RE = re.compile(r"\b(mi|miles?)\b", re.IGNORECASE)
+KM_PER_MILE = 1.609344
+
+
+def to_unit_xyz(lat, lon) -> np.ndarray:
+    """Points on the unit sphere (ECEF directions) for degrees lat/lon"""
+    lat, lon = np.radians(np.asarray(lat, dtype=float)), np.radians(np.asarray(lon, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def chord_to_km(chord) -> np.ndarray:
+    # Straight-line distance through the sphere -> great-circle distance
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2, 0.0, 1.0))
+
+
+def km_to_chord(km: float) -> float:
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+class SpatialIndex:
+    """
+    Assets by kind with a KD-tree per kind, plus one over all of them.
+
+    Points are stored as unit vectors, where the straight-line (chord)
+    distance grows monotonically with the great-circle distance. Nearest
+    and radius queries are therefore exact on the sphere, with no
+    longitude wrap or polar distortion. Distances come back in km.
+    """
+
+    def __init__(self, assets: List[Dict]):
+        self.assets = list(assets)
+        try:
+            self.lat = np.array([a["lat"] for a in self.assets], dtype=float)
+            self.lon = np.array([a["lon"] for a in self.assets], dtype=float)
+            self.kind = np.array([str(a["kind"]).strip().lower() for a in self.assets], dtype=object)
+            names = [str(a["name"]).strip().lower() for a in self.assets]
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Every asset needs {', '.join(REQUIRED_FIELDS)}: {e}")
+        # NaN fails both comparisons too
+        invalid = np.flatnonzero(~((np.abs(self.lat) <= 90) & (np.abs(self.lon) <= 180)))
+        if len(invalid):
+            i = invalid[0]
+            raise ValueError(f"Asset {i} has coordinates out of range: {self.lat[i]}, {self.lon[i]}")
+        points = to_unit_xyz(self.lat, self.lon).reshape(-1, 3)
+
+        # kind -> (positions in self.assets, tree over those points); None is every kind
+        self._trees: Dict[Optional[str], Tuple[np.ndarray, cKDTree]] = {}
+        if self.assets:
+            self._trees[None] = (np.arange(len(self.assets)), cKDTree(points))
+            for kind in sorted(set(self.kind)):
+                positions = np.flatnonzero(self.kind == kind)
+                self._trees[kind] = (positions, cKDTree(points[positions]))
+        self._names = {name: i for i, name in enumerate(names)}
+
+    @classmethod
+    def from_file(cls, path: str) -> "SpatialIndex":
+        with open(path, encoding="utf-8", newline="") as f:
+            if path.lower().endswith(".json"):
+                return cls(json.load(f))
+            rows = csv.DictReader(f)
+            return cls([{k.strip(): v.strip() if isinstance(v, str) else v for k, v in row.items()} for row in rows])
+
+    def __len__(self) -> int:
+        return len(self.assets)
+
+    @property
+    def kinds(self) -> List[str]:
+        return [kind for kind in self._trees if kind is not None]
+
+    def locate(self, name: str) -> Optional[Tuple[float, float]]:
+        """Coordinates of an asset by name, ignoring case"""
+        position = self._names.get(name.strip().lower())
+        return None if position is None else (self.lat[position], self.lon[position])
+
+    def nearest(self, lat: float, lon: float, k: int = 1, kind: Optional[str] = None) -> List[Dict]:
+        """The k closest assets (of one kind, or any), closest first"""
+        if kind not in self._trees or k <= 0:
+            return []
+        positions, tree = self._trees[kind]
+        k = min(k, len(positions))
+        chords, found = tree.query(to_unit_xyz(lat, lon), k=k)
+        chords, found = np.atleast_1d(chords), np.atleast_1d(found)
+        return self._results(positions[found], chord_to_km(chords))
+
+    def within_radius(
+        self, lat: float, lon: float, radius_km: float, kind: Optional[str] = None, limit: Optional[int] = None
+    ) -> Tuple[int, List[Dict]]:
+        """How many assets lie within radius_km, and the closest `limit` of them"""
+        if kind not in self._trees or radius_km < 0:
+            return 0, []
+        positions, tree = self._trees[kind]
+        query = to_unit_xyz(lat, lon)
+        found = np.asarray(tree.query_ball_point(query, km_to_chord(radius_km)), dtype=np.intp)
+        if not len(found):
+            return 0, []
+        distances = chord_to_km(np.linalg.norm(tree.data[found] - query, axis=1))
+        order = np.argsort(distances, kind="stable")
+        if limit is not None:
+            order = order[:limit]
+        return len(found), self._results(positions[found[order]], distances[order])
+
+    def stats(self) -> Dict:
+        return {"assets": len(self), "kinds": {kind: len(self._trees[kind][0]) for kind in self.kinds}}
+
+    def _results(self, positions: np.ndarray, distances: np.ndarray) -> List[Dict]:
+        return [
+            {
+                **self.assets[p],
+                "kind": self.kind[p],
+                "lat": float(self.lat[p]),
+                "lon": float(self.lon[p]),
+                "distance_km": round(float(d), 3),
+            }
+            for p, d in zip(positions, distances)
+        ]
+
+
+def question_fields(question: str) -> Dict[str, str]:
+    """Lower-cased "Key: value" fields of a question"""
+    return {key.strip().lower(): value for key, value in FIELD_RE.findall(question)}
+
+
+def parse_radius_km(text: str) -> Optional[float]:
+    match = NUMBER_RE.search(text or "")
+    if match is None:
+        return None
+    value = float(match.group())
+    return value * KM_PER_MILE if MILES_RE.search(text) else value
+
+
+def resolve_point(index: SpatialIndex, location: str) -> Optional[Tuple[float, float]]:
+    """A "lat, lon" pair, or the name of a known asset, from a Location field"""
+    numbers = NUMBER_RE.findall(location or "")
+    if len(numbers) == 2:
+        lat, lon = float(numbers[0]), float(numbers[1])
+        if -90 <= lat <= 90 and -180 <= lon <= 180:
+            return lat, lon
+    for name in re.split(r"[,;\[\]\"']+", location or ""):
+        if name.strip():
+            point = index.locate(name)
+            if point is not None:
+                return point
+    return None
+
+
+def spatial_facts(
+    index: SpatialIndex,
+    question: str,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    radius_km: Optional[float] = None,
+    proximity: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Nearest assets of each kind around the request's location, as context
+    lines for the prompt. The location, service radius and proximity
+    preference come from the arguments or else from the question's
+    Location, Service Radius and Proximity/Logistic Preference lines.
+    None when the index is empty or no location is known.
+    """
+    if not len(index):
+        return None
+    fields = question_fields(question)
+    if lat is None or lon is None:
+        point = resolve_point(index, fields.get("location", ""))
+        if point is None:
+            return None
+        lat, lon = point
+    if radius_km is None:
+        radius_km = parse_radius_km(fields.get("service radius", ""))
+    proximity = (proximity or fields.get("proximity preference") or fields.get("logistic preference") or "").strip().lower()
+
+    kinds = sorted(index.kinds, key=lambda kind: kind != proximity)
+    lines = [f"Spatial facts (great-circle distances from {lat:.4f}, {lon:.4f}):"]
+    for kind in kinds:
+        preferred = kind == proximity
+        nearest = index.nearest(lat, lon, k=FACTS_PREFERRED if preferred else FACTS_PER_KIND, kind=kind)
+        listed = ", ".join(f"{a['name']} ({a['distance_km']:.1f} km)" for a in nearest)
+        lines.append(f"- Nearest {kind}{' (preferred)' if preferred else ''}: {listed}")
+        if radius_km:
+            count, _ = index.within_radius(lat, lon, radius_km, kind=kind)
+            lines.append(f"- {kind} within {radius_km:g} km: {count}")
+    return "\n".join(lines)
+
+
+_index: Tuple[Optional[float], SpatialIndex] = (None, SpatialIndex([]))
+_index_lock = threading.Lock()
+
+
+def get_spatial_index(path: str = SPATIAL_ASSETS_PATH) -> SpatialIndex:
+    """The index over SPATIAL_ASSETS_PATH, rebuilt when the file changes"""
+    global _index
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+    with _index_lock:
+        if _index[0] != mtime:
+            _index = (mtime, SpatialIndex.from_file(path) if mtime is not None else SpatialIndex([]))
+        return _index[1]
@@ -0,0 +1,41 @@
+import json
+from typing import AsyncIterator, Dict, List, Optional
+
+from fastapi.responses import StreamingResponse
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Stop nginx-style proxies from buffering the stream
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse(event: str, data: Dict) -> str:
+    """Format one server-sent event; data is JSON so newlines stay escaped"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+async def stream_text(llm, prompt: str) -> AsyncIterator[str]:
+    """Yield text pieces from a chat model or plain LLM as they are generated"""
+    async for chunk in llm.astream(prompt):
+        text = getattr(chunk, "content", chunk)
+        if text:
+            yield text
+
+
+def context_headers(report: Optional[Dict]) -> Dict[str, str]:
+    """Response headers describing how the prompt context was packed"""
+    if report is None:
+        return {}
+    return {"X-Context-Tokens": str(report["tokens"]), "X-Context-Tokens-Saved": str(report["tokens_saved"])}
+
+
+def retrieval_metadata(docs) -> Dict[str, List[str]]:
+    return {
+        "chunk_ids": [d.metadata.get("chunk_id") for d in docs],
+        "sources": sorted({d.metadata.get("source") for d in docs if d.metadata.get("source")}),
+    }
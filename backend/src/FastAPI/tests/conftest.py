@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# Offline backends and throwaway caches, set before any service module reads them
+_SCRATCH = tempfile.mkdtemp(prefix="rag-tests-")
+os.environ["RAG_BACKEND"] = "fake"
+os.environ["INDEX_CACHE_DIR"] = os.path.join(_SCRATCH, "index")
+os.environ["CORPUS_DIR"] = os.path.join(_SCRATCH, "corpus")
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
@@ -0,0 +1,113 @@
+"""AnswerCache: exact and similar lookups, TTL expiry and LRU eviction"""
+import math
+
+import pytest
+
+from services import answer_cache
+from services.answer_cache import AnswerCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(answer_cache.time, "monotonic", clock)
+    return clock
+
+
+def angled(degrees: float):
+    """A unit vector `degrees` away from [1, 0]; cosine similarity is cos(degrees)"""
+    radians = math.radians(degrees)
+    return [math.cos(radians), math.sin(radians)]
+
+
+def test_exact_lookup_ignores_case_and_whitespace():
+    cache = AnswerCache(max_entries=8, ttl=60, threshold=0.95)
+    cache.put("storage", "What is  the capacity?", angled(0), "42 t")
+    assert cache.get_exact("storage", "  what is the CAPACITY? ") == "42 t"
+    assert cache.get_exact("pipeline", "What is the capacity?") is None
+    assert cache.stats()["exact_hits"] == 1
+
+
+def test_similar_lookup_honours_the_threshold():
+    cache = AnswerCache(max_entries=8, ttl=60, threshold=0.95)
+    cache.put("storage", "capacity?", angled(0), "42 t")
+    # cos(15°) ≈ 0.966 clears 0.95; cos(20°) ≈ 0.940 does not
+    assert cache.get_similar("storage", angled(15)) == "42 t"
+    assert cache.get_similar("storage", angled(20)) is None
+    # Vectors are normalized, so length does not matter
+    assert cache.get_similar("storage", [10.0, 0.0]) == "42 t"
+    # Namespaces never answer for each other
+    assert cache.get_similar("pipeline", angled(0)) is None
+    stats = cache.stats()
+    assert (stats["semantic_hits"], stats["misses"]) == (2, 2)
+
+
+def test_similar_lookup_picks_the_closest_question():
+    cache = AnswerCache(max_entries=8, ttl=60, threshold=0.9)
+    cache.put("storage", "near", angled(5), "near answer")
+    cache.put("storage", "far", angled(20), "far answer")
+    assert cache.get_similar("storage", angled(0)) == "near answer"
+    assert cache.get_similar("storage", angled(24)) == "far answer"
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = AnswerCache(max_entries=8, ttl=60, threshold=0.95)
+    cache.put("storage", "capacity?", angled(0), "42 t")
+    clock.now += 59
+    assert cache.get_exact("storage", "capacity?") == "42 t"
+    assert cache.get_similar("storage", angled(0)) == "42 t"
+    clock.now += 2
+    assert cache.get_similar("storage", angled(0)) is None
+    assert cache.get_exact("storage", "capacity?") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_put_refreshes_the_ttl(clock):
+    cache = AnswerCache(max_entries=8, ttl=60, threshold=0.95)
+    cache.put("storage", "capacity?", angled(0), "old")
+    clock.now += 50
+    cache.put("storage", "capacity?", angled(0), "new")
+    clock.now += 50
+    assert cache.get_exact("storage", "capacity?") == "new"
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = AnswerCache(max_entries=2, ttl=60, threshold=0.95)
+    cache.put("storage", "first", angled(0), "1")
+    cache.put("storage", "second", angled(90), "2")
+    # Reading "first" makes "second" the least recently used
+    assert cache.get_exact("storage", "first") == "1"
+    cache.put("pipeline", "third", angled(45), "3")
+    assert cache.get_exact("storage", "second") is None
+    assert cache.get_similar("storage", angled(90)) is None
+    assert cache.get_exact("storage", "first") == "1"
+    assert cache.get_exact("pipeline", "third") == "3"
+    assert cache.stats()["size"] == 2
+
+
+def test_a_similar_hit_also_counts_as_a_use():
+    cache = AnswerCache(max_entries=2, ttl=60, threshold=0.95)
+    cache.put("storage", "first", angled(0), "1")
+    cache.put("storage", "second", angled(90), "2")
+    assert cache.get_similar("storage", angled(1)) == "1"
+    cache.put("storage", "third", angled(45), "3")
+    assert cache.get_exact("storage", "first") == "1"
+    assert cache.get_exact("storage", "second") is None
+
+
+def test_clear_empties_every_namespace():
+    cache = AnswerCache(max_entries=8, ttl=60, threshold=0.95)
+    cache.put("storage", "a", angled(0), "1")
+    cache.put("pipeline", "b", angled(0), "2")
+    cache.clear()
+    assert cache.get_similar("storage", angled(0)) is None
+    assert cache.get_exact("pipeline", "b") is None
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,91 @@
+"""Admission control for /chat and /chat/stream under a burst"""
+import asyncio
+import os
+
+import httpx
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from services.backends import FakeEmbeddings, FakeLLM, parse_latency
+from services.concurrency import ConcurrencyLimiter
+from services.index_store import BASE_DIR
+from services.retrieval import RetrievalService
+from services.streaming import sse_response
+
+MAX_CONCURRENT, MAX_QUEUED, BURST = 2, 2, 10
+
+CORPORA = {
+    "policy": {
+        "pdf_paths": [os.path.join(BASE_DIR, "hydrogen.pdf")],
+        "splitter": {"separator": "\n", "chunk_size": 1192, "chunk_overlap": 200},
+        "templates": ["chat"],
+    },
+}
+
+
+class Question(BaseModel):
+    question: str
+
+
+def build_app():
+    service = RetrievalService(
+        FakeEmbeddings(parse_latency("0")), FakeLLM(latency=parse_latency("0.3")), CORPORA, "fake-stub-256"
+    )
+    service.limiter = ConcurrencyLimiter(MAX_CONCURRENT, MAX_QUEUED)
+    service.corpus("policy")
+    app = FastAPI()
+
+    @app.post("/chat")
+    async def chat(req: Question):
+        answer, _ = await service.answer("policy", "chat", req.question)
+        return {"answer": answer}
+
+    @app.post("/chat/stream")
+    async def chat_stream(req: Question):
+        return sse_response(await service.stream("policy", "chat", req.question))
+
+    return app, service
+
+
+async def burst(path):
+    app, service = build_app()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+        responses = await asyncio.gather(
+            *(client.post(path, json={"question": f"Question {i} about hydrogen policy"}) for i in range(BURST))
+        )
+    return responses, service
+
+
+def test_chat_burst_is_admitted_up_to_the_queue():
+    responses, service = asyncio.run(burst("/chat"))
+    codes = sorted(r.status_code for r in responses)
+    assert codes == [200] * (MAX_CONCURRENT + MAX_QUEUED) + [429] * (BURST - MAX_CONCURRENT - MAX_QUEUED)
+    assert service.limiter.rejected == BURST - MAX_CONCURRENT - MAX_QUEUED
+
+
+def test_stream_burst_rejects_before_the_stream_starts():
+    responses, service = asyncio.run(burst("/chat/stream"))
+    admitted = [r for r in responses if r.status_code == 200]
+    rejected = [r for r in responses if r.status_code == 429]
+    assert len(admitted) == MAX_CONCURRENT + MAX_QUEUED
+    assert len(rejected) == BURST - MAX_CONCURRENT - MAX_QUEUED
+    assert all(r.headers["retry-after"] == "1" for r in rejected)
+    for r in admitted:
+        assert "event: error" not in r.text
+        assert "event: done" in r.text
+    # Every slot came back when its stream ended
+    assert service.limiter._semaphore._value == MAX_CONCURRENT
+
+
+def test_stream_cache_hit_needs_no_slot():
+    async def run():
+        app, service = build_app()
+        await service.answer("policy", "chat", "What is green hydrogen?")
+        for _ in range(MAX_CONCURRENT):
+            await service.limiter.acquire()
+        events = await service.stream("policy", "chat", "What is green hydrogen?")
+        return [event async for event in events]
+
+    events = asyncio.run(run())
+    assert events[-1].startswith("event: done")
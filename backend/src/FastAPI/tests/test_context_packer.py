@@ -0,0 +1,70 @@
+"""ContextPacker: duplicate removal, overlap merging and the token budget"""
+from langchain_core.documents import Document
+
+from services.context_packer import ContextPacker, estimate_tokens, merge_overlapping
+from services.pdf_extract import StreamingSplitter
+
+DOC_A, DOC_B = "a" * 16, "b" * 16
+
+
+def chunk(text: str, document: str = None, number: int = None) -> Document:
+    metadata = {"chunk_id": f"{document}-{number}"} if document else {}
+    return Document(page_content=text, metadata=metadata)
+
+
+def document_chunks(lines: int = 40):
+    text = "\n".join(f"line {i}: hydrogen storage and pipeline figures" for i in range(lines))
+    return text, StreamingSplitter(separator="\n", chunk_size=200, chunk_overlap=60).split_text(text)
+
+
+def test_consecutive_chunks_merge_back_into_the_source_text():
+    text, chunks = document_chunks()
+    assert len(chunks) > 3
+    docs = [chunk(c, DOC_A, n) for n, c in enumerate(chunks)]
+
+    # Retrieval order does not matter; chunk numbers do
+    context, report = ContextPacker(token_budget=10_000).pack(list(reversed(docs)))
+    assert context == text
+    assert report["segments"] == 1
+    assert report["tokens_saved"] > 0
+    assert report["tokens"] == estimate_tokens(text)
+
+
+def test_gaps_and_other_documents_stay_separate_segments_in_rank_order():
+    _, chunks = document_chunks()
+    docs = [chunk(chunks[3], DOC_A, 3), chunk("other document", DOC_B, 0), chunk(chunks[0], DOC_A, 0)]
+    context, report = ContextPacker(token_budget=10_000).pack(docs)
+    assert context == "\n".join([chunks[3], "other document", chunks[0]])
+    assert report["segments"] == 3
+
+
+def test_duplicates_are_sent_once():
+    docs = [chunk("same text"), chunk("same text"), chunk("same text", DOC_A, 7)]
+    context, report = ContextPacker().pack(docs)
+    assert context == "same text"
+    assert report["chunks"] == 3 and report["segments"] == 1
+
+
+def test_budget_truncates_at_a_separator_and_drops_what_cannot_fit():
+    long_text = "\n".join(f"row {i:03d} of a very long table" for i in range(100))
+    docs = [chunk(long_text), chunk("x" * 400), chunk("y" * 400)]
+    packer = ContextPacker(token_budget=300)
+    context, report = packer.pack(docs)
+    assert report["tokens"] <= packer.token_budget
+    assert long_text.startswith(context)
+    assert not context.endswith("\n") and context.split("\n")[-1].startswith("row ")
+    assert report["segments"] == 1 and report["dropped_segments"] == 2
+
+
+def test_small_leftovers_skip_a_segment_but_later_ones_that_fit_are_kept():
+    docs = [chunk("a" * 1100), chunk("b" * 400), chunk("c" * 40)]
+    context, report = ContextPacker(token_budget=300).pack(docs)
+    assert context == "a" * 1100 + "\n" + "c" * 40
+    assert report["dropped_segments"] == 1
+
+
+def test_merge_overlapping_only_merges_on_separator_boundaries():
+    assert merge_overlapping("one\ntwo\nthree", "two\nthree\nfour") == "one\ntwo\nthree\nfour"
+    # "ree" is shared text but not whole splits
+    assert merge_overlapping("one\nthree", "ree\nfour") == "one\nthree\nree\nfour"
+    assert merge_overlapping("one", "two") == "one\ntwo"
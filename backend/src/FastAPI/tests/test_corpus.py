@@ -0,0 +1,82 @@
+"""Corpus removal: tombstones hide chunks at once and removed seeds stay removed"""
+import os
+
+import pytest
+
+from services import corpus as corpus_module
+from services.backends import FakeEmbeddings, parse_latency
+from services.corpus import Corpus
+from services.index_store import BASE_DIR, IndexStore
+
+SEEDS = [os.path.join(BASE_DIR, "Distribution_Hub.pdf"), os.path.join(BASE_DIR, "PIPELINE.pdf")]
+REMOVED = "PIPELINE.pdf"
+
+
+@pytest.fixture
+def build(tmp_path):
+    store = IndexStore(str(tmp_path / "index"))
+    embeddings = FakeEmbeddings(parse_latency("0"))
+
+    def build() -> Corpus:
+        # A fresh Corpus over the same IndexStore is a process restart
+        return Corpus(
+            "assets-test", SEEDS, {"separator": "\n", "chunk_size": 1000, "chunk_overlap": 200},
+            embeddings, "fake-stub-256", index_store=store,
+        )
+
+    return build
+
+
+def sources(corpus: Corpus, text: str):
+    vector = corpus.embeddings.embed_query(text)
+    return {doc.metadata["source"] for doc in corpus.similarity_search_by_vector(vector, k=50)}
+
+
+def test_removed_chunks_are_tombstoned_and_stop_matching(build, monkeypatch):
+    monkeypatch.setattr(corpus_module, "COMPACT_RATIO", 1.0)
+    corpus = build()
+    store, _ = corpus._state
+    total = store.index.ntotal
+    chunk_ids = set(corpus._documents[REMOVED]["chunk_ids"])
+    text = next(d.page_content for d in corpus.chunks() if d.metadata["source"] == REMOVED)
+    assert REMOVED in sources(corpus, text)
+
+    assert corpus.remove_document(REMOVED)
+    store, tombstones = corpus._state
+    # Below COMPACT_RATIO the vectors stay; only the tombstones hide them
+    assert tombstones == chunk_ids
+    assert store.index.ntotal == total
+    assert REMOVED not in corpus.documents()
+    assert REMOVED not in {d.metadata["source"] for d in corpus.chunks()}
+    assert REMOVED not in sources(corpus, text)
+    assert not corpus.remove_document(REMOVED)
+
+
+def test_compaction_drops_tombstoned_vectors(build, monkeypatch):
+    monkeypatch.setattr(corpus_module, "COMPACT_RATIO", 0.0)
+    corpus = build()
+    total = corpus._state[0].index.ntotal
+    removed_chunks = len(corpus._documents[REMOVED]["chunk_ids"])
+
+    assert corpus.remove_document(REMOVED)
+    store, tombstones = corpus._state
+    assert tombstones == frozenset()
+    assert store.index.ntotal == total - removed_chunks
+
+
+def test_removed_seed_stays_removed_across_restart(build, monkeypatch):
+    monkeypatch.setattr(corpus_module, "COMPACT_RATIO", 1.0)
+    corpus = build()
+    corpus.remove_document(REMOVED)
+    tombstones = corpus._state[1]
+
+    restarted = build()
+    assert set(restarted.documents()) == {"Distribution_Hub.pdf"}
+    assert REMOVED not in {d.metadata["source"] for d in restarted.chunks()}
+    assert restarted._state[1] == tombstones
+
+    # Adding it back through the API lifts the removal, also across restarts
+    result = restarted.add_document(os.path.join(BASE_DIR, REMOVED))
+    assert result["status"] == "added"
+    assert REMOVED in {d.metadata["source"] for d in restarted.chunks()}
+    assert set(build().documents()) == {"Distribution_Hub.pdf", REMOVED}
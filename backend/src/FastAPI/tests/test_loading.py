@@ -0,0 +1,63 @@
+"""A corpus that fails to load is retried instead of staying at 503"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from services import retrieval
+from services.backends import FakeEmbeddings, FakeLLM, parse_latency
+from services.retrieval import RetrievalService
+
+CORPORA = {"policy": {"pdf_paths": [], "splitter": {}, "templates": ["chat"]}}
+
+
+class FlakyService(RetrievalService):
+    """Fails the first `failures` builds, then hands back a placeholder corpus"""
+
+    def __init__(self, failures: int):
+        super().__init__(FakeEmbeddings(parse_latency("0")), FakeLLM(latency=parse_latency("0")), CORPORA)
+        self.failures = failures
+        self.attempts = 0
+
+    def corpus(self, name):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise OSError("index store unavailable")
+        self.corpora[name] = SimpleNamespace(failed=[])
+        return self.corpora[name]
+
+
+def test_failed_corpus_is_retried_after_backoff(monkeypatch):
+    monkeypatch.setattr(retrieval, "LOAD_RETRY_SECONDS", 0.2)
+    service = FlakyService(failures=1)
+
+    with pytest.raises(HTTPException) as failed:
+        asyncio.run(service.ready_corpus("policy", wait=1))
+    assert failed.value.status_code == 503
+    assert "index store unavailable" in failed.value.detail
+    assert service.readiness(["policy"])["policy"]["status"] == "failed"
+
+    # Inside the backoff window the failure is reported without a rebuild
+    with pytest.raises(HTTPException):
+        asyncio.run(service.ready_corpus("policy", wait=0))
+    assert service.attempts == 1
+
+    asyncio.run(asyncio.sleep(0.25))
+    assert asyncio.run(service.ready_corpus("policy", wait=1)) is service.corpora["policy"]
+    assert service.attempts == 2
+    assert service.readiness(["policy"])["policy"]["status"] == "ready"
+    assert "policy" not in service.load_errors
+
+
+def test_backoff_doubles_per_failure(monkeypatch):
+    monkeypatch.setattr(retrieval, "LOAD_RETRY_SECONDS", 10)
+    monkeypatch.setattr(retrieval, "LOAD_RETRY_MAX_SECONDS", 15)
+    service = FlakyService(failures=3)
+    delays = []
+    for _ in range(3):
+        service._retry_at["policy"] = 0.0
+        service.load(["policy"])
+        service._loaded["policy"].wait(1)
+        delays.append(service._retry_at["policy"] - retrieval.time.monotonic())
+    assert [round(d) for d in delays] == [10, 15, 15]
@@ -0,0 +1,63 @@
+"""StreamingSplitter yields exactly the chunks of the CharacterTextSplitter it replaced"""
+import os
+import random
+
+import pytest
+from langchain.text_splitter import CharacterTextSplitter
+from PyPDF2 import PdfReader
+
+from services.index_store import BASE_DIR
+from services.pdf_extract import StreamingSplitter
+
+SETTINGS = [
+    {"separator": "\n", "chunk_size": 1000, "chunk_overlap": 200},
+    {"separator": "\n", "chunk_size": 1192, "chunk_overlap": 200},
+    {"separator": " ", "chunk_size": 50, "chunk_overlap": 10},
+    {"separator": "\n\n", "chunk_size": 120, "chunk_overlap": 0},
+    {"separator": "", "chunk_size": 40, "chunk_overlap": 8},
+]
+
+
+def random_text(rng: random.Random, length: int) -> str:
+    # Words, blank lines, runs of separators and words longer than a chunk
+    tokens = ["a", "hydrogen", "  ", "\n", "\n\n", "\n\n\n", "x" * 70, "storage.", "pipeline,"]
+    return "".join(rng.choice(tokens) + rng.choice(["", " "]) for _ in range(length))
+
+
+def random_pieces(rng: random.Random, text: str):
+    # Cut anywhere, including inside a multi-character separator
+    cuts = sorted(rng.sample(range(len(text) + 1), k=min(len(text) + 1, rng.randint(1, 30))))
+    return [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+
+
+@pytest.mark.parametrize("settings", SETTINGS)
+def test_matches_character_splitter_on_random_text(settings):
+    rng = random.Random(0)
+    reference = CharacterTextSplitter(length_function=len, **settings)
+    splitter = StreamingSplitter(**settings)
+    for _ in range(50):
+        text = random_text(rng, rng.randint(0, 400))
+        expected = reference.split_text(text)
+        assert splitter.split_text(text) == expected
+        assert list(splitter.split(random_pieces(rng, text))) == expected
+
+
+def test_matches_character_splitter_on_a_seed_pdf():
+    path = os.path.join(BASE_DIR, "hydrogen.pdf")
+    settings = SETTINGS[1]
+    # The raw text exactly as the corpus built it before streaming
+    raw_text = ""
+    for page in PdfReader(path).pages:
+        content = page.extract_text()
+        if content:
+            raw_text += content + "\n"
+    expected = CharacterTextSplitter(length_function=len, **settings).split_text(raw_text)
+
+    chunks = list(StreamingSplitter(**settings).split_pdf(path))
+    assert chunks == expected
+    assert len(chunks) > 1
+
+
+def test_rejects_overlap_larger_than_chunk():
+    with pytest.raises(ValueError):
+        StreamingSplitter(chunk_size=10, chunk_overlap=20)